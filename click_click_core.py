@@ -0,0 +1,3591 @@
+# click_click 공용 모듈 (클릭클릭(click_click).py / click_click_for_Linux.py 에서 함께 사용)
+# GUI/pyautogui 에 의존하지 않으므로 화면이 없는 환경에서도 import 가능
+# pip install numpy Pillow opencv-python (opencv 가 없으면 numpy FFT 매칭으로 대체)
+# pip install mss (선택: 공유 메모리 기반 고속 화면 캡처)
+
+import os
+import re
+import sys
+import csv
+import io
+import math
+import json
+import logging
+import logging.handlers
+import time
+import uuid
+import shutil
+import stat
+import hashlib
+import tempfile
+import argparse
+import threading
+from collections import OrderedDict, namedtuple, deque
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+# 설정 파일 형식 버전
+# 2: 이미지는 사이드카 폴더에 PNG로 저장, JSON에는 메타데이터만
+# 3: click_config.json 은 프로필 색인만, 프로필별 메타데이터는 사이드카 폴더의 profiles/*.json
+CONFIG_FORMAT_VERSION = 4
+
+
+def data_dir_for(config_file):
+    """설정 파일 옆에 두는 이미지 저장 폴더 경로 반환 (click_config.json -> click_config_data)"""
+    return os.path.splitext(config_file)[0] + "_data"
+
+
+# 새 파일 권한 계산용 umask (조회하려면 잠깐 바꿔야 하므로 시작할 때 한 번만)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path):
+    """교체할 파일의 기존 권한 (없으면 일반 open 으로 새로 만들 때와 같은 0o666 & ~umask)"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path, write):
+    """같은 폴더의 임시 파일에 기록한 뒤 이름 바꾸기로 교체 (중간에 끊겨도 기존 파일 유지).
+    mkstemp 의 임시 파일은 0600 이므로 교체 전에 기존 파일(또는 새 파일 기본) 권한으로 맞춤"""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data):
+    atomic_write(path, lambda f: f.write(json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")))
+
+
+# ========== 픽셀 데이터 변환 ==========
+def pixel_data_to_array(pixel_data):
+    """[[[r, g, b], ...], ...] 형식의 픽셀 데이터를 (H, W, 3) uint8 배열로 변환"""
+    if not pixel_data or not pixel_data[0]:
+        return None
+    array = np.asarray(pixel_data, dtype=np.uint8)
+    if array.ndim != 3 or array.shape[2] < 3:
+        return None
+    return np.ascontiguousarray(array[:, :, :3])
+
+
+def image_to_array(pil_image):
+    """PIL 스크린샷 버퍼를 한 번에 (H, W, 3) uint8 배열로 변환"""
+    if pil_image.mode != "RGB":
+        pil_image = pil_image.convert("RGB")
+    return np.asarray(pil_image, dtype=np.uint8)
+
+
+def legacy_pixel_rows(pil_image):
+    """getpixel 이중 루프로 픽셀 리스트 생성 (구버전 캡처 방식, 벤치마크 비교용)"""
+    pixel_data = []
+    for y_pos in range(pil_image.height):
+        row = []
+        for x_pos in range(pil_image.width):
+            r, g, b = pil_image.getpixel((x_pos, y_pos))[:3]
+            row.append([r, g, b])
+        pixel_data.append(row)
+    return pixel_data
+
+
+def array_to_image(array):
+    """(H, W, 3) uint8 배열을 PIL 이미지로 변환"""
+    if array is None:
+        return None
+    return Image.fromarray(np.ascontiguousarray(array, dtype=np.uint8), "RGB")
+
+
+# ========== 화면 캡처 소스 ==========
+class ScreenSource:
+    """화면을 (H, W, 3) uint8 배열로 가져오는 캡처 방식 (region=(left, top, width, height) 이면 그 영역만)"""
+
+    name = "base"
+
+    def grab(self, region=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiSource(ScreenSource):
+    """기존 방식: pyautogui.screenshot (Linux 에서는 외부 명령/느린 PIL 경로를 거칠 수 있음)"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, region=None):
+        return image_to_array(self._pyautogui.screenshot(region=tuple(region) if region else None))
+
+
+class PillowSource(ScreenSource):
+    """PIL.ImageGrab (Windows BitBlt / Linux XCB) 직접 호출"""
+
+    name = "pillow"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._grab = ImageGrab.grab
+        self._grab(bbox=(0, 0, 1, 1))  # 사용할 수 없는 환경이면 여기서 예외
+
+    def grab(self, region=None):
+        bbox = None
+        if region:
+            left, top, width, height = region
+            bbox = (left, top, left + width, top + height)
+        return image_to_array(self._grab(bbox=bbox))
+
+
+class MssSource(ScreenSource):
+    """mss 공유 메모리 캡처 (X11 MIT-SHM / Windows BitBlt). 영역만 캡처하면 그만큼만 복사"""
+
+    name = "mss"
+
+    def __init__(self):
+        if mss is None:
+            raise RuntimeError("mss 가 설치되어 있지 않습니다. (pip install mss)")
+        self._local = threading.local()  # mss 인스턴스는 스레드마다 따로 생성해야 함
+        self._session()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = mss.mss()
+        return session
+
+    def grab(self, region=None):
+        session = self._session()
+        if region:
+            left, top, width, height = region
+            monitor = {"left": left, "top": top, "width": width, "height": height}
+        else:
+            monitor = session.monitors[1]  # pyautogui 와 같은 주 모니터 좌표계
+        shot = session.grab(monitor)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return np.ascontiguousarray(bgra[:, :, 2::-1])
+
+    def close(self):
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
+
+
+class FileSource(ScreenSource):
+    """녹화된 스크린샷 폴더(또는 (이름, 배열) 목록)를 전체 화면 캡처마다 한 장씩 넘기는 테스트용 소스"""
+
+    name = "file"
+
+    def __init__(self, frames, loop=True):
+        self.frames = load_frames(frames) if isinstance(frames, str) else list(frames)
+        if not self.frames:
+            raise RuntimeError("재생할 화면 이미지가 없습니다.")
+        self.loop = loop
+        self.position = -1
+
+    def current(self):
+        return self.frames[max(self.position, 0)][1]
+
+    def grab(self, region=None):
+        if region:
+            # 영역 캡처는 화면을 넘기지 않고 현재 화면에서 잘라냄
+            frame = self.current()
+            left, top, width, height = clip_region(region, frame.shape[1], frame.shape[0])
+            return frame[top:top + height, left:left + width].copy()
+        if self.position + 1 < len(self.frames):
+            self.position += 1
+        elif self.loop:
+            self.position = 0
+        return self.current()
+
+
+SCREEN_SOURCES = {"mss": MssSource, "pillow": PillowSource, "pyautogui": PyAutoGuiSource}
+
+
+def make_screen_source(spec="auto"):
+    """캡처 소스 생성: "auto" | "mss" | "pillow" | "pyautogui" | "file:<폴더>" (auto 는 빠른 순서로 시도)"""
+    spec = spec or "auto"
+    if spec.startswith("file:"):
+        return FileSource(spec[len("file:"):])
+    if spec != "auto":
+        if spec not in SCREEN_SOURCES:
+            raise RuntimeError(f"알 수 없는 화면 캡처 방식: {spec}")
+        return SCREEN_SOURCES[spec]()
+    errors = []
+    for name, factory in SCREEN_SOURCES.items():
+        try:
+            return factory()
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise RuntimeError("사용 가능한 화면 캡처 방식이 없습니다. (" + "; ".join(errors) + ")")
+
+
+# ========== 템플릿 이미지 저장소 ==========
+class TemplateStore:
+    """트리거/타겟 이미지를 JSON 대신 PNG 파일로 보관하는 저장소.
+    이미지 ID 는 픽셀 내용의 sha256 이라 같은 이미지는 프로필이 달라도 파일 하나만 저장됨 (구버전 ID 는 uuid)"""
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.image_dir = os.path.join(root_dir, "images")
+
+    def path_for(self, image_id):
+        return os.path.join(self.image_dir, f"{image_id}.png")
+
+    @staticmethod
+    def content_id(array):
+        """배열 크기와 픽셀 내용으로 만든 이미지 ID"""
+        array = np.ascontiguousarray(array, dtype=np.uint8)
+        digest = hashlib.sha256(f"{array.shape}".encode("ascii"))
+        digest.update(array.data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def is_content_id(image_id):
+        return len(image_id) == 64 and all(c in "0123456789abcdef" for c in image_id)
+
+    def put(self, array):
+        """배열을 PNG로 저장하고 이미지 ID 반환 (같은 내용이 이미 있으면 쓰지 않음)"""
+        image_id = self.content_id(array)
+        path = self.path_for(image_id)
+        if not os.path.exists(path):
+            os.makedirs(self.image_dir, exist_ok=True)
+            image = array_to_image(array)
+            atomic_write(path, lambda f: image.save(f, format="PNG", optimize=True))
+        return image_id
+
+    def get(self, image_id):
+        """이미지 ID로 (H, W, 3) uint8 배열 로드 (없으면 None)"""
+        path = self.path_for(image_id)
+        if not image_id or not os.path.exists(path):
+            return None
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGB"), dtype=np.uint8)
+
+    def remove(self, image_id):
+        try:
+            os.remove(self.path_for(image_id))
+        except OSError:
+            pass
+
+    def image_ids(self):
+        """저장소에 있는 이미지 ID 목록"""
+        if not os.path.isdir(self.image_dir):
+            return []
+        return [name[:-4] for name in os.listdir(self.image_dir) if name.endswith(".png")]
+
+    def total_bytes(self):
+        """저장소 이미지 파일 크기 합계"""
+        total = 0
+        for image_id in self.image_ids():
+            try:
+                total += os.path.getsize(self.path_for(image_id))
+            except OSError:
+                pass
+        return total
+
+    def recompress(self, image_id):
+        """PNG 를 최대 압축으로 다시 저장 (더 작아질 때만, 이미지 ID 는 픽셀 기준이라 그대로). 줄어든 바이트 수 반환"""
+        path = self.path_for(image_id)
+        array = self.get(image_id)
+        if array is None:
+            return 0
+        buffer = io.BytesIO()
+        array_to_image(array).save(buffer, format="PNG", optimize=True)
+        data = buffer.getvalue()
+        saved = os.path.getsize(path) - len(data)
+        if saved <= 0:
+            return 0
+        atomic_write(path, lambda f: f.write(data))
+        return saved
+
+    def collect_garbage(self, referenced, stale_after=3600):
+        """어느 프로필도 쓰지 않는 이미지 파일과 오래된 임시 파일 삭제 -> (삭제한 파일 수, 바이트 수)"""
+        removed = freed = 0
+        orphans = [self.path_for(image_id) for image_id in self.image_ids() if image_id not in referenced]
+        if os.path.isdir(self.image_dir):
+            # 기록 도중 끊긴 atomic_write 임시 파일 (쓰는 중인 파일은 건드리지 않도록 오래된 것만)
+            orphans += [os.path.join(self.image_dir, name) for name in os.listdir(self.image_dir)
+                        if name.startswith(".tmp_")
+                        and time.time() - os.path.getmtime(os.path.join(self.image_dir, name)) > stale_after]
+        for path in orphans:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+
+def load_template_array(info, store):
+    """trigger/target 정보에서 이미지 배열 로드 (구버전 pixel_data 도 지원)"""
+    if not info:
+        return None
+    if info.get("_pixels") is not None:
+        return info["_pixels"]
+    if info.get("image_id"):
+        return store.get(info["image_id"])
+    if info.get("pixel_data"):
+        return pixel_data_to_array(info["pixel_data"])
+    return None
+
+
+TRIM_TOLERANCE = 4  # 가장자리 줄을 배경색으로 볼 채널별 허용 차이
+TRIM_MIN_SIZE = 8   # 잘라낸 뒤에도 남길 최소 가로/세로 (px)
+TRIM_MARGIN = 1     # 내용 둘레에 남길 배경 줄 수 (배경과의 경계도 매칭 단서)
+TRIM_AMBIGUOUS_SCORE = 0.8  # 잘라낸 템플릿이 원래 캡처의 다른 위치와 이 점수 이상 맞으면 자르지 않음
+
+
+def _flat(line, tolerance):
+    return int((line.max(axis=0) - line.min(axis=0)).max()) <= tolerance
+
+
+def border_color(array):
+    """바깥 테두리 한 줄에서 가장 많은 색 (테두리의 절반 이상을 차지하는 색이 없으면 None)"""
+    ring = np.concatenate([array[0], array[-1], array[1:-1, 0], array[1:-1, -1]])
+    colors, counts = np.unique(ring, axis=0, return_counts=True)
+    best = int(np.argmax(counts))
+    return colors[best] if counts[best] * 2 >= len(ring) else None
+
+
+def _keeps_content(array, box, tolerance):
+    """잘라낸 영역에 구별되는 내용이 남았는지: 단색이 아니고, 원래 캡처 안에서 제자리(±1px) 외에는 잘 맞지 않음"""
+    left, top, right, bottom = box
+    crop = np.ascontiguousarray(array[top:bottom, left:right])
+    if _flat(crop.reshape(-1, crop.shape[2]).astype(np.int16), tolerance):
+        return False
+    scores = np.array(TemplateMatcher().score_map(np.ascontiguousarray(array), crop), dtype=np.float32)
+    scores[max(0, top - 1):top + 2, max(0, left - 1):left + 2] = -1.0
+    return scores.size == 0 or float(np.nan_to_num(scores, nan=1.0).max()) < TRIM_AMBIGUOUS_SCORE
+
+
+def uniform_border(array, tolerance=TRIM_TOLERANCE, min_size=TRIM_MIN_SIZE, margin=TRIM_MARGIN):
+    """바깥 테두리 색(배경)으로만 된 가장자리 줄/열을 걷어낸 영역 -> (left, top, right, bottom), 자를 것이 없으면 None.
+    내용 둘레에는 배경을 margin 줄 남기고, 잘라낸 결과가 구별되는 내용을 잃으면(단색이 되거나
+    원래 캡처의 다른 위치와도 잘 맞으면) 자르지 않음"""
+    a = np.asarray(array, dtype=np.int16)
+    height, width = a.shape[:2]
+    color = border_color(a)
+    if color is None or _flat(a.reshape(-1, a.shape[2]), tolerance):
+        return None
+
+    def background(line):
+        return int(np.abs(line - color).max()) <= tolerance
+
+    left, top, right, bottom = 0, 0, width, height
+    while True:
+        before = (left, top, right, bottom)
+        if bottom - top > min_size and background(a[top, left:right]):
+            top += 1
+        if bottom - top > min_size and background(a[bottom - 1, left:right]):
+            bottom -= 1
+        if right - left > min_size and background(a[top:bottom, left]):
+            left += 1
+        if right - left > min_size and background(a[top:bottom, right - 1]):
+            right -= 1
+        if (left, top, right, bottom) == before:
+            break
+    box = (max(0, left - margin), max(0, top - margin), min(width, right + margin), min(height, bottom + margin))
+    if box == (0, 0, width, height) or not _keeps_content(array, box, tolerance):
+        return None
+    return box
+
+
+def trim_template_info(info, array, box, store):
+    """trigger/target 정보를 가장자리를 잘라낸 템플릿으로 교체. 기록된 위치는 잘라낸 만큼 옮기고,
+    trim 에 원래 캡처 영역 기준 위치를 남겨 클릭은 예전처럼 원래 영역의 가운데를 누름. 새 배열 반환"""
+    left, top, right, bottom = box
+    trimmed = np.ascontiguousarray(array[top:bottom, left:right])
+    height, width = array.shape[:2]
+    trim = info.get("trim") or {"left": 0, "top": 0, "width": width, "height": height}
+    info["trim"] = dict(trim, left=trim["left"] + left, top=trim["top"] + top)
+    info["image_id"] = store.put(trimmed)
+    if info.get("region"):
+        info["region"] = dict(info["region"], left=info["region"]["left"] + left, top=info["region"]["top"] + top,
+                              width=right - left, height=bottom - top)
+    if info.get("last_hit"):
+        scale = info.get("last_scale", 1.0)
+        info["last_hit"] = {"left": info["last_hit"]["left"] + round(left * scale),
+                            "top": info["last_hit"]["top"] + round(top * scale)}
+    for spot in info.get("hit_memo", []):
+        spot["left"] += round(left * spot.get("scale", 1.0))
+        spot["top"] += round(top * spot.get("scale", 1.0))
+    if "_pixels" in info:
+        info["_pixels"] = trimmed
+    info.pop("_template", None)
+    return trimmed
+
+
+# ========== 구버전 설정 스트리밍 읽기/쓰기 ==========
+STREAM_CHUNK_SIZE = 1 << 16  # 한 번에 읽는 글자 수 (클수록 문자열 복사로 최대 메모리가 늘어남)
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_SCALAR = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?|true|false|null")
+_ROW_END = re.compile(r"\][ \t\r\n]*\]")
+_PIXEL_SEPARATORS = str.maketrans("[],", "   ")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")  # 숫자 뒤에 이어질 수 있는 글자
+
+
+class JsonStreamReader:
+    """파일을 조금씩 읽으며 JSON 을 파싱. pixel_data 배열은 [r, g, b] 리스트를 만들지 않고
+    행 단위로 바로 uint8 배열로 바꿔 '_pixels' 키에 넣음 (최대 메모리 ~ 픽셀 크기 + 읽기 버퍼)"""
+
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """버퍼 뒤에 다음 조각을 이어 붙임 (이미 읽은 앞부분은 버림). 더 읽을 게 없으면 False"""
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        return ValueError(f"설정 파일 JSON 오류 ({message}): ...{self.buf[self.pos:self.pos + 40]!r}")
+
+    def peek(self):
+        """공백을 건너뛴 다음 글자 (파일 끝이면 "")"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error(f"'{char}' 필요")
+        self.pos += 1
+
+    def string(self):
+        self.expect('"')
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 문자열이 조각 경계에서 잘림
+                self.pos -= 1
+                if not self._fill():
+                    raise self._error("닫히지 않은 문자열")
+                self.pos += 1
+                continue
+            self.pos = end
+            return value
+
+    def scalar(self):
+        self.peek()
+        while True:
+            match = _SCALAR.match(self.buf, self.pos)
+            # 조각 경계에서 잘린 숫자(예: "0|.85", "1e|-3")의 앞부분만 맞은 것이 아닌지 다음 글자로 확인
+            if match and match.end() < len(self.buf) and self.buf[match.end()] not in _NUMBER_CHARS:
+                break
+            if not self._fill():
+                match = _SCALAR.match(self.buf, self.pos)
+                break
+        if not match:
+            raise self._error("알 수 없는 값")
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def value(self, key=None):
+        char = self.peek()
+        if char == "{":
+            return self.object()
+        if char == "[":
+            return self.pixel_array() if key == "pixel_data" else self.array()
+        if char == '"':
+            return self.string()
+        return self.scalar()
+
+    def object(self):
+        self.expect("{")
+        result = {}
+        if self.peek() == "}":
+            self.pos += 1
+            return result
+        while True:
+            key = self.string()
+            self.expect(":")
+            value = self.value(key)
+            if key == "pixel_data":
+                result["_pixels"] = value
+            else:
+                result[key] = value
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return result
+            if char != ",":
+                raise self._error("',' 또는 '}' 필요")
+
+    def array(self):
+        self.expect("[")
+        result = []
+        if self.peek() == "]":
+            self.pos += 1
+            return result
+        while True:
+            result.append(self.value())
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return result
+            if char != ",":
+                raise self._error("',' 또는 ']' 필요")
+
+    def pixel_array(self):
+        """[[[r, g, b], ...], ...] -> (H, W, 3) uint8 배열 (비어 있으면 None)"""
+        self.expect("[")
+        rows = []
+        if self.peek() == "]":
+            self.pos += 1
+            return None
+        while True:
+            self.peek()
+            while True:
+                match = _ROW_END.search(self.buf, self.pos)
+                if match:
+                    break
+                if not self._fill():
+                    raise self._error("닫히지 않은 pixel_data 행")
+            text = self.buf[self.pos:match.end()]
+            self.pos = match.end()
+            width = text.count("[") - 1
+            values = np.array(text.translate(_PIXEL_SEPARATORS).split(), dtype=np.int16)
+            if width <= 0 or values.size % width:
+                raise self._error("pixel_data 행 형식")
+            rows.append(values.reshape(width, -1)[:, :3].astype(np.uint8))
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                break
+            if char != ",":
+                raise self._error("pixel_data 의 ',' 또는 ']' 필요")
+        if len({row.shape for row in rows}) != 1 or rows[0].shape[1] < 3:
+            return None
+        return np.stack(rows)
+
+
+def read_config_stream(path, chunk_size=STREAM_CHUNK_SIZE):
+    """설정 JSON 을 스트리밍으로 읽음 (pixel_data 는 '_pixels' uint8 배열로)"""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = JsonStreamReader(f, chunk_size)
+        data = reader.value()
+        if reader.peek():
+            raise reader._error("값 뒤에 남은 내용")
+    return data
+
+
+def write_json_stream(write, value, indent=""):
+    """value 를 JSON 으로 조금씩 write(문자열) 에 출력. '_pixels' 배열은 pixel_data 로 한 행씩 출력하고
+    그 밖의 '_' 키는 저장하지 않음"""
+    if isinstance(value, dict):
+        items = [(k, v) for k, v in value.items() if not str(k).startswith("_")]
+        pixels = value.get("_pixels")
+        if not items and pixels is None:
+            write("{}")
+            return
+        inner = indent + "    "
+        write("{")
+        first = True
+        if pixels is not None:
+            write(f"\n{inner}\"pixel_data\": [")
+            for y, row in enumerate(np.asarray(pixels, dtype=np.uint8)[:, :, :3].tolist()):
+                write(("," if y else "") + json.dumps(row, separators=(",", ":")))
+            write("]")
+            first = False
+        for key, item in items:
+            write(("" if first else ",") + f"\n{inner}{json.dumps(str(key), ensure_ascii=False)}: ")
+            write_json_stream(write, item, inner)
+            first = False
+        write(f"\n{indent}}}")
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            write("[]")
+            return
+        inner = indent + "    "
+        write("[")
+        for i, item in enumerate(value):
+            write(("," if i else "") + f"\n{inner}")
+            write_json_stream(write, item, inner)
+        write(f"\n{indent}]")
+    else:
+        write(json.dumps(value, ensure_ascii=False))
+
+
+def export_legacy_config(config_file, out_path, log=print):
+    """현재 설정을 구버전 단일 파일 형식({"profiles": {...}}, 픽셀은 pixel_data)으로 내보냄.
+    프로필을 하나씩 읽어 바로 쓰므로 메모리에는 프로필 하나의 픽셀만 올라감"""
+    store = TemplateStore(data_dir_for(config_file))
+    repo = ProfileRepository(config_file, store, cache_size=1)
+    repo.load(migrate=False, log=log)
+
+    def write_file(f):
+        write = lambda text: f.write(text.encode("utf-8"))
+        write("{\n    \"current_profile\": " + json.dumps(repo.current_profile, ensure_ascii=False)
+              + ",\n    \"profiles\": {")
+        for i, name in enumerate(repo):
+            profile = dict(repo[name])
+            profile["image_pairs"] = [dict(pair) for pair in profile.get("image_pairs", [])]
+            for pair in profile["image_pairs"]:
+                for key in ("trigger", "target"):
+                    if pair.get(key):
+                        info = {k: v for k, v in pair[key].items() if k != "image_id"}
+                        info["_pixels"] = load_template_array(pair[key], store)
+                        pair[key] = info
+            write(("," if i else "") + f"\n        {json.dumps(name, ensure_ascii=False)}: ")
+            write_json_stream(write, profile, "        ")
+        write("\n    }\n}\n")
+
+    atomic_write(out_path, write_file)
+    return len(repo)
+
+
+# ========== 구버전 설정 마이그레이션 ==========
+def externalize_pixel_data(profiles, store):
+    """프로필 안의 pixel_data(리스트 또는 스트리밍으로 읽은 '_pixels' 배열)를 PNG 파일로 옮기고
+    image_id 로 교체, 변환한 이미지 수 반환"""
+    converted = 0
+    for profile in profiles.values():
+        for pair in profile.get("image_pairs", []):
+            for key in ("trigger", "target"):
+                info = pair.get(key)
+                if not info or ("pixel_data" not in info and "_pixels" not in info):
+                    continue
+                if "_pixels" in info:
+                    array = info.pop("_pixels")
+                else:
+                    array = pixel_data_to_array(info.pop("pixel_data"))
+                # 구버전 일부 항목의 중복 크기 정보는 region 에 이미 포함되어 있음
+                info.pop("width", None)
+                info.pop("height", None)
+                if array is not None:
+                    info["image_id"] = store.put(array)
+                    converted += 1
+    return converted
+
+
+def backup_legacy_config(config_file):
+    """마이그레이션 전 원본 설정 파일을 .legacy.bak 으로 한 번만 보관"""
+    backup_path = config_file + ".legacy.bak"
+    if os.path.exists(config_file) and not os.path.exists(backup_path):
+        shutil.copy2(config_file, backup_path)
+    return backup_path
+
+
+def normalize_config_data(data):
+    """설정 JSON(신/구버전)을 (현재 프로필명, 프로필 dict) 로 정리"""
+    if "profiles" in data:
+        return data.get("current_profile", "default"), data.get("profiles", {})
+    old_multiplier = data.get("capture_size_multiplier", 1)
+    return "default", {
+        "default": {
+            "image_pairs": data.get("image_pairs", []),
+            "trigger_capture_multiplier": old_multiplier,
+            "target_capture_multiplier": old_multiplier
+        }
+    }
+
+
+def load_profile_pairs(config_file, profile_name=None):
+    """설정 파일에서 프로필 하나를 읽어 _pixels 까지 채운 (프로필명, 프로필 dict) 반환 (GUI 없이 사용)"""
+    store = TemplateStore(data_dir_for(config_file))
+    repo = ProfileRepository(config_file, store)
+    repo.load(migrate=False)
+    name = profile_name or repo.current_profile
+    if name not in repo:
+        raise KeyError(f"프로필 '{name}' 이(가) 없습니다. (사용 가능: {', '.join(repo)})")
+    profile = repo[name]
+    for pair in profile.get("image_pairs", []):
+        for key in ("trigger", "target"):
+            if pair.get(key):
+                pair[key]["_pixels"] = load_template_array(pair[key], store)
+    return name, profile
+
+
+def default_profile():
+    return {
+        "image_pairs": [],
+        "trigger_capture_multiplier": 1,
+        "target_capture_multiplier": 1
+    }
+
+
+def profile_file_name(name):
+    """프로필명으로 파일명 생성 (파일시스템에 안전한 문자 + 짧은 해시)"""
+    safe = re.sub(r"[^\w\-]", "_", name)[:40]
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{safe}_{digest}.json"
+
+
+class ProfileRepository(MutableMapping):
+    """프로필 색인만 먼저 읽고 각 프로필은 필요할 때 로드하는 저장소 (최근 사용 프로필은 LRU로 메모리에 유지)
+
+    변경 사항은 journal.jsonl 에 한 줄씩 추가 기록하고(쌍 하나 추가 = 그 쌍 크기만큼 기록),
+    일정 개수가 쌓이면 백그라운드에서 프로필 파일/색인을 원자적으로 다시 써서 저널을 비움.
+    각 파일에 반영된 마지막 저널 번호(journal_seq)를 함께 저장해 중간에 끊겨도 재실행 시 이어서 반영됨.
+    """
+
+    COMPACT_AFTER = 100  # 저널 항목이 이만큼 쌓이면 백그라운드 정리
+
+    def __init__(self, config_file, store, cache_size=3):
+        self.config_file = config_file
+        self.store = store
+        self.profile_dir = os.path.join(store.root_dir, "profiles")
+        self.journal_path = os.path.join(store.root_dir, "journal.jsonl")
+        self.cache_size = cache_size
+        self.current_profile = "default"
+        self.index = OrderedDict()   # 프로필명 -> {"file": ..., "pair_count": ...}
+        self._loaded = OrderedDict() # 프로필명 -> 프로필 dict (LRU 순서)
+        self._file_seq = {}          # 프로필명 -> 프로필 파일에 반영된 마지막 저널 번호
+        self._dirty = set()
+        self._writing = set()        # 스냅샷을 파일에 쓰는 중인 프로필 (쓰기가 끝나기 전에는 LRU 에서 내보내지 않음)
+        self._deleted = set()
+        self._pinned = set()         # LRU 에서 내보내지 않을 프로필 (현재 프로필)
+        self._seq = 0                # 마지막으로 기록한 저널 번호
+        self._index_seq = 0          # 색인 파일에 반영된 마지막 저널 번호
+        self._journal_entries = 0
+        self._learned = {}           # 프로필명 -> {쌍 id: 마지막으로 기록한 학습 값}
+        self._lock = threading.RLock()
+        self._compactor = None
+        self.log = print
+
+    # ---------- 로드 / 마이그레이션 ----------
+    def load(self, migrate=True, log=print):
+        """색인 파일 로드 후 저널 재생. 구버전(단일 JSON) 이면 migrate=True 일 때 프로필별 파일로 1회 변환"""
+        self.log = log
+        if not os.path.exists(self.config_file):
+            return False
+        # 구버전 단일 파일은 수십 MB 라 pixel_data 를 리스트로 만들지 않도록 스트리밍으로 읽음
+        data = read_config_stream(self.config_file)
+        if data.get("format_version", 1) >= 3:
+            self.current_profile = data.get("current_profile", "default")
+            self.index = OrderedDict(data.get("profiles", {}))
+            self._seq = self._index_seq = data.get("journal_seq", 0)
+            replayed = self._replay_journal()
+            if migrate and data["format_version"] < 4:
+                log("이미지 저장소를 내용 기반 ID 로 변환 중 (같은 이미지는 하나로 합침)...")
+                self._log_dedupe(self.dedupe_templates())
+            elif replayed and migrate:
+                log(f"저장되지 않은 변경 {replayed}건을 저널에서 복구했습니다.")
+                self.compact_async()
+            return True
+
+        # ========== 구버전 형식 (프로필 전체가 한 파일) ==========
+        if "profiles" not in data:
+            log("구버전 설정 파일 감지 - default 프로필로 마이그레이션 중...")
+        self.current_profile, profiles = normalize_config_data(data)
+        del data
+        if migrate:
+            if any("pixel_data" in pair.get(key, {}) or "_pixels" in pair.get(key, {})
+                   for profile in profiles.values()
+                   for pair in profile.get("image_pairs", [])
+                   for key in ("trigger", "target")):
+                log("픽셀 데이터 형식 설정 파일 감지 - 이미지 파일로 분리 중...")
+                backup_path = backup_legacy_config(self.config_file)
+                converted = externalize_pixel_data(profiles, self.store)
+                log(f"분리 완료 - 이미지 {converted}개 저장, 원본은 {backup_path} 에 보관")
+            else:
+                backup_legacy_config(self.config_file)
+        for name, profile in profiles.items():
+            self.index[name] = {"file": profile_file_name(name),
+                                "pair_count": len(profile.get("image_pairs", []))}
+            self._loaded[name] = profile
+            self._dirty.add(name)
+        if migrate:
+            self.save()
+            log(f"프로필 {len(profiles)}개를 프로필별 파일로 분리했습니다.")
+            self._log_dedupe(self.dedupe_templates())
+        return True
+
+    def dedupe_templates(self):
+        """모든 프로필의 uuid 이미지 ID 를 내용 기반 ID 로 바꾸고, 같은 이미지 파일은 하나만 남김.
+        (바꾼 참조 수, 변환 전 파일 수, 변환 후 파일 수) 반환"""
+        renamed = {}  # 구 ID -> 새 ID (파일이 없으면 None)
+        references = 0
+        for name in list(self.index):
+            profile = self[name]
+            changed = False
+            for pair in profile.get("image_pairs", []):
+                for key in ("trigger", "target"):
+                    info = pair.get(key) or {}
+                    old_id = info.get("image_id")
+                    if not old_id or self.store.is_content_id(old_id):
+                        continue
+                    if old_id not in renamed:
+                        array = self.store.get(old_id)
+                        renamed[old_id] = self.store.put(array) if array is not None else None
+                    if renamed[old_id]:
+                        info["image_id"] = renamed[old_id]
+                        references += 1
+                        changed = True
+            if changed:
+                with self._lock:
+                    self._dirty.add(name)
+        # 새 ID 가 저장된 뒤에만 옛 파일 삭제 (중간에 끊기면 다음 실행에서 이어서 변환)
+        self.save()
+        for old_id, new_id in renamed.items():
+            if new_id:
+                self.store.remove(old_id)
+        return references, len(renamed), len({new_id for new_id in renamed.values() if new_id})
+
+    def referenced_image_ids(self):
+        """모든 프로필이 참조하는 이미지 ID 집합"""
+        return {pair[key]["image_id"]
+                for name in list(self.index)
+                for pair in self[name].get("image_pairs", [])
+                for key in ("trigger", "target")
+                if (pair.get(key) or {}).get("image_id")}
+
+    def trim_templates(self, tolerance=TRIM_TOLERANCE, min_size_for=None):
+        """모든 프로필의 템플릿에서 배경색 가장자리를 잘라내고 바뀐 쌍을 기록 (옛 이미지 파일은 남겨 둠).
+        min_size_for: 템플릿 크기 -> 남길 최소 가로/세로. [(프로필명, 쌍 번호(0부터), key, 원래 배열, 잘라낸 배열), ...] 반환"""
+        trimmed = []
+        for name in list(self.index):
+            for idx, pair in enumerate(self[name].get("image_pairs", [])):
+                changed = False
+                for key in ("trigger", "target"):
+                    info = pair.get(key)
+                    array = load_template_array(info, self.store)
+                    if array is None:
+                        continue
+                    min_size = min_size_for(array.shape) if min_size_for else TRIM_MIN_SIZE
+                    box = uniform_border(array, tolerance, min_size)
+                    if box is None:
+                        continue
+                    trimmed.append((name, idx, key, array, trim_template_info(info, array, box, self.store)))
+                    changed = True
+                if changed:
+                    self.update_pair(name, idx)
+        return trimmed
+
+    def _log_dedupe(self, result):
+        references, before, after = result
+        if references:
+            self.log(f"이미지 참조 {references}개 변환: 파일 {before}개 -> {after}개 (중복 {before - after}개 정리)")
+
+    def _read_profile(self, name):
+        path = os.path.join(self.profile_dir, self.index[name]["file"])
+        if not os.path.exists(path):
+            self._file_seq[name] = 0
+            return default_profile()
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        self._file_seq[name] = profile.pop("journal_seq", 0)
+        return profile
+
+    def _evict(self):
+        """LRU 초과분 중 저장이 끝난(변경 없고 쓰는 중도 아닌) 프로필을 메모리에서 내보냄 (방금 사용한 프로필은 제외)"""
+        for name in list(self._loaded)[:-1]:
+            if len(self._loaded) <= self.cache_size:
+                break
+            if name not in self._dirty and name not in self._writing and name not in self._pinned:
+                del self._loaded[name]
+                self._file_seq.pop(name, None)
+
+    def pin(self, name):
+        """현재 프로필은 LRU 에서 내보내지 않음"""
+        self._pinned = {name}
+
+    def loaded_names(self):
+        return list(self._loaded)
+
+    # ---------- 저널 ----------
+    def _read_journal(self):
+        """저널 항목 목록 (마지막 줄이 기록 도중 끊겼으면 무시)"""
+        if not os.path.exists(self.journal_path):
+            return []
+        entries = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+        return entries
+
+    def _replay_journal(self):
+        """파일에 아직 반영되지 않은 저널 항목을 메모리의 프로필에 적용하고 적용한 개수 반환"""
+        entries = self._read_journal()
+        self._journal_entries = len(entries)
+        replayed = 0
+        for entry in entries:
+            self._seq = max(self._seq, entry["seq"])
+            if self._apply(entry, replaying=True):
+                replayed += 1
+        return replayed
+
+    def _append(self, entry):
+        """저널에 항목 하나 추가 (fsync 까지 끝나야 반환)"""
+        self._seq += 1
+        entry = dict(entry, seq=self._seq)
+        os.makedirs(self.store.root_dir, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += 1
+        return entry
+
+    def _apply(self, entry, pair=None, replaying=False):
+        """저널 항목 하나를 메모리의 프로필에 적용 (재생 시에는 이미 파일에 반영된 항목을 건너뜀)"""
+        op, name, seq = entry["op"], entry["name"], entry["seq"]
+        if op == "put_profile":
+            if replaying and seq <= self._index_seq and name not in self.index:
+                return False  # 이후 삭제된 프로필
+            self.index.setdefault(name, {"file": profile_file_name(name)})
+            self._deleted.discard(self.index[name]["file"])
+            if replaying:
+                self[name]  # 파일의 journal_seq 확인용
+                if seq <= self._file_seq.get(name, 0):
+                    return False
+            self._loaded[name] = entry["profile"] if pair is None else pair
+            self._loaded.move_to_end(name)
+            self._file_seq.setdefault(name, 0)
+        elif op == "delete_profile":
+            if name not in self.index or (replaying and seq <= self._index_seq):
+                return False
+            self._deleted.add(self.index.pop(name)["file"])
+            self._loaded.pop(name, None)
+            self._file_seq.pop(name, None)
+            self._dirty.discard(name)
+            return True
+        else:
+            if name not in self.index:
+                return False
+            profile = self[name]
+            if replaying and seq <= self._file_seq.get(name, 0):
+                return False
+            pairs = profile.setdefault("image_pairs", [])
+            if op == "settings":
+                profile.update(entry["settings"])
+            elif op == "add_pair":
+                pairs.insert(entry["index"], entry["pair"] if pair is None else pair)
+            elif op == "update_pair":
+                pairs[entry["index"]] = entry["pair"] if pair is None else pair
+            elif op == "remove_pair":
+                del pairs[entry["index"]]
+            elif op == "swap_pairs":
+                i, j = entry["index"], entry["other"]
+                pairs[i], pairs[j] = pairs[j], pairs[i]
+            elif op == "learned" and replaying:
+                # 순서가 바뀌었을 수 있으므로 쌍 id 로 찾음 (실행 중에는 메모리의 쌍이 이미 최신 값)
+                for item in pairs:
+                    for key, values in entry["pairs"].get(item.get("id"), {}).items():
+                        info = item.get(key)
+                        if info is not None:
+                            for field in LEARNED_KEYS:
+                                info.pop(field, None)
+                            info.update(values)
+        profile = self._loaded.get(name)
+        if profile is not None:
+            self.index[name]["pair_count"] = len(profile.get("image_pairs", []))
+        self._dirty.add(name)
+        return True
+
+    def _record(self, entry, pair=None):
+        with self._lock:
+            entry = self._append(entry)
+            self._apply(entry, pair=pair)
+        if self._journal_entries >= self.COMPACT_AFTER:
+            self.compact_async()
+
+    def update_settings(self, name, settings):
+        """프로필 설정값(쌍 목록 제외) 중 바뀐 것만 기록"""
+        profile = self[name]
+        changed = {k: v for k, v in profiles_for_json(settings).items()
+                   if k != "image_pairs" and profile.get(k) != v}
+        if changed:
+            self._record({"op": "settings", "name": name, "settings": changed})
+
+    def add_pair(self, name, pair, index=None):
+        """쌍 하나를 프로필에 추가하고 그 쌍만 저널에 기록"""
+        if index is None:
+            index = len(self[name].get("image_pairs", []))
+        self._record({"op": "add_pair", "name": name, "index": index, "pair": profiles_for_json(pair)}, pair)
+
+    def update_pair(self, name, index):
+        """프로필의 index 번째 쌍(이미 수정된 객체)을 저널에 기록"""
+        pair = self[name]["image_pairs"][index]
+        self._record({"op": "update_pair", "name": name, "index": index, "pair": profiles_for_json(pair)}, pair)
+
+    def remove_pair(self, name, index):
+        self._record({"op": "remove_pair", "name": name, "index": index})
+
+    def mark_dirty(self, name):
+        """저널에 기록하지 못하고 메모리에만 반영한 변경을 다음 저장 때 프로필 파일에 쓰도록 표시"""
+        with self._lock:
+            if name in self._loaded:
+                self.index[name]["pair_count"] = len(self._loaded[name].get("image_pairs", []))
+                self._dirty.add(name)
+
+    def record_learned(self, name):
+        """모니터링 엔진이 갱신한 trigger/target 의 학습 값(LEARNED_KEYS) 중 바뀐 쌍만 기록. 기록한 쌍 수 반환"""
+        with self._lock:
+            if name not in self.index:
+                return 0
+            learned = {}
+            with LEARNED_LOCK:
+                for pair in self[name].get("image_pairs", []):
+                    if pair.get("id"):
+                        learned[pair["id"]] = profiles_for_json(
+                            {key: {field: pair[key][field] for field in LEARNED_KEYS if field in pair[key]}
+                             for key in ("trigger", "target") if LEARNED_KEYS[0] in (pair.get(key) or {})})
+            recorded = self._learned.setdefault(name, {})
+            changed = {pair_id: values for pair_id, values in learned.items()
+                       if recorded.get(pair_id, {}) != values}
+            if changed:
+                self._record({"op": "learned", "name": name, "pairs": changed})
+                recorded.update(changed)
+            return len(changed)
+
+    def swap_pairs(self, name, index, other):
+        self._record({"op": "swap_pairs", "name": name, "index": index, "other": other})
+
+    # ---------- MutableMapping ----------
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self.index:
+                raise KeyError(name)
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+            else:
+                self._loaded[name] = self._read_profile(name)
+                self._evict()
+            return self._loaded[name]
+
+    def __setitem__(self, name, profile):
+        self._record({"op": "put_profile", "name": name, "profile": profiles_for_json(profile)}, profile)
+
+    def __delitem__(self, name):
+        if name not in self.index:
+            raise KeyError(name)
+        self._record({"op": "delete_profile", "name": name})
+
+    def __iter__(self):
+        return iter(list(self.index))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    # ---------- 저장 (정리) ----------
+    def _snapshot(self):
+        """잠금 상태에서 기록할 내용을 복사 (실제 파일 쓰기는 잠금 밖에서)"""
+        seq = self._seq
+        names = {name for name in self._dirty if name in self._loaded}
+        profiles = {self.index[name]["file"]: dict(profiles_for_json(self._loaded[name]), journal_seq=seq)
+                    for name in names}
+        for name in self._dirty:
+            self._file_seq[name] = seq
+        index = {
+            "format_version": CONFIG_FORMAT_VERSION,
+            "current_profile": self.current_profile,
+            "journal_seq": seq,
+            "profiles": profiles_for_json(dict(self.index))
+        }
+        deleted = set(self._deleted)
+        # 변경 표시는 지금 지우되(쓰는 동안의 새 변경은 다시 표시됨) 쓰기가 끝날 때까지 메모리에 붙잡아 둠
+        self._writing |= names
+        self._dirty.clear()
+        self._deleted.clear()
+        return seq, names, profiles, index, deleted
+
+    def _write_snapshot(self, seq, names, profiles, index, deleted):
+        """스냅샷을 파일에 기록 (실패하면 다음 저장 때 다시 기록하도록 변경 표시를 되돌림)"""
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            for file_name, profile in profiles.items():
+                atomic_write_json(os.path.join(self.profile_dir, file_name), profile)
+            for file_name in deleted:
+                try:
+                    os.remove(os.path.join(self.profile_dir, file_name))
+                except OSError:
+                    pass
+            atomic_write_json(self.config_file, index)
+            with self._lock:
+                self._index_seq = seq
+                # 파일 쓰는 동안 추가된 항목만 남기고 저널 교체
+                pending = [entry for entry in self._read_journal() if entry["seq"] > seq]
+                atomic_write(self.journal_path, lambda f: f.write(
+                    "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in pending).encode("utf-8")))
+                self._journal_entries = len(pending)
+        except BaseException:
+            with self._lock:
+                self._dirty.update(name for name in names if name in self.index and name in self._loaded)
+                self._deleted.update(deleted)
+            raise
+        finally:
+            with self._lock:
+                self._writing -= names
+                self._evict()
+
+    def save(self, current_profile=None):
+        """변경된 프로필 파일과 색인을 지금 바로 기록하고 저널 비우기"""
+        self.wait_for_compaction()
+        with self._lock:
+            if current_profile is not None:
+                self.current_profile = current_profile
+            snapshot = self._snapshot()
+        self._write_snapshot(*snapshot)
+
+    def compact_async(self):
+        """백그라운드 스레드에서 저널 정리 (이미 실행 중이면 무시)"""
+        if self._compactor and self._compactor.is_alive():
+            return
+        with self._lock:
+            snapshot = self._snapshot()
+
+        def run():
+            try:
+                self._write_snapshot(*snapshot)
+            except Exception as e:
+                self.log(f"프로필 저널 정리 오류: {e}")  # 변경 표시는 되돌려 두었으므로 다음 정리 때 다시 기록
+
+        self._compactor = threading.Thread(target=run, daemon=True)
+        self._compactor.start()
+
+    def wait_for_compaction(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+# 모니터링 스레드가 쌍에 쓰는 학습 값(LEARNED_KEYS)과 저장용 사본 만들기를 서로 배제
+LEARNED_LOCK = threading.RLock()
+LEARNED_KEYS = ("last_hit", "last_scale", "hit_memo")
+
+
+def profiles_for_json(profiles):
+    """'_' 로 시작하는 런타임 전용 키(PIL 이미지 등)를 제외한 저장용 사본 반환"""
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if not str(k).startswith("_")}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value
+    with LEARNED_LOCK:
+        return strip(profiles)
+
+
+# ========== 템플릿 매칭 엔진 ==========
+class MatchResult:
+    """템플릿 하나의 매칭 결과 (좌상단 좌표, 크기, 점수, 찾은 배율, 검색에 걸린 시간)"""
+    __slots__ = ("key", "left", "top", "width", "height", "score", "found", "scale", "elapsed")
+
+    def __init__(self, key, left, top, width, height, score, found, scale=1.0, elapsed=0.0):
+        self.key = key
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.score = score
+        self.found = found
+        self.scale = scale
+        self.elapsed = elapsed  # 초 (run_search 가 전체 단계를 합산해 기록)
+
+    @property
+    def center(self):
+        return (self.left + self.width // 2, self.top + self.height // 2)
+
+    def __repr__(self):
+        return (f"MatchResult(key={self.key!r}, left={self.left}, top={self.top}, "
+                f"score={self.score:.3f}, found={self.found})")
+
+
+def to_gray(array):
+    """(H, W, 3) 배열을 (H, W, 1) float32 그레이스케일로 변환"""
+    if array.shape[2] == 1:
+        return array.astype(np.float32)
+    rgb = array[:, :, :3].astype(np.float32)
+    gray = rgb[:, :, 0] * 0.299 + rgb[:, :, 1] * 0.587 + rgb[:, :, 2] * 0.114
+    return gray[:, :, None]
+
+
+def downscale(array, factor):
+    """factor 배 축소 (영역 평균), factor == 1 이면 그대로 반환"""
+    if factor == 1:
+        return array
+    h, w = array.shape[0] // factor, array.shape[1] // factor
+    if cv2 is not None:
+        small = cv2.resize(np.ascontiguousarray(array), (w, h), interpolation=cv2.INTER_AREA)
+        return small.reshape(h, w, array.shape[2])
+    cropped = array[:h * factor, :w * factor].astype(np.float32)
+    return cropped.reshape(h, factor, w, factor, array.shape[2]).mean(axis=(1, 3))
+
+
+class PreparedFrame:
+    """한 번 캡처한 화면을 여러 템플릿 검사에 재사용하기 위한 전처리 결과"""
+
+    def __init__(self, frame):
+        dtype = np.float32 if frame.dtype == np.float32 else np.uint8
+        self.frame = np.ascontiguousarray(frame[:, :, :3], dtype=dtype)
+        self.height, self.width = self.frame.shape[:2]
+        self._float = None
+        self._spectrum = None
+        self._integrals = None
+        self._levels = {}
+
+    def level(self, factor):
+        """factor 배 축소한 그레이스케일 화면 (템플릿들이 공유하도록 캐시)"""
+        if factor not in self._levels:
+            self._levels[factor] = PreparedFrame(downscale(to_gray(self.frame), factor))
+        return self._levels[factor]
+
+    def as_float(self):
+        if self._float is None:
+            self._float = self.frame.astype(np.float64)
+        return self._float
+
+    def spectrum(self):
+        """채널별 2D FFT (numpy 매칭에서 모든 템플릿이 공유)"""
+        if self._spectrum is None:
+            self._spectrum = np.fft.rfft2(self.as_float(), axes=(0, 1))
+        return self._spectrum
+
+    def integrals(self):
+        """창 합계 계산용 적분 영상 (채널별 합, 전체 제곱합)"""
+        if self._integrals is None:
+            f = self.as_float()
+            sums = np.zeros((self.height + 1, self.width + 1, f.shape[2]))
+            sums[1:, 1:] = f.cumsum(0).cumsum(1)
+            sq = np.zeros((self.height + 1, self.width + 1))
+            sq[1:, 1:] = (f * f).sum(axis=2).cumsum(0).cumsum(1)
+            self._integrals = (sums, sq)
+        return self._integrals
+
+
+def _window_sum(integral, h, w):
+    """적분 영상으로 모든 (h, w) 창의 합 계산"""
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+
+def _ncc_numpy(prepared, templ, centered=None):
+    """OpenCV TM_CCOEFF_NORMED 와 같은 정규화 상관계수 맵 (numpy FFT 구현)"""
+    th, tw = templ.shape[:2]
+    H, W = prepared.height, prepared.width
+    if centered is None:
+        t = templ.astype(np.float64)
+        t = t - t.mean(axis=(0, 1))
+    else:
+        t = centered
+    n = th * tw
+    # 상관(correlation) = 뒤집은 템플릿과의 합성곱, 화면 크기 FFT를 재사용
+    kernel = np.zeros((H, W, t.shape[2]))
+    kernel[:th, :tw] = t[::-1, ::-1]
+    spec = prepared.spectrum() * np.fft.rfft2(kernel, axes=(0, 1))
+    corr = np.fft.irfft2(spec, s=(H, W), axes=(0, 1)).sum(axis=2)
+    numerator = corr[th - 1:, tw - 1:]
+    sums, sq = prepared.integrals()
+    win_sum = _window_sum(sums, th, tw)
+    win_var = _window_sum(sq, th, tw) - (win_sum * win_sum).sum(axis=2) / n
+    denom = np.sqrt(np.maximum(win_var, 0) * (t * t).sum())
+    result = np.zeros_like(numerator)
+    valid = denom > 1e-6
+    result[valid] = numerator[valid] / denom[valid]
+    return np.clip(result, -1.0, 1.0)
+
+
+def clip_region(region, frame_width, frame_height):
+    """(left, top, width, height) 영역을 화면 범위 안으로 자르기"""
+    left, top, width, height = (int(v) for v in region)
+    right, bottom = min(left + width, frame_width), min(top + height, frame_height)
+    left, top = max(0, left), max(0, top)
+    return left, top, max(0, right - left), max(0, bottom - top)
+
+
+def search_window(anchor, templ_shape, margin):
+    """기록된 위치(anchor: left/top)를 중심으로 margin 만큼 넓힌 검색 영역"""
+    th, tw = templ_shape[:2]
+    return (anchor["left"] - margin, anchor["top"] - margin, tw + 2 * margin, th + 2 * margin)
+
+
+def click_point(info, result):
+    """타겟 클릭 위치: 가장자리를 잘라낸 템플릿(trim)이면 잘라내기 전 원래 캡처 영역의 가운데"""
+    trim = (info or {}).get("trim")
+    if not trim:
+        return result.center
+    return (result.left + round((trim["width"] // 2 - trim["left"]) * result.scale),
+            result.top + round((trim["height"] // 2 - trim["top"]) * result.scale))
+
+
+# ========== 템플릿 캐시 ==========
+def fit_size(image_size, box_size):
+    """비율을 유지하며 box_size 안에 들어가는 크기 계산"""
+    img_width, img_height = image_size
+    box_width, box_height = box_size
+    aspect_ratio = img_width / img_height
+    if aspect_ratio > 1:  # 가로가 더 긴 경우
+        return box_width, max(1, int(box_width / aspect_ratio))
+    # 세로가 더 긴 경우 또는 정사각형
+    return max(1, int(box_height * aspect_ratio)), box_height
+
+
+MIN_SCALED_SIZE = 4  # 배율 적용 후 템플릿 짧은 변의 최소 픽셀 수
+
+
+def parse_scales(value):
+    """'1, 1.25, 1.5' 또는 [1, 1.25] -> 중복 없는 배율 목록 (0.25 ~ 4 범위, 1.0 항상 포함)"""
+    if isinstance(value, str):
+        value = [v for v in re.split(r"[,\s]+", value) if v]
+    scales = [1.0]
+    for v in value or []:
+        scale = round(float(v), 3)
+        if not 0.25 <= scale <= 4.0:
+            raise ValueError(f"배율은 0.25 ~ 4 사이여야 합니다: {v}")
+        if scale not in scales:
+            scales.append(scale)
+    return scales
+
+
+def ordered_scales(scales, last_scale=None):
+    """마지막으로 찾은 배율을 먼저, 나머지는 그 배율과 가까운 순서로"""
+    first = last_scale if last_scale in (scales or ()) else 1.0
+    return sorted(scales or [1.0], key=lambda s: (s != first, abs(s - first)))
+
+
+class TemplateEntry:
+    """디코딩된 템플릿과 매칭/미리보기용 파생 데이터 (프로필 로드 시 한 번만 계산)"""
+
+    PRECOMPUTED_FACTORS = (2, 4)
+
+    def __init__(self, pixels):
+        self.pixels = np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8)
+        self.shape = self.pixels.shape
+        self.gray = to_gray(self.pixels)
+        # numpy 매칭용 평균 제거 템플릿과 노름
+        self.centered = self.pixels.astype(np.float64) - self.pixels.mean(axis=(0, 1))
+        self.norm = float(np.sqrt((self.centered * self.centered).sum()))
+        self._levels = {1: self.gray}
+        for factor in self.PRECOMPUTED_FACTORS:
+            if min(self.shape[:2]) // factor >= TemplateMatcher.MIN_COARSE_SIZE:
+                self._levels[factor] = downscale(self.gray, factor)
+        self._image = None
+        self._scaled = {}
+
+    def scaled(self, scale):
+        """scale 배 크기로 다시 만든 템플릿 항목 (배율별 캐시, 너무 작아지면 None)"""
+        scale = round(float(scale), 3)
+        if scale == 1.0:
+            return self
+        if scale not in self._scaled:
+            h, w = self.shape[:2]
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            if min(size) < MIN_SCALED_SIZE:
+                self._scaled[scale] = None
+            elif cv2 is not None:
+                interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+                self._scaled[scale] = TemplateEntry(cv2.resize(self.pixels, size, interpolation=interpolation))
+            else:
+                self._scaled[scale] = TemplateEntry(np.asarray(self.image().resize(size, Image.BILINEAR)))
+        return self._scaled[scale]
+
+    def level(self, factor):
+        """factor 배 축소한 그레이스케일 템플릿"""
+        if factor not in self._levels:
+            self._levels[factor] = downscale(self.gray, factor)
+        return self._levels[factor]
+
+    def image(self):
+        if self._image is None:
+            self._image = array_to_image(self.pixels)
+        return self._image
+
+
+
+def template_pixels(templ):
+    """TemplateEntry 또는 배열에서 (H, W, 3) 배열 꺼내기"""
+    return templ.pixels if isinstance(templ, TemplateEntry) else templ
+
+
+class TemplateCache:
+    """프로필 단위 템플릿 캐시 (쌍 추가/삭제 때만 갱신)"""
+
+    def __init__(self, store):
+        self.store = store
+        self.entries = {}  # image_id -> TemplateEntry
+
+    @staticmethod
+    def key_for(info):
+        return info.get("image_id") or f"mem:{id(info)}"
+
+    def entry_for(self, info):
+        """trigger/target 정보의 캐시 항목 (없으면 디코딩해서 생성)"""
+        if not info:
+            return None
+        key = self.key_for(info)
+        entry = self.entries.get(key)
+        if entry is None:
+            # LRU 에 남아 있던 프로필이면 이미 디코딩된 항목을 재사용
+            entry = info.get("_template")
+            if entry is None:
+                pixels = load_template_array(info, self.store)
+                if pixels is None:
+                    return None
+                entry = TemplateEntry(pixels)
+            self.entries[key] = entry
+        info["_template"] = entry
+        info["_pixels"] = entry.pixels
+        return entry
+
+    def add_pair(self, pair):
+        for key in ("trigger", "target"):
+            self.entry_for(pair.get(key))
+
+    def build(self, pairs):
+        """프로필의 모든 쌍에 대해 캐시 항목 생성"""
+        self.entries.clear()
+        for pair in pairs:
+            self.add_pair(pair)
+
+    def invalidate_pair(self, pair, pairs=()):
+        """쌍의 캐시 항목 제거 (pairs 의 다른 쌍이 같은 이미지를 쓰면 유지)"""
+        in_use = {self.key_for(p[k]) for p in pairs if p is not pair for k in ("trigger", "target") if p.get(k)}
+        for key in ("trigger", "target"):
+            info = pair.get(key)
+            if not info:
+                continue
+            info.pop("_template", None)
+            if self.key_for(info) not in in_use:
+                self.entries.pop(self.key_for(info), None)
+
+
+THUMBNAIL_CACHE_SIZE = 256  # 미리보기 썸네일 최대 보관 개수 (이미지 ID x 칸 크기)
+
+
+class ThumbnailCache:
+    """미리보기용 축소 이미지 LRU 캐시 ((이미지 ID, 칸 크기) -> PIL 이미지).
+    프로필을 불러오면 prefetch() 가 백그라운드에서 미리 채워 목록을 넘길 때 디코딩/리사이즈가 없게 함"""
+
+    def __init__(self, store, maxsize=THUMBNAIL_CACHE_SIZE, log=print):
+        self.store = store
+        self.maxsize = maxsize
+        self.log = log  # 백그라운드 채우기 오류 보고 (앱은 로그 통로로 연결)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # prefetch 할 때마다 증가 (이전 프로필의 채우기 중단)
+
+    @staticmethod
+    def make(pixels, box_size):
+        """비율을 유지하며 box_size 안에 들어가도록 줄인 PIL 이미지"""
+        image = array_to_image(pixels)
+        return image.resize(fit_size(image.size, box_size), Image.LANCZOS)
+
+    def get(self, info, box_size):
+        """trigger/target 정보의 썸네일 (없으면 만들어 보관, 이미지가 없으면 None)"""
+        if not info:
+            return None
+        key = (TemplateCache.key_for(info), tuple(box_size))
+        with self._lock:
+            thumb = self._items.get(key)
+            if thumb is not None:
+                self._items.move_to_end(key)
+                return thumb
+        pixels = load_template_array(info, self.store)
+        if pixels is None:
+            return None
+        thumb = self.make(pixels, box_size)
+        with self._lock:
+            self._items[key] = thumb
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return thumb
+
+    def prefetch(self, infos, box_size):
+        """infos 의 썸네일을 백그라운드 스레드에서 순서대로 생성 (다시 호출되면 이전 작업은 중단)"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        infos = [info for info in infos if info][:self.maxsize]
+
+        def run():
+            for info in infos:
+                if self._generation != generation:
+                    return
+                try:
+                    self.get(info, box_size)
+                except Exception as e:
+                    self.log(f"썸네일 생성 오류: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+
+def _top_peaks(scores, threshold, count, spacing_h, spacing_w):
+    """threshold 이상인 점수 맵의 극대점을 최대 count 개 (서로 spacing 이상 떨어진 것만) 반환"""
+    scores = scores.copy()
+    peaks = []
+    for _ in range(count):
+        idx = int(np.argmax(scores))
+        y, x = divmod(idx, scores.shape[1])
+        if scores[y, x] < threshold:
+            break
+        peaks.append((x, y))
+        scores[max(0, y - spacing_h):y + spacing_h + 1, max(0, x - spacing_w):x + spacing_w + 1] = -np.inf
+    return peaks
+
+
+class TemplateMatcher:
+    """화면 한 장에 여러 템플릿을 검사하는 매칭 엔진 (OpenCV 우선, 없으면 numpy)"""
+
+    MIN_COARSE_SIZE = 8      # 축소 후 템플릿 짧은 변의 최소 픽셀 수
+    COARSE_SLACK = 0.2       # 축소 그레이 단계의 후보 기준 완화폭 (confidence - slack)
+    MAX_CANDIDATES = 5       # 원본 해상도로 재검증할 후보 수
+
+    def __init__(self, backend=None, pyramid_levels=2):
+        if backend is None:
+            backend = "opencv" if cv2 is not None else "numpy"
+        if backend == "opencv" and cv2 is None:
+            raise RuntimeError("opencv-python 이 설치되어 있지 않습니다.")
+        self.backend = backend
+        self.pyramid_levels = pyramid_levels  # 0 이면 항상 원본 컬러 전체 매칭
+
+    def prepare(self, frame):
+        return frame if isinstance(frame, PreparedFrame) else PreparedFrame(frame)
+
+    def score_map(self, frame, templ):
+        """템플릿의 모든 위치에 대한 점수 맵 반환 (템플릿이 화면보다 크면 None)"""
+        prepared = self.prepare(frame)
+        th, tw = templ.shape[:2]
+        if th > prepared.height or tw > prepared.width:
+            return None
+        entry = templ if isinstance(templ, TemplateEntry) else None
+        templ = template_pixels(templ)
+        if self.backend == "opencv":
+            image, needle = prepared.frame, np.ascontiguousarray(templ[:, :, :3], dtype=prepared.frame.dtype)
+            if needle.shape[2] == 1:
+                image, needle = image[:, :, 0], needle[:, :, 0]
+            return cv2.matchTemplate(image, needle, cv2.TM_CCOEFF_NORMED)
+        return _ncc_numpy(prepared, templ, centered=entry.centered if entry else None)
+
+    def coarse_factor(self, templ_shape):
+        """템플릿 크기에서 사용할 수 있는 가장 큰 축소 배율 (2 의 거듭제곱)"""
+        factor = 1
+        for _ in range(self.pyramid_levels):
+            if min(templ_shape[:2]) // (factor * 2) < self.MIN_COARSE_SIZE:
+                break
+            factor *= 2
+        return factor
+
+    def locate_coarse_to_fine(self, prepared, templ, confidence, key=None, factor=None):
+        """축소 그레이 화면에서 후보를 찾고 원본 컬러 해상도로 후보 주변만 재검증"""
+        th, tw = templ.shape[:2]
+        factor = factor or self.coarse_factor(templ.shape)
+        coarse = prepared.level(factor)
+        if isinstance(templ, TemplateEntry):
+            small = templ.level(factor)
+        else:
+            small = downscale(to_gray(templ), factor)
+        scores = self.score_map(coarse, small)
+        best = MatchResult(key, 0, 0, tw, th, 0.0, False)
+        if scores is None or scores.size == 0:
+            return best
+        candidates = _top_peaks(scores, confidence - self.COARSE_SLACK, self.MAX_CANDIDATES,
+                                small.shape[0] // 2, small.shape[1] // 2)
+        for x, y in candidates:
+            # 축소 좌표 오차(factor 픽셀)만큼 여유를 둔 작은 창에서 원본 컬러로 최종 점수 계산
+            roi = (x * factor - factor, y * factor - factor, tw + 2 * factor, th + 2 * factor)
+            result = self.locate(prepared, templ, confidence, key=key, roi=roi)
+            if result.score > best.score:
+                best = result
+            if best.found:
+                break
+        return best
+
+    def locate(self, frame, templ, confidence, key=None, roi=None):
+        """가장 점수가 높은 위치 하나를 MatchResult 로 반환 (roi=(left, top, width, height) 이면 그 영역만 검색)"""
+        th, tw = templ.shape[:2]
+        offset_x = offset_y = 0
+        if roi is not None:
+            prepared = self.prepare(frame)
+            left, top, width, height = clip_region(roi, prepared.width, prepared.height)
+            if width < tw or height < th:
+                return MatchResult(key, 0, 0, tw, th, 0.0, False)
+            frame = prepared.frame[top:top + height, left:left + width]
+            offset_x, offset_y = left, top
+        elif self.pyramid_levels > 0 and self.coarse_factor(templ.shape) > 1:
+            return self.locate_coarse_to_fine(self.prepare(frame), templ, confidence, key=key)
+        scores = self.score_map(frame, templ)
+        if scores is None or scores.size == 0:
+            return MatchResult(key, 0, 0, tw, th, 0.0, False)
+        idx = int(np.argmax(scores))
+        top, left = divmod(idx, scores.shape[1])
+        score = float(scores[top, left])
+        return MatchResult(key, int(left) + offset_x, int(top) + offset_y, tw, th, score, score >= confidence)
+
+    def match_all(self, frame, templates):
+        """templates: [(key, 배열, confidence), ...] -> {key: MatchResult} (화면 전처리는 1회)"""
+        prepared = self.prepare(frame)
+        return {key: self.locate(prepared, templ, conf, key=key) for key, templ, conf in templates}
+
+
+# ========== 병렬 매칭 ==========
+def search_anchors(info, search_mode):
+    """마지막 발견 위치 -> 캡처 위치 순서의 주변 탐색 기준점 목록 (전체 화면 탐색이면 빈 목록)"""
+    if search_mode != "roi":
+        return []
+    anchors = [info.get("last_hit"), info.get("region")]
+    return [a for i, a in enumerate(anchors) if a and a not in anchors[:i]]
+
+
+HIT_MEMO_SIZE = 4        # trigger/target 마다 기억할 최근 발견 위치 수
+HIT_MEMO_MAX_MISSES = 5  # 다른 위치에서 연속으로 이만큼 발견되는 동안 한 번도 맞지 않은 위치는 기억에서 삭제
+HIT_MEMO_SLACK = 2       # 기억한 위치를 확인할 때 허용하는 흔들림 (px)
+
+
+class HitMemo:
+    """최근 발견 위치 N개(info["hit_memo"])를 기억해 두고 전체 검색 전에 그 위치만 템플릿 크기로 먼저 확인.
+    위치마다 발견 수와 (다른 곳에서 발견된) 연속 빗나감 수를 저장해, 더 이상 나타나지 않는 위치는 지움"""
+
+    def __init__(self, size=HIT_MEMO_SIZE, max_misses=HIT_MEMO_MAX_MISSES, slack=HIT_MEMO_SLACK):
+        self.size = size
+        self.max_misses = max_misses
+        self.slack = slack
+
+    def verify(self, matcher, frame, templ, confidence, key, info):
+        """기억한 위치를 최근 순으로 확인 -> 찾은 결과, 없으면 None"""
+        started = time.perf_counter()
+        for spot in info.get("hit_memo", []):
+            scale = spot.get("scale", 1.0)
+            for _, scaled in scaled_templates(templ, [scale]):
+                th, tw = scaled.shape[:2]
+                roi = (spot["left"] - self.slack, spot["top"] - self.slack, tw + 2 * self.slack, th + 2 * self.slack)
+                result = matcher.locate(frame, scaled, confidence, key=key, roi=roi)
+                if result.found:
+                    result.scale = scale
+                    result.elapsed = time.perf_counter() - started
+                    return result
+        return None
+
+    def record(self, info, result):
+        """발견 결과 반영: 찾은 위치는 맨 앞으로(발견 +1), 나머지 위치는 빗나감 +1.
+        화면에 아예 없을 때는 위치가 낡았다는 근거가 아니므로 세지 않음"""
+        if not result.found:
+            return
+        memo = info.get("hit_memo", [])
+        spot = next((m for m in memo if m.get("scale", 1.0) == result.scale
+                     and abs(m["left"] - result.left) <= self.slack and abs(m["top"] - result.top) <= self.slack), None)
+        for m in memo:
+            if m is not spot:
+                m["misses"] = m.get("misses", 0) + 1
+        if spot is None:
+            spot = {"hits": 0}
+        else:
+            memo.remove(spot)
+        spot.update(left=result.left, top=result.top, scale=result.scale, hits=spot["hits"] + 1, misses=0)
+        kept = [m for m in memo if m.get("misses", 0) < self.max_misses]
+        info["hit_memo"] = ([spot] + kept)[:self.size]
+
+
+def scaled_templates(templ, scales):
+    """[(배율, 템플릿), ...] (배율 1 외에는 TemplateEntry 의 배율별 캐시 사용)"""
+    if scales == [1.0] or not scales:
+        return [(1.0, templ)]
+    entry = templ if isinstance(templ, TemplateEntry) else TemplateEntry(templ)
+    return [(scale, entry.scaled(scale)) for scale in scales if entry.scaled(scale) is not None]
+
+
+def run_search(matcher, frame, templ, confidence, key, anchors=(), margin=200, scales=None):
+    """주변 탐색 영역 -> 전체 화면 순으로, 각 단계에서 배율 목록(scales, 우선순위 순)을 차례로 검사.
+    기준을 넘는 배율이 나오면 바로 중단. (결과, "roi"|"full") 반환"""
+    started = time.perf_counter()
+    candidates = scaled_templates(templ, scales)
+    for anchor in anchors:
+        for scale, scaled in candidates:
+            result = matcher.locate(frame, scaled, confidence, key=key,
+                                    roi=search_window(anchor, scaled.shape, margin))
+            if result.found:
+                result.scale = scale
+                result.elapsed = time.perf_counter() - started
+                return result, "roi"
+    best = None
+    for scale, scaled in candidates:
+        result = matcher.locate(frame, scaled, confidence, key=key)
+        result.scale = scale
+        if best is None or result.score > best.score:
+            best = result
+        if result.found:
+            break
+    best.elapsed = time.perf_counter() - started
+    return best, "full"
+
+
+# 검색 작업 하나 (key: 쌍 번호, anchors: 주변 탐색 기준점, scales: 시도할 배율(우선순위 순), cache_key: 작업자 템플릿 캐시 키)
+SearchJob = namedtuple("SearchJob", "key templ confidence anchors margin scales cache_key")
+
+
+# 프로세스 작업자 쪽 상태 (공유 메모리 화면, 매칭 엔진, 템플릿 캐시)
+_worker_state = {"shm": None, "frame_id": None, "frame": None, "matcher": None, "templates": {}}
+SHARED_TEMPLATE_LIMIT = 256  # 공유 메모리/작업자 캐시에 둘 템플릿 수 (넘으면 비우고 다시 채움)
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python 3.12 이하
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_template(template_ref):
+    """프로세스 작업자: 공유 메모리의 템플릿을 블록마다 한 번만 복사해 TemplateEntry 로 보관"""
+    name, shape, dtype = template_ref
+    templates = _worker_state["templates"]
+    entry = templates.get(name)
+    if entry is None:
+        if len(templates) >= SHARED_TEMPLATE_LIMIT:
+            templates.clear()
+        shm = _attach_shared_memory(name)
+        try:
+            pixels = np.array(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+        finally:
+            shm.close()
+        entry = templates[name] = TemplateEntry(pixels)
+    return entry
+
+
+def _worker_search(frame_ref, matcher_config, job):
+    """프로세스 작업자: 공유 메모리의 화면에서 (공유 메모리로 받은) 템플릿 하나 검색"""
+    state = _worker_state
+    name, shape, dtype, frame_id = frame_ref
+    if state["shm"] is None or state["shm"].name != name:
+        if state["shm"] is not None:
+            state["shm"].close()
+        state["shm"], state["frame_id"] = _attach_shared_memory(name), None
+    if state["frame_id"] != frame_id:
+        # 화면이 바뀌었을 때만 전처리(축소본 등)를 새로 계산
+        state["frame"] = PreparedFrame(np.ndarray(shape, dtype=dtype, buffer=state["shm"].buf))
+        state["frame_id"] = frame_id
+    matcher = state["matcher"]
+    if matcher is None or (matcher.backend, matcher.pyramid_levels) != matcher_config:
+        matcher = state["matcher"] = TemplateMatcher(*matcher_config)
+    key, template_ref, confidence, anchors, margin, scales = job
+    return run_search(matcher, state["frame"], _worker_template(template_ref), confidence, key, anchors, margin,
+                      scales)
+
+
+class MatchPool:
+    """여러 템플릿 검색을 작업자들에 나눠 실행
+
+    OpenCV 는 matchTemplate 중 GIL 을 풀기 때문에 스레드로 화면 배열을 그대로 공유하고,
+    numpy 백엔드는 프로세스 작업자를 쓰되 화면은 공유 메모리에 한 번만 복사함 (작업마다 pickle 하지 않음).
+    템플릿도 cache_key 별로 공유 메모리에 한 번만 올리고 작업에는 블록 이름만 넘김.
+    """
+
+    def __init__(self, workers=1, backend=None, mode=None):
+        if backend is None:
+            backend = "opencv" if cv2 is not None else "numpy"
+        self.workers = max(1, int(workers))
+        self.mode = mode or ("thread" if backend == "opencv" else "process")
+        self._executor = None
+        self._shm = None
+        self._frame_id = 0
+        self._shared_frame = None
+        self._templates = {}  # cache_key -> (원본 배열, 공유 메모리)
+
+    @staticmethod
+    def default_workers():
+        """Tk 스레드용으로 코어 하나를 남긴 작업자 수 (최대 4)"""
+        return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+    def _ensure_executor(self):
+        if self._executor is None:
+            if self.mode == "thread":
+                self._executor = ThreadPoolExecutor(self.workers)
+            else:
+                self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    def _share(self, prepared):
+        """화면을 공유 메모리에 복사 (같은 화면이면 재사용) 후 작업자에게 넘길 참조 반환"""
+        frame = prepared.frame
+        if self._shared_frame is not prepared:
+            if self._shm is None or self._shm.size < frame.nbytes:
+                self._release_shared_memory()
+                self._shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            np.copyto(np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf), frame)
+            self._frame_id += 1
+            self._shared_frame = prepared
+        return self._shm.name, frame.shape, frame.dtype.str, self._frame_id
+
+    def _share_template(self, job):
+        """템플릿을 공유 메모리에 복사 (같은 cache_key 의 같은 배열이면 재사용) 후 작업자에게 넘길 참조 반환"""
+        pixels = template_pixels(job.templ)
+        shared = self._templates.get(job.cache_key)
+        if shared is None or shared[0] is not pixels:
+            if shared is not None:
+                self._release_template(job.cache_key)
+            elif len(self._templates) >= SHARED_TEMPLATE_LIMIT:
+                self._release_templates()
+            shm = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+            np.copyto(np.ndarray(pixels.shape, dtype=pixels.dtype, buffer=shm.buf), pixels)
+            shared = self._templates[job.cache_key] = (pixels, shm)
+        return shared[1].name, pixels.shape, pixels.dtype.str
+
+    def search_many(self, matcher, frame, jobs):
+        """jobs: [SearchJob, ...] -> [(결과, 종류), ...] (순서 유지)"""
+        prepared = matcher.prepare(frame)
+        if self.workers <= 1 or len(jobs) <= 1:
+            return [run_search(matcher, prepared, job.templ, job.confidence, job.key, job.anchors, job.margin, job.scales)
+                    for job in jobs]
+        executor = self._ensure_executor()
+        if self.mode == "thread":
+            # 축소본은 작업자들이 동시에 만들지 않도록 미리 계산
+            for job in jobs:
+                for _, scaled in scaled_templates(job.templ, job.scales):
+                    factor = matcher.coarse_factor(scaled.shape)
+                    if matcher.pyramid_levels > 0 and factor > 1:
+                        prepared.level(factor)
+            return list(executor.map(lambda job: run_search(matcher, prepared, job.templ, job.confidence, job.key,
+                                                            job.anchors, job.margin, job.scales), jobs))
+        frame_ref = self._share(prepared)
+        config = (matcher.backend, matcher.pyramid_levels)
+        futures = [executor.submit(_worker_search, frame_ref, config,
+                                   (job.key, self._share_template(job), job.confidence,
+                                    job.anchors, job.margin, job.scales))
+                   for job in jobs]
+        return [f.result() for f in futures]
+
+    def _release_shared_memory(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._shared_frame = None
+
+    def _release_template(self, cache_key):
+        _, shm = self._templates.pop(cache_key)
+        shm.close()
+        shm.unlink()
+
+    def _release_templates(self):
+        for cache_key in list(self._templates):
+            self._release_template(cache_key)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._release_shared_memory()
+        self._release_templates()
+
+
+# ========== 화면 변화 감지 ==========
+def _rects_overlap(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class FrameChangeDetector:
+    """이전 캡처와 타일 단위로 비교해 바뀐 영역(더티 타일)을 기록하는 변화 감지기"""
+
+    def __init__(self, tile=64):
+        self.tile = tile
+        self.generation = 0     # 캡처할 때마다 1 증가
+        self.tile_gen = None    # 타일별 마지막으로 바뀐 generation
+        self._prev = None
+        self.last_changed_tiles = 0
+
+    def update(self, frame):
+        """새 화면을 반영하고 이번에 바뀐 타일 수 반환"""
+        self.generation += 1
+        h, w = frame.shape[:2]
+        ty, tx = -(-h // self.tile), -(-w // self.tile)
+        if self._prev is None or self._prev.shape != frame.shape:
+            self.tile_gen = np.full((ty, tx), self.generation, dtype=np.int64)
+            changed_tiles = ty * tx
+        else:
+            changed = np.zeros((ty * self.tile, tx * self.tile), dtype=bool)
+            changed[:h, :w] = (frame != self._prev).any(axis=2)
+            dirty = changed.reshape(ty, self.tile, tx, self.tile).any(axis=(1, 3))
+            self.tile_gen[dirty] = self.generation
+            changed_tiles = int(dirty.sum())
+        self._prev = frame
+        self.last_changed_tiles = changed_tiles
+        return changed_tiles
+
+    def dirty_mask(self, since_generation):
+        return self.tile_gen > since_generation
+
+    def dirty_rects(self, since_generation):
+        """since_generation 이후 바뀐 타일들을 이어 붙인 영역 목록 [(left, top, width, height)]"""
+        mask = self.dirty_mask(since_generation)
+        seen = np.zeros_like(mask)
+        rects = []
+        for y, x in zip(*np.nonzero(mask)):
+            if seen[y, x]:
+                continue
+            # 연결된 더티 타일 묶음의 외곽 사각형 (4방향 탐색)
+            stack, y0, y1, x0, x1 = [(y, x)], y, y, x, x
+            seen[y, x] = True
+            while stack:
+                cy, cx = stack.pop()
+                y0, y1, x0, x1 = min(y0, cy), max(y1, cy), min(x0, cx), max(x1, cx)
+                for ny, nx in ((cy - 1, cx), (cy + 1, cx), (cy, cx - 1), (cy, cx + 1)):
+                    if 0 <= ny < mask.shape[0] and 0 <= nx < mask.shape[1] and mask[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        stack.append((ny, nx))
+            rects.append((x0 * self.tile, y0 * self.tile, (x1 - x0 + 1) * self.tile, (y1 - y0 + 1) * self.tile))
+        return rects
+
+
+# ========== 모니터링 스케줄러 ==========
+MIN_POLL_PERIOD = 1.0  # 쌍별 검사 주기 최솟값 (초)
+
+
+def pair_key(pair):
+    """쌍별 런타임 상태를 보관할 키 (저장되는 쌍 id, id 가 없으면 객체 id)"""
+    return pair.get("id") or id(pair)
+
+
+class PairScheduler:
+    """쌍별 검사 주기/우선순위에 따라 지금 검사할 쌍을 고르고 반응 지연을 기록"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.states = {}  # pair_key(pair) -> 상태 dict
+        self.last_batch_time = 0.0  # 마지막 묶음 검사에 걸린 시간 (초)
+
+    @staticmethod
+    def period_of(pair, default_period):
+        return max(float(pair.get("poll_period") or default_period), MIN_POLL_PERIOD)
+
+    def _state(self, pair, default_period, now):
+        state = self.states.get(pair_key(pair))
+        if state is None:
+            # 첫 검사도 주기만큼 기다린 뒤 실행 (기존 '첫 검사 전 대기' 동작 유지)
+            state = {"next_due": now + self.period_of(pair, default_period), "armed_at": now,
+                     "last_check": None, "worst_gap": 0.0, "checks": 0}
+            self.states[pair_key(pair)] = state
+        return state
+
+    def reset(self):
+        self.states.clear()
+
+    def prune(self, pairs):
+        """현재 목록에 없는 (삭제된) 쌍의 상태 정리"""
+        keys = {pair_key(pair) for pair in pairs}
+        for key in [key for key in self.states if key not in keys]:
+            del self.states[key]
+
+    def due(self, armed, default_period, now=None):
+        """armed [(번호, 쌍)] 중 검사 시각이 된 것을 우선순위(높은 순) -> 목록 순서로 반환"""
+        now = self.clock() if now is None else now
+        due = [(idx, pair) for idx, pair in armed
+               if self._state(pair, default_period, now)["next_due"] <= now]
+        return sorted(due, key=lambda item: (-int(item[1].get("priority", 0)), item[0]))
+
+    def time_until_next(self, armed, default_period, now=None):
+        now = self.clock() if now is None else now
+        if not armed:
+            return default_period
+        return max(0.0, min(self._state(pair, default_period, now)["next_due"] for _, pair in armed) - now)
+
+    def reschedule(self, armed, default_period):
+        """기본 주기가 바뀌면 다음 검사 시각을 (마지막 검사 시각 + 새 주기)로 다시 계산"""
+        for _, pair in armed:
+            state = self.states.get(pair_key(pair))
+            if state is not None:
+                base = state["last_check"] if state["last_check"] is not None else state["armed_at"]
+                state["next_due"] = base + self.period_of(pair, default_period)
+
+    def mark_checked(self, pair, default_period, now=None):
+        now = self.clock() if now is None else now
+        state = self._state(pair, default_period, now)
+        if state["last_check"] is not None:
+            state["worst_gap"] = max(state["worst_gap"], now - state["last_check"])
+        state["last_check"] = now
+        state["checks"] += 1
+        state["next_due"] = now + self.period_of(pair, default_period)
+
+    def latency_report(self, armed, default_period):
+        """쌍별 (번호, 주기, 최악 반응 지연 상한, 실측 최대 검사 간격) 목록"""
+        report = []
+        for idx, pair in armed:
+            state = self.states.get(pair_key(pair), {})
+            period = self.period_of(pair, default_period)
+            report.append({
+                "index": idx,
+                "period": period,
+                # 트리거가 검사 직후 나타나면 다음 검사(주기) + 앞선 묶음 검사 처리 시간만큼 늦게 반응
+                "bound": period + self.last_batch_time,
+                "worst_gap": state.get("worst_gap", 0.0),
+                "checks": state.get("checks", 0)
+            })
+        return report
+
+
+# ========== 연속 동작 (후속 쌍) ==========
+CHAIN_TIMEOUT = 1.0        # 후속 쌍 기본 제한 시간 (초)
+CHAIN_POLL_INTERVAL = 0.2  # 후속 쌍 반복 검사 간격 (초)
+CHAIN_CLICK_WAIT = 5.0     # 앞 단계 클릭 실행을 (동작 전 대기 + 안정화 대기 외에) 더 기다리는 여유 (초)
+
+
+def new_pair_id():
+    return uuid.uuid4().hex[:8]
+
+
+def ensure_pair_ids(pairs):
+    """id 가 없거나 겹치는 쌍에 새 id 부여 (후속 쌍 연결은 순서가 아닌 id 로 지정). 바뀐 번호 목록 반환"""
+    seen = set()
+    changed = []
+    for idx, pair in enumerate(pairs):
+        if not pair.get("id") or pair["id"] in seen:
+            pair["id"] = new_pair_id()
+            changed.append(idx)
+        seen.add(pair["id"])
+    return changed
+
+
+def successor_links(pair):
+    """쌍의 후속 목록 [{"id": ..., "timeout": 초}, ...]"""
+    return [{"id": link["id"], "timeout": float(link.get("timeout", CHAIN_TIMEOUT))}
+            for link in pair.get("successors", []) if link.get("id")]
+
+
+def chained_ids(pairs):
+    """다른 쌍의 후속으로 지정된 쌍 id (선행 쌍이 클릭해야만 검사)"""
+    return {link["id"] for pair in pairs for link in successor_links(pair) if link["id"] != pair.get("id")}
+
+
+def creates_cycle(pairs, source_id, successor_ids):
+    """source 의 후속을 successor_ids 로 바꾸면 순환이 생기는지 (후속을 따라가다 source 로 돌아오는지)"""
+    links = {pair.get("id"): [link["id"] for link in successor_links(pair)] for pair in pairs}
+    links[source_id] = list(successor_ids)
+    stack, visited = list(successor_ids), set()
+    while stack:
+        current = stack.pop()
+        if current == source_id:
+            return True
+        if current in visited:
+            continue
+        visited.add(current)
+        stack.extend(links.get(current, []))
+    return False
+
+
+def remove_successor_refs(pairs, removed_id):
+    """삭제된 쌍을 후속으로 가리키던 쌍에서 연결 제거. 바뀐 번호 목록 반환"""
+    changed = []
+    for idx, pair in enumerate(pairs):
+        links = pair.get("successors", [])
+        kept = [link for link in links if link.get("id") != removed_id]
+        if len(kept) != len(links):
+            if kept:
+                pair["successors"] = kept
+            else:
+                pair.pop("successors", None)
+            changed.append(idx)
+    return changed
+
+
+# ========== 실행 로그 ==========
+LOG_QUEUE_SIZE = 2000        # 화면에 아직 표시하지 않은 로그 줄 최대 개수
+LOG_FILE_MAX_BYTES = 1000000
+LOG_FILE_BACKUPS = 3
+
+
+class LogPipeline:
+    """작업 스레드 -> UI 로그 통로. 줄을 제한된 큐에 모아 두면 UI 가 타이머로 한꺼번에 가져간다.
+    모든 줄은 회전 로그 파일에도 남기므로, 큐가 넘쳐 화면에 못 보여준 줄이나 화면에서 잘라낸 줄도 파일에서 확인 가능"""
+
+    def __init__(self, log_file=None, maxsize=LOG_QUEUE_SIZE, max_bytes=LOG_FILE_MAX_BYTES,
+                 backups=LOG_FILE_BACKUPS, echo=True):
+        self.log_file = log_file
+        self.maxsize = maxsize
+        self.echo = echo  # 콘솔에도 출력
+        self.dropped = 0  # 큐가 가득 차 화면 표시를 건너뛴 줄 수 (drain 때 초기화)
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._file_log = None
+        if log_file:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backups,
+                                                               encoding="utf-8", delay=True)
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+                self._file_log = logging.Logger("click_click.log")
+                self._file_log.addHandler(handler)
+            except Exception as e:
+                print(f"로그 파일 설정 오류: {e}")
+
+    def put(self, message):
+        """로그 한 줄 추가 (어느 스레드에서나 호출 가능, 막히지 않음)"""
+        line = f"[{time.strftime('%H:%M:%S')}] {message}"
+        with self._lock:
+            if len(self._queue) < self.maxsize:
+                self._queue.append(line)
+            else:
+                self.dropped += 1
+        if self._file_log is not None:
+            self._file_log.info(message)
+        if self.echo:
+            print(message)
+
+    def drain(self, limit=500):
+        """쌓인 줄을 최대 limit 개 꺼냄 -> (줄 목록, 그 사이 넘쳐서 건너뛴 줄 수)"""
+        with self._lock:
+            count = min(limit, len(self._queue))
+            lines = [self._queue.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+        return lines, dropped
+
+    def close(self):
+        if self._file_log is not None:
+            for handler in list(self._file_log.handlers):
+                handler.close()
+                self._file_log.removeHandler(handler)
+
+
+# ========== 모니터링 사이클 ==========
+def pair_confidence(pair, key, settings):
+    """쌍에 저장된 trigger/target 정밀도(보정 결과)가 있으면 그 값, 없으면 프로필 공통 값"""
+    return pair.get(f"{key}_confidence") or settings[f"{key}_conf"]
+
+
+class MonitorMetrics:
+    """모니터링 측정값 링 버퍼 (검색마다 캡처/매칭 시간과 점수, 사이클마다 소요 시간). 여러 스레드에서 기록/조회"""
+    FIELDS = ("time", "event", "pair", "key", "search", "found", "score", "scale", "grab_ms", "match_ms",
+              "cycle_ms", "checked")
+
+    def __init__(self, maxlen=5000):
+        self.records = deque(maxlen=maxlen)
+        self.version = 0  # 기록될 때마다 증가 (화면 갱신 여부 판단용)
+        self._lock = threading.Lock()
+
+    def _append(self, record):
+        record["time"] = round(time.time(), 3)
+        with self._lock:
+            self.records.append(record)
+            self.version += 1
+
+    def record_search(self, idx, key, result, search, grab_ms):
+        """검색 1회 기록 (search: "memo"|"roi"|"full"|"dirty"|"cached", 재사용한 결과는 매칭 시간 0). 쌍 번호는 1부터"""
+        self._append({"event": "search", "pair": None if idx is None else idx + 1, "key": key, "search": search, "found": bool(result.found),
+                      "score": round(float(result.score), 4), "scale": result.scale, "grab_ms": round(grab_ms, 2),
+                      "match_ms": 0.0 if search == "cached" else round(result.elapsed * 1000, 2)})
+
+    def record_cycle(self, cycle_ms, grab_ms, checked):
+        """사이클(화면 1회 캡처 + 그 화면의 검사/클릭) 1회 기록"""
+        self._append({"event": "cycle", "cycle_ms": round(cycle_ms, 2), "grab_ms": round(grab_ms, 2),
+                      "checked": checked})
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.version += 1
+
+    def pair_summary(self, key="trigger"):
+        """쌍 번호(1부터) -> {검사 수, 발견률, 최고/평균 점수, 평균/최대 매칭 시간(재사용 제외), 재사용 수}"""
+        stats = {}
+        for r in self.snapshot():
+            if r["event"] != "search" or r["key"] != key:
+                continue
+            s = stats.setdefault(r["pair"], {"checks": 0, "hits": 0, "cached": 0, "best_score": 0.0,
+                                             "score_sum": 0.0, "match_ms": []})
+            s["checks"] += 1
+            s["hits"] += r["found"]
+            s["best_score"] = max(s["best_score"], r["score"])
+            s["score_sum"] += r["score"]
+            if r["search"] == "cached":
+                s["cached"] += 1
+            else:
+                s["match_ms"].append(r["match_ms"])
+        summary = {}
+        for idx, s in sorted(stats.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+            times = s.pop("match_ms")
+            summary[idx] = {"checks": s["checks"], "hits": s["hits"], "cached": s["cached"],
+                            "hit_rate": s["hits"] / s["checks"], "best_score": s["best_score"],
+                            "mean_score": s.pop("score_sum") / s["checks"],
+                            "mean_match_ms": sum(times) / len(times) if times else 0.0,
+                            "max_match_ms": max(times, default=0.0)}
+        return summary
+
+    def cycle_summary(self):
+        """사이클 수와 평균/최대 사이클 시간, 평균 캡처 시간"""
+        cycles = [r for r in self.snapshot() if r["event"] == "cycle"]
+        if not cycles:
+            return {"cycles": 0, "mean_cycle_ms": 0.0, "max_cycle_ms": 0.0, "mean_grab_ms": 0.0}
+        return {"cycles": len(cycles),
+                "mean_cycle_ms": sum(r["cycle_ms"] for r in cycles) / len(cycles),
+                "max_cycle_ms": max(r["cycle_ms"] for r in cycles),
+                "mean_grab_ms": sum(r["grab_ms"] for r in cycles) / len(cycles)}
+
+    def export_csv(self, path):
+        """기록 전체를 CSV 로 저장. 저장한 행 수 반환"""
+        records = self.snapshot()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        return len(records)
+
+    def export_jsonl(self, path):
+        """기록 전체를 한 줄에 하나씩 JSON 으로 저장. 저장한 행 수 반환"""
+        records = self.snapshot()
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(records)
+
+    def export(self, path):
+        """확장자(.csv / .jsonl)에 맞는 형식으로 저장"""
+        if path.lower().endswith(".csv"):
+            return self.export_csv(path)
+        return self.export_jsonl(path)
+
+
+MIN_MONITOR_INTERVAL = 5.0  # 기본 검사 간격 최솟값 (초)
+
+
+def _confidence(value):
+    value = float(value)
+    if not 0.1 <= value <= 1.0:
+        raise ValueError("정밀도는 0.1 ~ 1.0 사이 값이어야 합니다")
+    return value
+
+
+def _non_negative_int(value):
+    value = int(value)
+    if value < 0:
+        raise ValueError("0 이상의 정수여야 합니다")
+    return value
+
+
+def _finite_float(value):
+    """float 변환 ("nan", "inf" 는 비교/시간 계산을 망가뜨리므로 거부)"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"유한한 숫자여야 합니다: {value}")
+    return value
+
+
+def _non_negative_float(value):
+    value = _finite_float(value)
+    if value < 0:
+        raise ValueError("0 이상의 값이어야 합니다")
+    return value
+
+
+def _scan_mode(value):
+    if value not in ("scheduled", "sequential"):
+        raise ValueError(f"알 수 없는 검사 모드: {value}")
+    return value
+
+
+class MonitorSettings:
+    """모니터링 설정값. UI 스레드가 검증 후 바꾸고, 모니터링 스레드는 snapshot() 으로 한 번에 읽는다.
+    값이 바뀌면 changed 이벤트가 켜져 대기 중인 모니터링 루프가 바로 깨어난다"""
+    # 키 -> (검증/정규화 함수, 기본값, 프로필 키)
+    RULES = {
+        "interval": (lambda v: max(_finite_float(v), MIN_MONITOR_INTERVAL), 5.0, "monitoring_interval"),
+        "trigger_conf": (_confidence, 0.8, "trigger_confidence"),
+        "target_conf": (_confidence, 0.9, "target_confidence"),
+        "scan_mode": (_scan_mode, "scheduled", "scan_mode"),
+        "roi_margin": (_non_negative_int, 200, "roi_margin"),
+        "pyramid_levels": (_non_negative_int, 2, "pyramid_levels"),
+        "change_detection": (bool, True, "change_detection"),
+        "match_workers": (_non_negative_int, 0, "match_workers"),  # 0: CPU 수에 맞춰 자동
+        "match_scales": (parse_scales, [1.0], "match_scales"),  # 화면 배율(DPI)이 달라도 찾도록 시도할 배율 목록
+        "post_click_settle": (_non_negative_float, 2.0, "post_click_settle"),  # 클릭 후 다음 클릭까지 화면 반응 대기 (초)
+        "click_cooldown": (_non_negative_float, 2.0, "click_cooldown"),  # 같은 쌍을 다시 클릭하지 않는 시간 (초)
+    }
+
+    def __init__(self, values=None):
+        self._values = {key: default for key, (_, default, _) in self.RULES.items()}
+        self._lock = threading.Lock()
+        self.changed = threading.Event()
+        self.version = 0
+        if values:
+            self.update(values)
+
+    @classmethod
+    def validate(cls, key, value):
+        """검증된(정규화된) 값 반환, 잘못된 값이면 ValueError"""
+        if key not in cls.RULES:
+            raise ValueError(f"알 수 없는 설정: {key}")
+        try:
+            return cls.RULES[key][0](value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{key}: {e}") from None
+
+    def update(self, values):
+        """여러 값을 검증한 뒤 한꺼번에 반영 (하나라도 잘못되면 아무것도 바꾸지 않음). 바뀐 키 목록 반환"""
+        normalized = {key: self.validate(key, value) for key, value in values.items()}
+        with self._lock:
+            changed = [key for key, value in normalized.items() if self._values[key] != value]
+            self._values.update(normalized)
+            if changed:
+                self.version += 1
+                self.changed.set()
+        return changed
+
+    def load_profile(self, profile, log=print):
+        """프로필에 저장된 값 반영 (잘못 저장된 값은 기본값으로)"""
+        values = {}
+        for key, (_, default, profile_key) in self.RULES.items():
+            try:
+                values[key] = self.validate(key, profile.get(profile_key, default))
+            except ValueError as e:
+                log(f"설정값 오류 - {e} (기본값 사용)")
+                values[key] = default
+        self.update(values)
+
+    def snapshot(self):
+        """모든 값의 복사본 (한 사이클 동안 이 값으로 검사)"""
+        with self._lock:
+            return dict(self._values)
+
+    def consume_change(self):
+        """마지막 확인 이후 값이 바뀌었는지 반환하고 표시 해제"""
+        changed = self.changed.is_set()
+        self.changed.clear()
+        return changed
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._values[key]
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+
+class ActionExecutor:
+    """트리거를 찾은 쌍의 동작(동작 전 대기 -> 새 화면에서 재확인 -> 클릭)을 검사 스레드와 따로 차례로 실행.
+    클릭한 뒤 settle 초 동안은 다음 동작을 시작하지 않아 화면이 반응할 시간을 주고 (검사는 그동안에도 계속),
+    쌍마다 동작이 예약돼 있거나 클릭한 뒤 cooldown 초가 지나기 전에는 같은 쌍의 동작을 받지 않음 (중복 클릭 방지).
+    wait 를 주면 작업 스레드 없이 run_pending()/wait_clicked() 를 부른 스레드에서 실행 (replay 의 가상 시계용)"""
+
+    def __init__(self, log, clock=time.monotonic, wait=None):
+        self.log = log
+        self.clock = clock
+        self.wait = wait    # (초) -> 중단되지 않았으면 True (작업 스레드 없이 실행할 때만)
+        self.executed = 0   # 실제로 클릭한 동작 수
+        self.missed = 0     # 재확인에서 트리거/타겟이 없어 클릭하지 않은 동작 수
+        self.rejected = 0   # 예약/쿨다운 중이라 받지 않은 동작 요청 수
+        self._actions = []         # [(시작 가능 시각, 순번, 쌍 키, 동작, settle, cooldown), ...]
+        self._seq = 0
+        self._pending = {}         # 쌍 키 -> {"done": 실행(또는 취소)되면 켜지는 Event, "clicked": 클릭 여부}
+        self._cooldown_until = {}  # 쌍 키 -> 다시 동작할 수 있는 시각
+        self._free_at = 0.0        # 마지막 클릭의 안정화 대기가 끝나는 시각
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+        if wait is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def ready(self, key):
+        """이 쌍의 동작을 지금 받을 수 있는지 (예약된 동작이 없고 쿨다운이 끝남)"""
+        with self._cond:
+            return key not in self._pending and self.clock() >= self._cooldown_until.get(key, 0.0)
+
+    def submit(self, key, action, delay=0.0, settle=2.0, cooldown=2.0):
+        """동작 예약 (action: () -> 클릭했으면 True, delay 초 뒤부터 실행). 받지 않았으면 False"""
+        with self._cond:
+            if self._closed or key in self._pending or self.clock() < self._cooldown_until.get(key, 0.0):
+                self.rejected += 1
+                return False
+            self._pending[key] = {"done": threading.Event(), "clicked": False}
+            self._seq += 1
+            self._actions.append((self.clock() + delay, self._seq, key, action, settle, cooldown))
+            self._cond.notify()
+        return True
+
+    def wait_clicked(self, key, timeout):
+        """예약된 이 쌍의 동작이 끝날 때까지 최대 timeout 초 대기 -> 클릭했으면 True (예약이 없으면 바로 True)"""
+        with self._cond:
+            state = self._pending.get(key)
+        if state is None:
+            return True
+        if self._thread is None:
+            # 작업 스레드가 없으면 여기서 시간을 넘기며 예약된 동작을 직접 실행
+            deadline = self.clock() + timeout
+            while not state["done"].is_set() and self.clock() < deadline:
+                if self.run_pending():
+                    continue
+                pause = self.time_until_next()
+                if pause is None or not self.wait(min(pause, deadline - self.clock())):
+                    break
+        return state["done"].wait(0 if self._thread is None else timeout) and state["clicked"]
+
+    def _next(self):
+        """(잠금 안에서) 다음 동작과 실제 시작 시각 (이전 클릭의 안정화 대기가 끝난 뒤)"""
+        item = min(self._actions, key=lambda a: a[:2])
+        return item, max(item[0], self._free_at)
+
+    def time_until_next(self):
+        """다음 동작을 시작할 수 있을 때까지 남은 초 (예약이 없으면 None)"""
+        with self._cond:
+            if not self._actions:
+                return None
+            return max(0.0, self._next()[1] - self.clock())
+
+    def _take_due(self):
+        """(잠금 안에서) 시작 시각이 된 동작을 꺼냄 -> (동작, 남은 초)"""
+        item, start = self._next()
+        remaining = start - self.clock()
+        if remaining > 0:
+            return None, remaining
+        self._actions.remove(item)
+        return item, 0.0
+
+    def _execute(self, item):
+        _, _, key, action, settle, cooldown = item
+        clicked = False
+        try:
+            clicked = bool(action())
+        except Exception as e:
+            self.log(f"클릭 동작 오류: {e}")
+        with self._cond:
+            if clicked:
+                self.executed += 1
+                now = self.clock()
+                self._cooldown_until[key] = now + cooldown
+                self._free_at = now + settle
+            else:
+                self.missed += 1
+            state = self._pending.pop(key)
+            state["clicked"] = clicked
+            state["done"].set()
+
+    def run_pending(self):
+        """시작 시각이 된 동작을 모두 이 스레드에서 실행 (작업 스레드가 없을 때). 실행한 수 반환"""
+        count = 0
+        while True:
+            with self._cond:
+                if not self._actions:
+                    return count
+                item, _ = self._take_due()
+            if item is None:
+                return count
+            self._execute(item)
+            count += 1
+
+    def cancel(self):
+        """아직 실행하지 않은 동작 예약을 모두 취소"""
+        with self._cond:
+            items, self._actions = self._actions, []
+            for item in items:
+                self._pending.pop(item[2])["done"].set()
+        return len(items)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._actions and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                item, remaining = self._take_due()
+                if item is None:
+                    # 기다리는 동안 더 이른 동작이 예약되면 깨어나 다시 고름
+                    self._cond.wait(remaining)
+                    continue
+            self._execute(item)
+
+    def close(self, timeout=5.0):
+        """남은 예약을 취소하고 작업 스레드 종료"""
+        self.cancel()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class MonitorEngine:
+    """트리거 -> 대기 -> 타겟 -> 클릭 판단 로직 (화면 캡처/클릭/대기/로그 함수는 외부에서 주입)"""
+
+    def __init__(self, grab, click, wait, log, matcher=None, clock=time.monotonic, pool=None, observer=None,
+                 metrics=None, actions=None):
+        self.grab = grab      # () -> (H, W, 3) 화면 배열
+        self.click = click    # ((x, y)) -> None
+        self.actions = actions  # ActionExecutor (없으면 검사 스레드에서 대기/타겟 검색/클릭을 바로 실행)
+        self.wait = wait      # (초) -> 중단되지 않았으면 True
+        self.log = log        # (메시지) -> None
+        self.observer = observer  # (사건, 쌍 번호, MatchResult) -> None ("trigger_checked", "target_miss", "click")
+        self.clock = clock
+        self.metrics = metrics if metrics is not None else MonitorMetrics()
+        self.matcher = matcher or TemplateMatcher()
+        self.pool = pool or MatchPool(1, self.matcher.backend)
+        self.scheduler = PairScheduler(clock)
+        self.detector = FrameChangeDetector()
+        self._trigger_cache = {}  # pair_key(pair) -> 마지막 트리거 검사 결과와 그때의 generation
+        self.frames_skipped = 0   # 화면 변화가 없어 매칭을 건너뛴 캡처 수
+        self.tiles_rescanned = 0  # 바뀐 타일만 다시 검사한 타일 수 (누적)
+        self.grab_count = 0
+        self.memo = HitMemo()
+        self.memo_hits = 0      # 기억한 발견 위치 확인만으로 찾은 횟수
+        self.roi_hits = 0       # 기록된 위치 주변에서 찾은 횟수
+        self.full_searches = 0  # 전체 화면 검색으로 넘어간 횟수
+        self.chain_clicks = 0   # 선행 쌍 클릭 직후 후속 쌍으로 이어서 클릭한 횟수
+        self.last_grab_ms = 0.0  # 마지막 화면 캡처(+매칭 준비)에 걸린 시간
+
+    def _notify(self, event, idx, result):
+        if self.observer is not None:
+            self.observer(event, idx, result)
+
+    def _grab(self):
+        self.grab_count += 1
+        started = time.perf_counter()
+        frame = self.matcher.prepare(self.grab())
+        self.last_grab_ms = (time.perf_counter() - started) * 1000
+        if self.detector.update(frame.frame) == 0:
+            self.frames_skipped += 1
+        return frame
+
+    @staticmethod
+    def _pixels(pair, key):
+        """캐시된 TemplateEntry 가 있으면 그것을, 없으면 원본 배열 반환"""
+        info = pair.get(key) or {}
+        entry = info.get("_template")
+        return entry if entry is not None else info.get("_pixels")
+
+    def _ready(self, pair):
+        return self._pixels(pair, "trigger") is not None and self._pixels(pair, "target") is not None
+
+    def armed_pairs(self, pairs):
+        """트리거/타겟 이미지가 모두 준비된 (번호, 쌍) 목록 (다른 쌍의 후속으로 지정된 쌍은 제외)"""
+        waiting = chained_ids(pairs)
+        return [(idx, pair) for idx, pair in enumerate(pairs)
+                if self._ready(pair) and pair.get("id") not in waiting]
+
+    def follow_chain(self, pairs, settings, idx, pair):
+        """클릭한 쌍의 후속 쌍들을 각자의 제한 시간 동안 곧바로 반복 검사 (후속의 후속도 이어서). 중단되면 None"""
+        by_id = {p.get("id"): (i, p) for i, p in enumerate(pairs) if p.get("id") and self._ready(p)}
+        deadlines = {}
+
+        def arm(i, p):
+            links = [link for link in successor_links(p) if link["id"] in by_id]
+            if links and self.actions is not None:
+                # 앞 단계 클릭이 실제로 실행된 뒤부터 후속 쌍의 제한 시간을 잰다
+                timeout = p.get("action_delay", 0) + settings["post_click_settle"] + CHAIN_CLICK_WAIT
+                if not self.actions.wait_clicked(self._action_key(i, p), timeout):
+                    self.log(f"  -> #{i+1} 클릭이 실행되지 않아 다음 단계를 검사하지 않음")
+                    return
+            for link in links:
+                deadlines[link["id"]] = self.clock() + link["timeout"]
+                self.log(f"  -> #{i+1} 다음 단계 #{by_id[link['id']][0]+1} 검사 (최대 {link['timeout']}초)")
+
+        arm(idx, pair)
+        while deadlines:
+            now = self.clock()
+            for sid in [sid for sid, deadline in deadlines.items() if deadline < now]:
+                self.log(f"#{by_id[sid][0]+1} 다음 단계를 제한 시간 안에 찾지 못함")
+                del deadlines[sid]
+            if not deadlines:
+                break
+            items = [by_id[sid] for sid in deadlines]
+            frame = self._grab()
+            results = self.search_triggers(frame, items, settings)
+            fired = False
+            for i, p in items:
+                if not results[i].found:
+                    continue
+                clicked = self._handle_trigger(i, p, results[i], frame, settings)
+                if clicked is None:
+                    return None
+                if clicked:
+                    self.chain_clicks += 1
+                    del deadlines[p["id"]]
+                    arm(i, p)
+                    fired = True
+                    break
+            if not fired and not self.wait(CHAIN_POLL_INTERVAL):
+                return None
+        return True
+
+    def _search_job(self, pair, key, confidence, settings, idx):
+        """MatchPool 에 넘길 검색 작업 (배율은 마지막으로 찾은 배율부터)"""
+        info = pair[key]
+        return SearchJob(idx, self._pixels(pair, key), confidence,
+                         search_anchors(info, pair.get("search_mode", "roi")), settings.get("roi_margin", 200),
+                         ordered_scales(settings.get("match_scales", [1.0]), info.get("last_scale")),
+                         TemplateCache.key_for(info))
+
+    def _record_search(self, idx, key, info, result, kind):
+        if kind == "memo":
+            self.memo_hits += 1
+        elif kind == "roi":
+            self.roi_hits += 1
+        else:
+            self.full_searches += 1
+        self.metrics.record_search(idx, key, result, kind, self.last_grab_ms)
+        if result.found:
+            self._remember_hit(info, result)
+
+    def _remember_hit(self, info, result):
+        """발견 위치와 배율 기록 (다음 검사에서 이 위치/배율부터 시도)"""
+        with LEARNED_LOCK:
+            info["last_hit"] = {"left": result.left, "top": result.top}
+            if result.scale != 1.0 or "last_scale" in info:
+                info["last_scale"] = result.scale
+            self.memo.record(info, result)
+
+    def _verify_memo(self, frame, pair, key, confidence, idx):
+        """기억한 발견 위치만 먼저 확인 (찾으면 검색 기록까지). 못 찾으면 None"""
+        result = self.memo.verify(self.matcher, frame, self._pixels(pair, key), confidence, idx, pair[key])
+        if result is not None:
+            self._record_search(idx, key, pair[key], result, "memo")
+        return result
+
+    def search(self, frame, pair, key, confidence, settings, idx=None):
+        """쌍의 trigger/target 템플릿 검색: 기억한 발견 위치 확인 -> 마지막 발견 위치 주변 -> 캡처 위치 주변 -> 전체 화면 순서"""
+        started = time.perf_counter()
+        result = self._verify_memo(frame, pair, key, confidence, idx)
+        if result is not None:
+            return result
+        memo_elapsed = time.perf_counter() - started
+        job = self._search_job(pair, key, confidence, settings, idx)
+        result, kind = run_search(self.matcher, frame, job.templ, confidence, idx, job.anchors, job.margin, job.scales)
+        result.elapsed += memo_elapsed
+        self._record_search(idx, key, pair[key], result, kind)
+        return result
+
+    def search_trigger(self, frame, pair, settings, idx=None):
+        """트리거 검색 (화면 변화 감지 사용 시 바뀐 타일과 겹치는 부분만 다시 검사)"""
+        result = self.cached_trigger(frame, pair, settings, idx)
+        if result is None:
+            result = self.search(frame, pair, "trigger", pair_confidence(pair, "trigger", settings), settings, idx)
+        self._remember_trigger(pair, result, settings)
+        return result
+
+    def search_triggers(self, frame, items, settings):
+        """여러 쌍의 트리거 검색. 화면 변화나 기억한 발견 위치로 판단할 수 없는 쌍만 MatchPool 로 나눠 검색 -> {번호: 결과}"""
+        results = {}
+        jobs = []
+        for idx, pair in items:
+            result = self.cached_trigger(frame, pair, settings, idx)
+            if result is None:
+                result = self._verify_memo(frame, pair, "trigger",
+                                           pair_confidence(pair, "trigger", settings), idx)
+            if result is None:
+                jobs.append((idx, pair))
+            else:
+                results[idx] = result
+        found = self.pool.search_many(self.matcher, frame, [
+            self._search_job(pair, "trigger", pair_confidence(pair, "trigger", settings), settings, idx)
+            for idx, pair in jobs])
+        for (idx, pair), (result, kind) in zip(jobs, found):
+            self._record_search(idx, "trigger", pair["trigger"], result, kind)
+            results[idx] = result
+        for idx, pair in items:
+            self._remember_trigger(pair, results[idx], settings)
+            self._notify("trigger_checked", idx, results[idx])
+        return results
+
+    def _remember_trigger(self, pair, result, settings):
+        self._trigger_cache[pair_key(pair)] = {"generation": self.detector.generation,
+                                               "templ": self._pixels(pair, "trigger"),
+                                               "conf": pair_confidence(pair, "trigger", settings),
+                                               "scales": settings.get("match_scales", [1.0]), "result": result}
+
+    def cached_trigger(self, frame, pair, settings, idx=None):
+        """화면 변화 감지로 결정할 수 있는 트리거 결과 (이전 결과 재사용/바뀐 영역만 검색), 판단할 수 없으면 None"""
+        confidence = pair_confidence(pair, "trigger", settings)
+        cache = self._trigger_cache.get(pair_key(pair))
+        result = None
+        scales = settings.get("match_scales", [1.0])
+        # 같은 id 라도 편집으로 트리거 이미지가 바뀌었으면 이전 결과는 쓰지 않음
+        if (cache and cache["templ"] is self._pixels(pair, "trigger") and cache["conf"] == confidence
+                and cache["scales"] == scales and settings.get("change_detection", True)):
+            info = pair["trigger"]
+            previous = cache["result"]
+            mask = self.detector.dirty_mask(cache["generation"])
+            dirty_tiles = int(mask.sum())
+            box = (previous.left, previous.top, previous.width, previous.height)
+            if dirty_tiles == 0:
+                result = previous
+            elif dirty_tiles * 2 < mask.size:
+                self.tiles_rescanned += dirty_tiles
+                rects = self.detector.dirty_rects(cache["generation"])
+                if previous.found and not any(_rects_overlap(box, r) for r in rects):
+                    result = previous
+                elif not previous.found:
+                    # 새로 나타난 트리거는 반드시 바뀐 픽셀과 겹치므로 더티 영역(+템플릿 크기)만 검색
+                    started = time.perf_counter()
+                    result = None
+                    for scale, templ in scaled_templates(self._pixels(pair, "trigger"),
+                                                         ordered_scales(scales, info.get("last_scale"))):
+                        th, tw = templ.shape[:2]
+                        if result is None:
+                            result = MatchResult(idx, 0, 0, tw, th, 0.0, False)
+                        for left, top, width, height in rects:
+                            candidate = self.matcher.locate(frame, templ, confidence, key=idx,
+                                                            roi=(left - tw, top - th, width + 2 * tw, height + 2 * th))
+                            candidate.scale = scale
+                            if candidate.score > result.score:
+                                result = candidate
+                        if result.found:
+                            self._remember_hit(info, result)
+                            break
+                    result.elapsed = time.perf_counter() - started
+            if result is not None:
+                self.metrics.record_search(idx, "trigger", result, "cached" if result is previous else "dirty",
+                                           self.last_grab_ms)
+        return result
+
+    def apply_settings(self, settings):
+        """사이클마다 바뀔 수 있는 매칭 설정 반영"""
+        self.matcher.pyramid_levels = settings.get("pyramid_levels", self.matcher.pyramid_levels)
+        workers = settings.get("match_workers") or MatchPool.default_workers()
+        if workers != self.pool.workers:
+            self.pool.close()
+            self.pool = MatchPool(workers, self.matcher.backend)
+
+    def settings_changed(self, pairs, settings):
+        """모니터링 중 설정이 바뀌면 바로 반영 (새 검사 간격으로 다음 검사 시각 재계산)"""
+        self.apply_settings(settings)
+        self.scheduler.reschedule(self.armed_pairs(pairs), settings["interval"])
+
+    def close(self):
+        """작업자 풀 정리"""
+        self.pool.close()
+
+    def forget_removed(self, pairs):
+        """목록에서 빠진 쌍의 런타임 상태 정리 (사이클 시작마다 호출)"""
+        self.scheduler.prune(pairs)
+        keys = {pair_key(pair) for pair in pairs}
+        for key in [key for key in self._trigger_cache if key not in keys]:
+            del self._trigger_cache[key]
+
+    def run_batch_cycle(self, pairs, settings, selected=None):
+        """화면을 한 번 캡처해 모든(또는 selected) 트리거를 검사하고 발견된 쌍을 순서대로 처리"""
+        self.apply_settings(settings)
+        self.forget_removed(pairs)
+        pending = list(selected) if selected is not None else self.armed_pairs(pairs)
+        while pending:
+            started = time.perf_counter()
+            frame = self._grab()
+            grab_ms = self.last_grab_ms
+            for _, pair in pending:
+                self.scheduler.mark_checked(pair, settings["interval"])
+            # 같은 화면의 트리거들은 서로 독립적이므로 한꺼번에 (작업자 풀로) 검색
+            results = self.search_triggers(frame, pending, settings)
+            remaining = pending
+            pending = []
+            for pos, (idx, pair) in enumerate(remaining):
+                result = results[idx]
+                if not result.found:
+                    continue
+                clicked = self._handle_trigger(idx, pair, result, frame, settings)
+                if clicked is None:
+                    return False
+                if clicked:
+                    # 후속 쌍이 있으면 전체 주기를 기다리지 않고 바로 이어서 검사
+                    if self.follow_chain(pairs, settings, idx, pair) is None:
+                        return False
+                    if self.actions is None:
+                        # 클릭으로 화면이 바뀌었으므로 남은 트리거는 새 화면에서 다시 검사
+                        pending = remaining[pos + 1:]
+                        break
+                    # 예약한 동작은 실행 직전에 새 화면에서 트리거/타겟을 다시 확인하므로 이 화면의 나머지도 그대로 처리
+            self.metrics.record_cycle((time.perf_counter() - started) * 1000, grab_ms, len(remaining))
+        return True
+
+    def run_scheduled_step(self, pairs, settings):
+        """검사 시각이 된 쌍들을 화면 1회 캡처로 묶어 검사. 다음 검사까지 남은 시간(초) 반환, 중단되면 None"""
+        self.forget_removed(pairs)
+        armed = self.armed_pairs(pairs)
+        due = self.scheduler.due(armed, settings["interval"])
+        if due:
+            started = self.clock()
+            if not self.run_batch_cycle(pairs, settings, selected=due):
+                return None
+            self.scheduler.last_batch_time = self.clock() - started
+        return self.scheduler.time_until_next(armed, settings["interval"])
+
+    def latency_summary(self, pairs, settings):
+        """쌍별 최악 반응 지연 요약 문자열"""
+        report = self.scheduler.latency_report(self.armed_pairs(pairs), settings["interval"])
+        return ", ".join(f"#{r['index']+1} {r['bound']:.1f}s(실측 {r['worst_gap']:.1f}s)" for r in report)
+
+    def run_sequential_cycle(self, pairs, settings):
+        """(호환 모드) 쌍마다 간격만큼 대기한 뒤 화면을 새로 캡처해 검사"""
+        self.apply_settings(settings)
+        self.forget_removed(pairs)
+        for idx, pair in self.armed_pairs(pairs):
+            interval = settings["interval"]
+            self.log(f"#{idx+1} 검사 전 {interval}초 대기...")
+            if not self.wait(interval):
+                return False
+            started = time.perf_counter()
+            frame = self._grab()
+            result = self.search(frame, pair, "trigger", pair_confidence(pair, "trigger", settings), settings, idx)
+            self._notify("trigger_checked", idx, result)
+            if result.found:
+                clicked = self._handle_trigger(idx, pair, result, frame, settings)
+                if clicked is None or (clicked and self.follow_chain(pairs, settings, idx, pair) is None):
+                    return False
+            self.metrics.record_cycle((time.perf_counter() - started) * 1000, self.last_grab_ms, 1)
+        return True
+
+    @staticmethod
+    def _action_key(idx, pair):
+        return pair.get("id") or idx
+
+    def _handle_trigger(self, idx, pair, result, frame, settings):
+        """트리거 발견 후 처리. 클릭했으면(동작을 예약했으면) True, 타겟 미발견/쿨다운 중 False, 중단되면 None"""
+        key = self._action_key(idx, pair)
+        if self.actions is not None and not self.actions.ready(key):
+            return False  # 이 쌍의 동작이 아직 실행 전이거나 쿨다운 중
+        self.log(f"#{idx+1} 트리거 발견! (일치도 {result.score:.2f})")
+        action_delay = pair.get("action_delay", 0)
+        if self.actions is not None:
+            if action_delay > 0:
+                self.log(f"  -> {action_delay}초 뒤 타겟 확인 (설정값)...")
+            return self.actions.submit(key, lambda: self._click_target(idx, pair, settings, result), action_delay,
+                                       settings["post_click_settle"], settings["click_cooldown"])
+        if action_delay > 0:
+            self.log(f"  -> {action_delay}초 대기 (설정값)...")
+            if not self.wait(action_delay):
+                return None
+            frame = self._grab()
+        return self._click_target(idx, pair, settings, frame=frame)
+
+    def _still_there(self, frame, pair, key, result, confidence):
+        """앞서 찾은 위치(배율 포함)에 템플릿이 아직 있는지만 확인 (검색 기록은 남기지 않음)"""
+        slack = self.memo.slack
+        for _, scaled in scaled_templates(self._pixels(pair, key), [result.scale]):
+            th, tw = scaled.shape[:2]
+            roi = (result.left - slack, result.top - slack, tw + 2 * slack, th + 2 * slack)
+            if self.matcher.locate(frame, scaled, confidence, roi=roi).found:
+                return True
+        return False
+
+    def _click_target(self, idx, pair, settings, trigger=None, frame=None):
+        """타겟을 찾아 클릭하고 True, 못 찾으면 False.
+        frame 이 없으면(예약된 동작) 지금 화면을 새로 캡처해 트리거가 그 자리에 아직 있는지부터 확인"""
+        if frame is None:
+            frame = self.matcher.prepare(self.grab())  # 검사 스레드의 화면 변화 감지와는 별개로 캡처
+            if trigger is not None and not self._still_there(frame, pair, "trigger", trigger,
+                                                             pair_confidence(pair, "trigger", settings)):
+                self.log(f"#{idx+1} 클릭 전 트리거가 사라져 취소")
+                return False
+        target = self.search(frame, pair, "target", pair_confidence(pair, "target", settings), settings, idx)
+        if not target.found:
+            self.log(f"#{idx+1} 트리거는 찾았으나 타겟 미발견")
+            self._notify("target_miss", idx, target)
+            return False
+        self._notify("click", idx, target)
+        self.click(click_point(pair["target"], target))
+        self.log(f"#{idx+1} 타겟 클릭 완료!")
+        return True
+
+
+# ========== 벤치마크 / 명령행 도구 ==========
+def _time_call(func, repeat):
+    """func 를 repeat 회 실행한 평균 시간(ms) 반환"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def bench_capture(repeat=20, live=False, width=60, height=25, multipliers=(1, 2, 3, 4)):
+    """캡처 변환 경로 비교: getpixel 이중 루프 vs 버퍼 일괄 변환"""
+    grab = None
+    if live:
+        import pyautogui
+        grab = lambda w, h: pyautogui.screenshot(region=(0, 0, w, h))
+    rng = np.random.default_rng(0)
+    results = []
+    print(f"{'배율':>4} {'크기':>9} {'getpixel(ms)':>13} {'numpy(ms)':>10} {'배속':>7}")
+    for m in multipliers:
+        w, h = width * m, height * m
+        if grab:
+            shot = grab(w, h)
+        else:
+            shot = Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), "RGB")
+        old_ms = _time_call(lambda: legacy_pixel_rows(shot), max(1, repeat // 4))
+        new_ms = _time_call(lambda: image_to_array(shot), repeat)
+        assert np.array_equal(pixel_data_to_array(legacy_pixel_rows(shot)), image_to_array(shot))
+        results.append({"multiplier": m, "width": w, "height": h, "legacy_ms": old_ms, "numpy_ms": new_ms})
+        print(f"{m:>4} {w:>4}x{h:<4} {old_ms:>13.3f} {new_ms:>10.4f} {old_ms / max(new_ms, 1e-9):>6.0f}x")
+    return results
+
+
+def bench_grab(repeat=30, region=(0, 0, 120, 50), frame_dir=None):
+    """캡처 방식별 초당 캡처 수 (전체 화면 / 영역)"""
+    specs = list(SCREEN_SOURCES)
+    specs.append(f"file:{frame_dir}" if frame_dir else "file")
+    rows = []
+    print(f"{'방식':>10} {'화면 크기':>11} {'전체(회/초)':>12} {'영역(회/초)':>12}")
+    for spec in specs:
+        label = "file" if spec.startswith("file") else spec
+        try:
+            source = make_screen_source(spec) if spec != "file" else FileSource(synthesize_frames([], count=2))
+        except Exception as e:
+            print(f"{label:>10}  사용 불가 - {e}")
+            rows.append({"source": label, "error": str(e)})
+            continue
+        try:
+            frame = source.grab()
+            full_ms = _time_call(source.grab, repeat)
+            region_ms = _time_call(lambda: source.grab(region=region), repeat)
+        finally:
+            source.close()
+        size = f"{frame.shape[1]}x{frame.shape[0]}"
+        rows.append({"source": label, "size": size, "full_per_sec": 1000 / full_ms, "region_per_sec": 1000 / region_ms})
+        print(f"{label:>10} {size:>11} {1000 / full_ms:>12.1f} {1000 / region_ms:>12.1f}")
+    return rows
+
+
+# ========== 정밀도 보정 ==========
+CALIBRATION_RANGE = (0.5, 0.99)  # 제안 정밀도 범위
+
+
+def suggest_threshold(positives, negatives):
+    """정답 위치 점수와 오답 위치 점수를 가장 넓게 가르는 기준값 -> (기준값, 여유폭), 정답이 없으면 (None, None).
+    두 분포가 겹치면 잘못 판정하는 수가 가장 적은 값(같으면 높은 값)을 고르고 여유폭은 음수"""
+    if not positives:
+        return None, None
+    lowest, highest = min(positives), max(negatives, default=0.0)
+    margin = (lowest - highest) / 2
+    if margin > 0:
+        threshold = (lowest + highest) / 2
+    else:
+        def errors(t):
+            return sum(p < t for p in positives) + sum(n >= t for n in negatives)
+        candidates = [lowest] + [n + 1e-3 for n in negatives]
+        threshold = min(candidates, key=lambda t: (errors(t), -t))
+    threshold = min(max(threshold, CALIBRATION_RANGE[0]), CALIBRATION_RANGE[1])
+    return round(threshold, 3), round(margin, 3)
+
+
+def template_scores(matcher, prepared, templ, anchors, margin):
+    """화면 한 장에서 템플릿의 (정답 위치 점수 또는 None, 가장 높은 오답 위치 점수).
+    정답 위치 = 캡처/마지막 발견 위치 주변(margin) 안에 있는 화면 전체 최고점(제안 범위 하한 이상).
+    그 밖이면 템플릿이 화면에 없는 것으로 보고 최고점 자체를 오답으로 취급"""
+    scores = matcher.score_map(prepared, templ)
+    if scores is None or scores.size == 0:
+        return None, None
+    th, tw = templ.shape[:2]
+    top, left = divmod(int(np.argmax(scores)), scores.shape[1])
+    best = float(scores[top, left])
+    windows = [search_window(anchor, templ.shape, margin) for anchor in anchors]
+    if best < CALIBRATION_RANGE[0] or not any(wl <= left and left + tw <= wl + ww and wt <= top and top + th <= wt + wh
+               for wl, wt, ww, wh in windows):
+        return None, best
+    # 정답 주변(템플릿 크기만큼 겹치는 위치)을 지운 나머지 최고점 = 가장 헷갈리는 오답
+    scores[max(0, top - th + 1):top + th, max(0, left - tw + 1):left + tw] = -1.0
+    return best, float(scores.max())
+
+
+def calibrate_pairs(pairs, frames, matcher=None, margin=200, log=print):
+    """녹화 화면들로 쌍별 trigger/target 점수 분포를 구해 정밀도 제안 -> 행 목록
+    (pair: 1부터, key, found: 정답이 보인 화면 수, min_true, max_false, suggested, margin)"""
+    matcher = matcher or TemplateMatcher()
+    samples = {(idx, key): ([], []) for idx in range(len(pairs)) for key in ("trigger", "target")}
+    for n, (name, frame) in enumerate(frames):
+        prepared = matcher.prepare(frame)
+        for idx, pair in enumerate(pairs):
+            for key in ("trigger", "target"):
+                templ = MonitorEngine._pixels(pair, key)
+                if templ is None:
+                    continue
+                true_score, false_score = template_scores(matcher, prepared, templ,
+                                                          search_anchors(pair[key], "roi"), margin)
+                positives, negatives = samples[(idx, key)]
+                if true_score is not None:
+                    positives.append(true_score)
+                if false_score is not None:
+                    negatives.append(false_score)
+        log(f"정밀도 보정: 화면 {n + 1}/{len(frames)} ({name}) 분석 완료")
+    rows = []
+    for (idx, key), (positives, negatives) in samples.items():
+        if MonitorEngine._pixels(pairs[idx], key) is None:
+            continue
+        suggested, gap = suggest_threshold(positives, negatives)
+        rows.append({"pair": idx + 1, "key": key, "found": len(positives), "frames": len(frames),
+                     "min_true": min(positives, default=None), "max_false": max(negatives, default=None),
+                     "suggested": suggested, "margin": gap})
+    return rows
+
+
+def apply_calibration(pairs, rows):
+    """제안값을 쌍별 정밀도(trigger_confidence/target_confidence)로 저장, 바뀐 쌍 번호(0부터) 목록 반환"""
+    changed = set()
+    for row in rows:
+        if row["suggested"] is None:
+            continue
+        pair = pairs[row["pair"] - 1]
+        if pair.get(f"{row['key']}_confidence") != row["suggested"]:
+            pair[f"{row['key']}_confidence"] = row["suggested"]
+            changed.add(row["pair"] - 1)
+    return sorted(changed)
+
+
+def format_calibration(rows):
+    """보정 결과 표 (문자열 줄 목록)"""
+    lines = [f"{'쌍':>3} {'종류':>7} {'발견':>7} {'정답 최저':>9} {'오답 최고':>9} {'제안':>6} {'여유':>7}"]
+    for row in rows:
+        fmt = lambda v: "-" if v is None else f"{v:.3f}"
+        lines.append(f"{row['pair']:>3} {row['key']:>7} {row['found']:>3}/{row['frames']:<3} "
+                     f"{fmt(row['min_true']):>9} {fmt(row['max_false']):>9} {fmt(row['suggested']):>6} "
+                     f"{fmt(row['margin']):>7}" + ("  (겹침: 화면 추가 권장)" if (row["margin"] or 0) < 0 else ""))
+    return lines
+
+
+def calibrate(config_file, profile_name=None, frame_dir=None, apply=False):
+    """녹화 화면 폴더로 프로필의 쌍별 정밀도를 보정 (apply=True 면 설정 파일에 저장)"""
+    name, profile = load_profile_pairs(config_file, profile_name)
+    pairs = profile.get("image_pairs", [])
+    TemplateCache(TemplateStore(data_dir_for(config_file))).build(pairs)
+    frames = load_frames(frame_dir) if frame_dir else synthesize_frames(pairs, keys=("trigger", "target"))
+    rows = calibrate_pairs(pairs, frames, margin=monitor_settings(profile)["roi_margin"], log=lambda m: None)
+    print(f"프로필 '{name}': 이미지 쌍 {len(pairs)}개, 화면 {len(frames)}장")
+    print("\n".join(format_calibration(rows)))
+    if apply:
+        repo = ProfileRepository(config_file, TemplateStore(data_dir_for(config_file)))
+        repo.load()
+        stored = repo[name]["image_pairs"]
+        changed = apply_calibration(stored, rows)
+        for idx in changed:
+            repo.update_pair(name, idx)
+        repo.save()
+        print(f"쌍 {len(changed)}개에 보정된 정밀도를 저장했습니다.")
+    return rows
+
+
+# ========== 프로필 정리 (템플릿 압축 / 가비지 컬렉션) ==========
+def measure_match_ms(matcher, prepared, templ, repeat=3):
+    """전체 화면에서 템플릿 하나를 찾는 평균 시간(ms)"""
+    return _time_call(lambda: matcher.locate(prepared, templ, 1.0), repeat)
+
+
+def compact_profiles(repo, trim=True, measure=True, log=print):
+    """저장소 정리: uuid 이미지 ID 변환(중복 합치기) -> 배경색 가장자리 잘라내기(같아진 이미지는 자동으로 합쳐짐)
+    -> 설정 다시 쓰기 -> 어느 프로필도 쓰지 않는 이미지 삭제 -> 남은 PNG 최대 압축. 보고서 dict 반환
+    (measure=True 면 잘라낸 쌍마다 전체 화면 매칭 시간 변화를 가상 화면으로 측정)"""
+    store = repo.store
+    repo.save()
+    files_before, bytes_before = len(store.image_ids()), store.total_bytes()
+    log("정리: 이미지 ID 변환/중복 정리 중...")
+    references, _, _ = repo.dedupe_templates()
+    trimmed = []
+    matcher = TemplateMatcher()
+    if trim:
+        log("정리: 템플릿 가장자리 잘라내는 중...")
+        # 너무 작게 자르면 축소 단계(coarse-to-fine)를 못 써서 오히려 느려지므로 지금의 축소 배율을 유지하는 크기까지만
+        trimmed = repo.trim_templates(min_size_for=lambda shape: max(
+            TRIM_MIN_SIZE, matcher.MIN_COARSE_SIZE * matcher.coarse_factor(shape)))
+    repo.save()
+    log("정리: 쓰지 않는 이미지 삭제, PNG 다시 압축 중...")
+    referenced = repo.referenced_image_ids()
+    orphans, orphan_bytes = store.collect_garbage(referenced)
+    recompressed = sum(store.recompress(image_id) for image_id in referenced)
+    rows = {}
+    prepared = None
+    if measure and trimmed:
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 256, (1080 // 8, 1920 // 8, 3), dtype=np.uint8)
+        prepared = matcher.prepare(np.asarray(Image.fromarray(base).resize((1920, 1080), Image.BILINEAR)))
+    for name, idx, key, before, after in trimmed:
+        row = rows.setdefault((name, idx), {"profile": name, "pair": idx + 1, "templates": [],
+                                            "match_ms_before": 0.0, "match_ms_after": 0.0})
+        row["templates"].append({"key": key, "before": before.shape[1::-1], "after": after.shape[1::-1]})
+        if prepared is not None:
+            row["match_ms_before"] += measure_match_ms(matcher, prepared, before)
+            row["match_ms_after"] += measure_match_ms(matcher, prepared, after)
+    files_after, bytes_after = len(store.image_ids()), store.total_bytes()
+    return {"references_renamed": references, "trimmed": len(trimmed), "orphans_removed": orphans,
+            "orphan_bytes": orphan_bytes, "recompressed_bytes": recompressed,
+            "files_before": files_before, "files_after": files_after,
+            "bytes_before": bytes_before, "bytes_after": bytes_after,
+            "measured": prepared is not None, "pairs": list(rows.values())}
+
+
+def format_compaction(report):
+    """정리 보고서 요약 (문자열 줄 목록)"""
+    saved = report["bytes_before"] - report["bytes_after"]
+    lines = [f"이미지 파일 {report['files_before']}개 -> {report['files_after']}개, "
+             f"{report['bytes_before'] / 1024:.1f}KB -> {report['bytes_after'] / 1024:.1f}KB ({saved / 1024:.1f}KB 절약)",
+             f"가장자리 잘라낸 템플릿 {report['trimmed']}개, 쓰지 않는 파일 {report['orphans_removed']}개 삭제 "
+             f"({report['orphan_bytes'] / 1024:.1f}KB), 다시 압축 {report['recompressed_bytes'] / 1024:.1f}KB"]
+    for row in report["pairs"]:
+        sizes = ", ".join(f"{t['key']} {t['before'][0]}x{t['before'][1]}->{t['after'][0]}x{t['after'][1]}"
+                          for t in row["templates"])
+        timing = (f"  매칭 {row['match_ms_before']:.1f}ms -> {row['match_ms_after']:.1f}ms"
+                  if report["measured"] else "")
+        lines.append(f"  [{row['profile']}] #{row['pair']} {sizes}{timing}")
+    return lines
+
+
+def compact(config_file, trim=True, measure=True):
+    """설정 파일의 모든 프로필 정리 (명령행용)"""
+    repo = ProfileRepository(config_file, TemplateStore(data_dir_for(config_file)))
+    if not repo.load():
+        raise FileNotFoundError(config_file)
+    report = compact_profiles(repo, trim=trim, measure=measure)
+    print("\n".join(format_compaction(report)))
+    return report
+
+
+def bench_legacy_load(config_file):
+    """구버전 설정 파일 읽기 비교: json.load(+리스트 -> 배열 변환) vs 스트리밍 읽기 (시간, 최대 할당량)"""
+    import tracemalloc
+
+    def with_json():
+        with open(config_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        _, profiles = normalize_config_data(data)
+        for profile in profiles.values():
+            for pair in profile.get("image_pairs", []):
+                for key in ("trigger", "target"):
+                    if (pair.get(key) or {}).get("pixel_data"):
+                        pair[key]["_pixels"] = pixel_data_to_array(pair[key].pop("pixel_data"))
+        return data
+
+    rows = []
+    print(f"{os.path.basename(config_file)}: {os.path.getsize(config_file) / 1e6:.1f} MB")
+    print(f"{'방식':>8} {'시간(s)':>8} {'최대 할당(MB)':>13}")
+    for label, load in (("json", with_json), ("stream", lambda: read_config_stream(config_file))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        load()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        rows.append({"method": label, "seconds": elapsed, "peak_mb": peak})
+        print(f"{label:>8} {elapsed:>8.2f} {peak:>13.1f}")
+    return rows
+
+
+def load_frames(frame_dir):
+    """녹화된 스크린샷 폴더의 이미지들을 파일명 순서로 (경로, 배열) 목록으로 로드"""
+    names = sorted(n for n in os.listdir(frame_dir)
+                   if os.path.splitext(n)[1].lower() in (".png", ".jpg", ".jpeg", ".bmp"))
+    frames = []
+    for name in names:
+        with Image.open(os.path.join(frame_dir, name)) as img:
+            frames.append((name, image_to_array(img)))
+    return frames
+
+
+def synthesize_frames(pairs, count=3, size=(1920, 1080), seed=0, keys=("trigger",)):
+    """녹화 화면이 없을 때 배경 위에 트리거(keys)를 캡처 위치에 붙인 가상 화면 생성"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        base = rng.integers(0, 256, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+        frame = np.asarray(Image.fromarray(base).resize(size, Image.BILINEAR)).copy()
+        for j, pair in enumerate(pairs):
+            if (i + j) % 2:
+                continue
+            for key in keys:
+                info = pair.get(key) or {}
+                pixels, region = info.get("_pixels"), info.get("region")
+                if pixels is None or not region:
+                    continue
+                h, w = pixels.shape[:2]
+                left, top, _, _ = clip_region((region["left"], region["top"], w, h), size[0], size[1])
+                frame[top:top + h, left:left + w] = pixels[:size[1] - top, :size[0] - left]
+        frames.append((f"synthetic_{i}", frame))
+    return frames
+
+
+def _baseline_locator():
+    """현재 앱의 locateCenterOnScreen 경로 (pyscreeze), 없으면 같은 알고리즘의 원본 컬러 전체 매칭"""
+    try:
+        import pyscreeze
+        def locate(frame, templ, confidence):
+            box = pyscreeze.locate(array_to_image(templ), array_to_image(frame), confidence=confidence)
+            return box is not None
+        return "pyscreeze.locate", locate
+    except Exception:
+        matcher = TemplateMatcher(pyramid_levels=0)
+        return "원본 컬러 matchTemplate", lambda frame, templ, conf: matcher.locate(frame, templ, conf).found
+
+
+def bench_match(config_file, profile_name=None, frame_dir=None, repeat=1, scales=None, display_scale=1.0):
+    """프로필의 트리거를 녹화 화면에서 찾는 시간: 현재 경로 vs 축소 그레이 후보 + 원본 검증 (+ 배율 탐색)
+
+    display_scale 을 주면 화면 전체를 그 배율로 늘려 다른 DPI(125%/150%) 에서 보이는 상황을 흉내냄"""
+    name, profile = load_profile_pairs(config_file, profile_name)
+    pairs = [p for p in profile.get("image_pairs", []) if (p.get("trigger") or {}).get("_pixels") is not None]
+    frames = load_frames(frame_dir) if frame_dir else synthesize_frames(pairs)
+    if display_scale != 1.0:
+        frames = [(n, np.asarray(array_to_image(f).resize((round(f.shape[1] * display_scale),
+                                                           round(f.shape[0] * display_scale)), Image.BILINEAR)))
+                  for n, f in frames]
+    scales = parse_scales(scales if scales is not None else profile.get("match_scales", [1.0]))
+    conf = profile.get("trigger_confidence", 0.8)
+    base_name, base_locate = _baseline_locator()
+    pyramid = TemplateMatcher(pyramid_levels=2)
+    entries = {id(p): TemplateEntry(p["trigger"]["_pixels"]) for p in pairs}
+    last_scale = {}
+    print(f"프로필 '{name}': 이미지 쌍 {len(pairs)}개, 화면 {len(frames)}장, 정밀도 {conf}, "
+          f"화면 배율 {display_scale}, 탐색 배율 {scales}")
+    print(f"기준: {base_name} / 비교: 축소 그레이 후보 + 원본 컬러 검증 ({pyramid.backend})")
+    base_total = fast_total = 0.0
+    agree = total = base_hits = fast_hits = 0
+    for frame_name, frame in frames:
+        for idx, pair in enumerate(pairs):
+            templ = pair["trigger"]["_pixels"]
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                base_found = base_locate(frame, templ, conf)
+            t1 = time.perf_counter()
+            for _ in range(repeat):
+                # 실제 모니터링처럼 화면 전처리는 프레임당 공유하지 않고 매번 새로 계산 (보수적 비교)
+                fast, _ = run_search(pyramid, PreparedFrame(frame), entries[id(pair)], conf, idx,
+                                     scales=ordered_scales(scales, last_scale.get(idx)))
+            t2 = time.perf_counter()
+            if fast.found:
+                last_scale[idx] = fast.scale
+            base_total += (t1 - t0) / repeat
+            fast_total += (t2 - t1) / repeat
+            total += 1
+            agree += base_found == fast.found
+            base_hits += base_found
+            fast_hits += fast.found
+    if total:
+        print(f"평균 검색 시간: 기준 {base_total / total * 1000:.1f} ms, "
+              f"피라미드 {fast_total / total * 1000:.1f} ms ({base_total / max(fast_total, 1e-9):.1f}배)")
+        print(f"발견 수: 기준 {base_hits}, 비교 {fast_hits} / 발견 여부 일치: {agree}/{total}")
+    return {"baseline_ms": base_total / max(total, 1) * 1000, "pyramid_ms": fast_total / max(total, 1) * 1000,
+            "agree": agree, "total": total, "baseline_hits": base_hits, "hits": fast_hits}
+
+
+def bench_workers(config_file, profile_name=None, frame_dir=None, workers=(1, 2, 4, 8), repeat=1, modes=None):
+    """프로필의 트리거/타겟 전체를 화면 한 장에서 전체 검색할 때 작업자 수별 처리 시간"""
+    name, profile = load_profile_pairs(config_file, profile_name)
+    pairs = [p for p in profile.get("image_pairs", []) if (p.get("trigger") or {}).get("_pixels") is not None]
+    frames = load_frames(frame_dir) if frame_dir else synthesize_frames(pairs)
+    conf = profile.get("trigger_confidence", 0.8)
+    templates = [TemplateEntry(p[key]["_pixels"]) for p in pairs for key in ("trigger", "target")
+                 if (p.get(key) or {}).get("_pixels") is not None]
+    matcher = TemplateMatcher()
+    jobs = [SearchJob(i, t, conf, [], 0, [1.0], f"bench:{i}") for i, t in enumerate(templates)]
+    modes = modes or (("thread", "process") if matcher.backend == "opencv" else ("process", "thread"))
+    print(f"프로필 '{name}': 템플릿 {len(templates)}개, 화면 {len(frames)}장, "
+          f"매칭 엔진 {matcher.backend}, CPU {os.cpu_count()}개")
+    expected = [[r.found for r, _ in MatchPool(1).search_many(matcher, PreparedFrame(f), jobs)] for _, f in frames]
+    rows = []
+    for mode in modes:
+        base_ms = None
+        for count in workers:
+            pool = MatchPool(count, matcher.backend, mode)
+            try:
+                pool.search_many(matcher, PreparedFrame(frames[0][1]), jobs)  # 작업자 시작 비용 제외
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    for i, (_, frame) in enumerate(frames):
+                        found = [r.found for r, _ in pool.search_many(matcher, PreparedFrame(frame), jobs)]
+                        assert found == expected[i], "작업자 수에 따라 결과가 달라졌습니다."
+                ms = (time.perf_counter() - start) * 1000 / (repeat * len(frames))
+            finally:
+                pool.close()
+            base_ms = base_ms or ms
+            rows.append({"mode": mode, "workers": count, "frame_ms": ms})
+            print(f"{mode:>8} 작업자 {count}: 화면당 {ms:8.1f} ms ({base_ms / ms:.2f}배)")
+    return rows
+
+
+# ========== 녹화 화면 재생 (화면/마우스 없이 판단 로직 검증) ==========
+class ReplayClock:
+    """대기는 실제로 자지 않고 가상 시간으로 건너뛰고, 매칭 계산 시간은 실제 경과 시간 그대로 더하는 시계"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.skipped = 0.0
+
+    def now(self):
+        return time.perf_counter() - self._start + self.skipped
+
+    def sleep(self, seconds):
+        self.skipped += max(0.0, seconds)
+        return True
+
+
+class FrameReplay(ScreenSource):
+    """녹화된 화면을 한 장당 frame_period 초씩 보여주는 가짜 화면 캡처
+
+    advance_on_click=True 이면 시간 대신 클릭할 때마다 다음 화면으로 넘어감 (여러 단계 작업 흉내,
+    frame_period x 장 수는 전체 제한 시간)"""
+
+    name = "replay"
+
+    def __init__(self, frames, clock, frame_period=5.0, advance_on_click=False):
+        self.frames = frames
+        self.clock = clock
+        self.frame_period = frame_period
+        self.advance_on_click = advance_on_click
+        self.shown_at = [0.0]  # advance_on_click: 화면별로 처음 보인 시각
+
+    @property
+    def duration(self):
+        return len(self.frames) * self.frame_period
+
+    @property
+    def finished(self):
+        if self.advance_on_click:
+            return len(self.shown_at) > len(self.frames) or self.clock.now() >= self.duration
+        return self.clock.now() >= self.duration
+
+    def index_at(self, t=None):
+        if self.advance_on_click:
+            return min(len(self.shown_at), len(self.frames)) - 1
+        t = self.clock.now() if t is None else t
+        return min(int(t // self.frame_period), len(self.frames) - 1)
+
+    def frame_start(self, index):
+        return self.shown_at[index] if self.advance_on_click else index * self.frame_period
+
+    def clicked(self):
+        if self.advance_on_click:
+            self.shown_at.append(self.clock.now())
+
+    def grab(self, region=None):
+        frame = self.frames[self.index_at()][1]
+        if region:
+            left, top, width, height = clip_region(region, frame.shape[1], frame.shape[0])
+            return frame[top:top + height, left:left + width]
+        return frame
+
+
+def monitor_settings(profile):
+    """프로필 값으로 모니터링 설정 dict 구성 (앱의 MonitorSettings 와 같은 키/검증)"""
+    settings = MonitorSettings()
+    settings.load_profile(profile)
+    return settings.snapshot()
+
+
+def replay(config_file, profile_name=None, frame_dir=None, frame_period=5.0, click_settle=None,
+           scan_mode=None, verbose=False, advance_on_click=False, metrics_file=None):
+    """녹화 화면 폴더를 monitoring_loop 와 같은 판단 로직으로 재생하고 쌍별 결과 보고서 반환"""
+    name, profile = load_profile_pairs(config_file, profile_name)
+    pairs = profile.get("image_pairs", [])
+    ensure_pair_ids(pairs)
+    TemplateCache(TemplateStore(data_dir_for(config_file))).build(pairs)
+    settings = monitor_settings(profile)
+    if scan_mode:
+        settings["scan_mode"] = scan_mode
+    if click_settle is not None:
+        settings["post_click_settle"] = click_settle
+    frames = load_frames(frame_dir) if frame_dir else synthesize_frames(pairs, keys=("trigger", "target"))
+    clock = ReplayClock()
+    screen = FrameReplay(frames, clock, frame_period, advance_on_click)
+    stats = {idx: {"pair": idx + 1, "description": pair.get("description", ""), "checks": 0, "hits": 0,
+                   "target_misses": 0, "clicks": [], "latencies": []}
+             for idx, pair in enumerate(pairs)}
+    clicked_frames = set()  # (쌍 번호, 화면 번호) - 화면별 첫 클릭만 지연 시간으로 집계
+
+    def observe(event, idx, result):
+        now = clock.now()
+        frame_index = screen.index_at(now)
+        entry = stats[idx]
+        if event == "trigger_checked":
+            entry["checks"] += 1
+            if result.found:
+                entry["hits"] += 1
+        elif event == "target_miss":
+            entry["target_misses"] += 1
+        elif event == "click":
+            x, y = click_point(pairs[idx]["target"], result)
+            entry["clicks"].append({"time": round(now, 3), "frame": frames[frame_index][0], "x": x, "y": y})
+            if (idx, frame_index) not in clicked_frames:
+                # 반응 지연: 화면이 바뀐 시점부터 첫 클릭까지
+                clicked_frames.add((idx, frame_index))
+                entry["latencies"].append(now - screen.frame_start(frame_index))
+
+    log = print if verbose else (lambda message: None)
+    # 앱과 같은 클릭 경로 (동작 전 대기 -> 재확인 -> 클릭 -> 안정화 대기), 작업 스레드 대신 가상 시계로 실행
+    actions = ActionExecutor(log=log, clock=clock.now, wait=clock.sleep)
+
+    def wait(seconds):
+        # 대기하는 동안 시작 시각이 된 클릭 동작을 실행 (앱에서는 작업 스레드가 검사와 동시에 실행)
+        end = clock.now() + seconds
+        while True:
+            actions.run_pending()
+            left = end - clock.now()
+            if left <= 0:
+                return True
+            pause = actions.time_until_next()
+            clock.sleep(left if pause is None else min(left, pause))
+
+    engine = MonitorEngine(grab=screen.grab, click=lambda pos: screen.clicked(), wait=wait, log=log,
+                           clock=clock.now, observer=observe, actions=actions)
+    try:
+        while not screen.finished:
+            if settings["scan_mode"] == "sequential":
+                engine.run_sequential_cycle(pairs, settings)
+                continue
+            next_in = engine.run_scheduled_step(pairs, settings)
+            wait(min(next_in, 1.0))
+    finally:
+        actions.close()
+        engine.close()
+
+    print(f"프로필 '{name}': 이미지 쌍 {len(pairs)}개, 화면 {len(frames)}장 x {frame_period}초, "
+          f"모드 {settings['scan_mode']}, 화면 캡처 {engine.grab_count}회, 기억 위치 확인 성공 {engine.memo_hits}회, "
+          f"전체 화면 탐색 {engine.full_searches}회")
+    print(f"{'쌍':>3} {'검사':>5} {'발견':>5} {'타겟실패':>8} {'클릭':>5} {'평균지연(s)':>11} {'최대지연(s)':>11}  설명")
+    for entry in stats.values():
+        lat = entry["latencies"]
+        entry["mean_latency"] = sum(lat) / len(lat) if lat else None
+        entry["max_latency"] = max(lat) if lat else None
+        mean = f"{entry['mean_latency']:.2f}" if lat else "-"
+        worst = f"{entry['max_latency']:.2f}" if lat else "-"
+        print(f"{entry['pair']:>3} {entry['checks']:>5} {entry['hits']:>5} {entry['target_misses']:>8} "
+              f"{len(entry['clicks']):>5} {mean:>11} {worst:>11}  {entry['description']}")
+        for c in entry["clicks"] if verbose else []:
+            print(f"      {c['time']:8.2f}s {c['frame']}: ({c['x']}, {c['y']})")
+    report = {"profile": name, "settings": settings, "grabs": engine.grab_count, "memo_hits": engine.memo_hits,
+              "roi_hits": engine.roi_hits, "full_searches": engine.full_searches, "action_misses": actions.missed,
+              "pairs": list(stats.values()),
+              "cycles": engine.metrics.cycle_summary()}
+    for number, summary in engine.metrics.pair_summary().items():
+        stats[number - 1]["mean_match_ms"] = summary["mean_match_ms"]
+        stats[number - 1]["best_score"] = summary["best_score"]
+    cycles = report["cycles"]
+    print(f"사이클 {cycles['cycles']}회: 평균 {cycles['mean_cycle_ms']:.1f}ms (최대 {cycles['max_cycle_ms']:.1f}ms), "
+          f"캡처 평균 {cycles['mean_grab_ms']:.1f}ms")
+    if metrics_file:
+        print(f"측정 기록 {engine.metrics.export(metrics_file)}건 저장: {metrics_file}")
+    if advance_on_click:
+        done = len(screen.shown_at) > len(frames)
+        report["completed_at"] = screen.shown_at[-1] if done else None
+        print(f"전체 {len(frames)}단계 " + (f"완료: {screen.shown_at[-1]:.2f}초" if done else
+                                         f"미완료: {len(screen.shown_at) - 1}단계까지 진행"))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="click_click 보조 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_cap = sub.add_parser("bench-capture", help="캡처 픽셀 변환 경로 벤치마크")
+    p_cap.add_argument("--repeat", type=int, default=20)
+    p_cap.add_argument("--live", action="store_true", help="실제 화면 캡처 사용 (pyautogui 필요)")
+
+    p_match = sub.add_parser("bench-match", help="템플릿 매칭 벤치마크 (녹화 화면 폴더 또는 가상 화면)")
+    p_match.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_match.add_argument("--profile", default=None)
+    p_match.add_argument("--frames", default=None, help="녹화된 스크린샷 폴더 (없으면 가상 화면 생성)")
+    p_match.add_argument("--repeat", type=int, default=1)
+    p_match.add_argument("--scales", default=None, help="탐색 배율 목록 (예: 1,1.25,1.5, 기본은 프로필의 match_scales)")
+    p_match.add_argument("--display-scale", type=float, default=1.0, help="화면 전체를 이 배율로 늘려 DPI 변경을 흉내냄")
+
+    p_workers = sub.add_parser("bench-workers", help="작업자 수(1/2/4/8)별 병렬 매칭 벤치마크")
+    p_workers.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_workers.add_argument("--profile", default=None)
+    p_workers.add_argument("--frames", default=None, help="녹화된 스크린샷 폴더 (없으면 가상 화면 생성)")
+    p_workers.add_argument("--workers", default="1,2,4,8")
+    p_workers.add_argument("--repeat", type=int, default=1)
+
+    p_replay = sub.add_parser("replay", help="녹화된 스크린샷을 모니터링 판단 로직으로 재생 (화면/마우스 불필요)")
+    p_replay.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_replay.add_argument("--profile", default=None)
+    p_replay.add_argument("--frames", default=None, help="녹화된 스크린샷 폴더 (파일명 순서, 없으면 가상 화면 생성)")
+    p_replay.add_argument("--frame-period", type=float, default=5.0, help="화면 한 장을 보여주는 시간(초)")
+    p_replay.add_argument("--click-settle", type=float, default=None,
+                          help="클릭 후 안정화 대기(초, 기본: 프로필의 post_click_settle)")
+    p_replay.add_argument("--mode", choices=("scheduled", "sequential"), default=None)
+    p_replay.add_argument("--advance-on-click", action="store_true",
+                          help="시간 대신 클릭할 때마다 다음 화면으로 (여러 단계 작업 완료 시간 측정)")
+    p_replay.add_argument("--json", default=None, help="보고서를 JSON 파일로 저장 (회귀 비교용)")
+    p_replay.add_argument("--metrics", default=None, help="검색/사이클 측정 기록 저장 (.csv 또는 .jsonl)")
+    p_replay.add_argument("-v", "--verbose", action="store_true")
+
+    p_grab = sub.add_parser("bench-grab", help="화면 캡처 방식별 초당 캡처 수")
+    p_grab.add_argument("--repeat", type=int, default=30)
+    p_grab.add_argument("--frames", default=None, help="file 방식으로 재생할 스크린샷 폴더 (없으면 가상 화면)")
+
+    p_cal = sub.add_parser("calibrate", help="녹화된 스크린샷으로 쌍별 trigger/target 정밀도 제안")
+    p_cal.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_cal.add_argument("--profile", default=None)
+    p_cal.add_argument("--frames", default=None, help="녹화된 스크린샷 폴더 (없으면 가상 화면 생성)")
+    p_cal.add_argument("--apply", action="store_true", help="제안값을 쌍별 정밀도로 저장")
+
+    p_compact = sub.add_parser("compact", help="템플릿 가장자리 잘라내기/중복 정리/안 쓰는 이미지 삭제")
+    p_compact.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_compact.add_argument("--no-trim", action="store_true", help="가장자리는 자르지 않고 중복/미사용 파일만 정리")
+    p_compact.add_argument("--no-measure", action="store_true", help="쌍별 매칭 시간 변화 측정 생략")
+    p_compact.add_argument("--json", default=None, help="보고서를 JSON 파일로 저장")
+
+    p_legacy = sub.add_parser("bench-legacy", help="구버전 설정 파일 읽기 비교 (json.load vs 스트리밍)")
+    p_legacy.add_argument("config", help="구버전 click_config.json (pixel_data 포함)")
+
+    p_export = sub.add_parser("export-legacy", help="현재 설정을 구버전 단일 파일 형식(pixel_data)으로 내보내기")
+    p_export.add_argument("--config", default=os.path.join(os.path.expanduser("~"), "click_config.json"))
+    p_export.add_argument("--out", required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "bench-capture":
+        bench_capture(repeat=args.repeat, live=args.live)
+    elif args.command == "bench-match":
+        bench_match(args.config, args.profile, args.frames, args.repeat, args.scales, args.display_scale)
+    elif args.command == "bench-workers":
+        bench_workers(args.config, args.profile, args.frames,
+                      [int(n) for n in args.workers.split(",")], args.repeat)
+    elif args.command == "bench-grab":
+        bench_grab(args.repeat, frame_dir=args.frames)
+    elif args.command == "calibrate":
+        calibrate(args.config, args.profile, args.frames, args.apply)
+    elif args.command == "compact":
+        report = compact(args.config, trim=not args.no_trim, measure=not args.no_measure)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=4)
+    elif args.command == "bench-legacy":
+        bench_legacy_load(args.config)
+    elif args.command == "export-legacy":
+        count = export_legacy_config(args.config, args.out)
+        print(f"프로필 {count}개를 {args.out} 에 저장했습니다.")
+    elif args.command == "replay":
+        report = replay(args.config, args.profile, args.frames, args.frame_period, args.click_settle,
+                        args.mode, args.verbose, args.advance_on_click, args.metrics)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# 저장소 루트의 click_click_core 를 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from click_click_core import ProfileRepository, TemplateStore, data_dir_for
+
+
+def make_pattern(seed, height=30, width=60):
+    """가장자리가 단색이 아닌 임의 무늬 템플릿"""
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """쌍 2개짜리 default 프로필이 저장된 현재 형식 설정 파일 경로"""
+    path = str(tmp_path / "click_config.json")
+    store = TemplateStore(data_dir_for(path))
+    repo = ProfileRepository(path, store)
+    pairs = []
+    for i in range(2):
+        pair = {"description": f"쌍 {i + 1}", "action_delay": 0}
+        for j, key in enumerate(("trigger", "target")):
+            left, top = 100 + 200 * j, 100 + 150 * i
+            pair[key] = {"region": {"left": left, "top": top, "width": 60, "height": 30},
+                         "image_id": store.put(make_pattern(2 * i + j))}
+        pairs.append(pair)
+    repo["default"] = {"image_pairs": pairs, "trigger_confidence": 0.8, "target_confidence": 0.85}
+    repo.save("default")
+    return path
@@ -0,0 +1,187 @@
+import numpy as np
+
+from click_click_core import ActionExecutor, MonitorEngine, PairScheduler, ReplayClock, monitor_settings
+
+
+def _executor(clock, log=None):
+    return ActionExecutor(log=log or (lambda message: None), clock=clock.now, wait=clock.sleep)
+
+
+def test_delay_settle_and_cooldown():
+    clock = ReplayClock()
+    actions = _executor(clock)
+    ran = []
+    assert actions.submit("a", lambda: ran.append(("a", clock.now())) or True, delay=1.0, settle=2.0, cooldown=5.0)
+    assert actions.submit("b", lambda: ran.append(("b", clock.now())) or True, delay=0.0, settle=2.0, cooldown=5.0)
+    assert not actions.submit("a", lambda: True)  # 예약 중인 쌍은 받지 않음
+
+    assert actions.run_pending() == 1  # b 만 시작 시각이 됨
+    assert actions.wait_clicked("a", timeout=10.0)
+    # a 는 동작 전 대기(1초)가 지났어도 b 의 안정화 대기(2초)가 끝난 뒤에 실행
+    assert [key for key, _ in ran] == ["b", "a"]
+    assert ran[1][1] - ran[0][1] >= 2.0
+    assert not actions.ready("a") and not actions.submit("a", lambda: True)  # 쿨다운 중
+    clock.sleep(5.0)
+    assert actions.ready("a")
+    assert actions.executed == 2 and actions.rejected == 2
+
+
+def test_missed_action_has_no_cooldown():
+    clock = ReplayClock()
+    actions = _executor(clock)
+    actions.submit("a", lambda: False, settle=2.0, cooldown=5.0)
+    assert actions.wait_clicked("a", timeout=1.0) is False
+    assert actions.ready("a") and actions.missed == 1
+    assert actions.time_until_next() is None
+
+
+def test_wait_clicked_times_out_and_cancel():
+    clock = ReplayClock()
+    actions = _executor(clock)
+    actions.submit("a", lambda: True, delay=30.0)
+    assert actions.wait_clicked("a", timeout=1.0) is False
+    assert actions.cancel() == 1
+    assert actions.ready("a") and actions.executed == 0
+
+
+def test_threaded_executor_runs_action():
+    actions = ActionExecutor(log=lambda message: None)
+    try:
+        assert actions.submit("a", lambda: True, delay=0.01, settle=0.0)
+        assert actions.wait_clicked("a", timeout=5.0)
+    finally:
+        actions.close()
+
+
+def _patch(seed, size=24):
+    return np.random.default_rng(seed).integers(0, 256, (size, size, 3), dtype=np.uint8)
+
+
+def _pair(pid, trigger, target, trigger_at, target_at):
+    return {"id": pid, "action_delay": 0,
+            "trigger": {"_pixels": trigger, "region": {"left": trigger_at[0], "top": trigger_at[1]}},
+            "target": {"_pixels": target, "region": {"left": target_at[0], "top": target_at[1]}}}
+
+
+def _paste(frame, patch, at):
+    frame[at[1]:at[1] + patch.shape[0], at[0]:at[0] + patch.shape[1]] = patch
+
+
+def test_queued_click_reverifies_after_previous_click():
+    """같은 화면에서 찾은 두 쌍: 첫 클릭으로 화면이 바뀌면 두 번째 동작은 새 화면 기준으로 판단"""
+    t1, g1, t2, g2 = (_patch(seed) for seed in range(4))
+    pairs = [_pair("p1", t1, g1, (10, 10), (60, 10)), _pair("p2", t2, g2, (10, 100), (60, 100))]
+    before = np.zeros((200, 200, 3), dtype=np.uint8)
+    for patch, at in ((t1, (10, 10)), (g1, (60, 10)), (t2, (10, 100)), (g2, (60, 100))):
+        _paste(before, patch, at)
+    after = before.copy()
+    after[100:124, 60:84] = 0
+    _paste(after, g2, (120, 150))  # 첫 클릭 뒤 두 번째 타겟이 다른 곳으로 이동
+
+    screen = {"frame": before}
+    clicks = []
+
+    def click(pos):
+        clicks.append(pos)
+        screen["frame"] = after
+
+    clock = ReplayClock()
+    actions = _executor(clock)
+    engine = MonitorEngine(grab=lambda: screen["frame"], click=click, wait=clock.sleep, log=lambda message: None,
+                           clock=clock.now, actions=actions)
+    settings = monitor_settings({})
+    try:
+        assert engine.run_batch_cycle(pairs, settings)
+        assert engine.grab_count == 1  # 클릭을 예약한 뒤 다시 캡처하지 않고 같은 화면의 나머지도 처리
+        assert actions.wait_clicked("p2", timeout=10.0)
+    finally:
+        actions.close()
+        engine.close()
+    assert clicks == [(72, 22), (132, 162)]  # 두 번째 클릭은 이동한 타겟 위치
+
+
+def test_queued_click_cancelled_when_trigger_gone():
+    t1, g1, t2, g2 = (_patch(seed) for seed in range(4))
+    pairs = [_pair("p1", t1, g1, (10, 10), (60, 10)), _pair("p2", t2, g2, (10, 100), (60, 100))]
+    before = np.zeros((200, 200, 3), dtype=np.uint8)
+    for patch, at in ((t1, (10, 10)), (g1, (60, 10)), (t2, (10, 100)), (g2, (60, 100))):
+        _paste(before, patch, at)
+    after = before.copy()
+    after[100:124, 10:34] = 0  # 첫 클릭으로 두 번째 트리거가 사라짐
+    screen = {"frame": before}
+    clicks = []
+
+    def click(pos):
+        clicks.append(pos)
+        screen["frame"] = after
+
+    clock = ReplayClock()
+    actions = _executor(clock)
+    engine = MonitorEngine(grab=lambda: screen["frame"], click=click, wait=clock.sleep, log=lambda message: None,
+                           clock=clock.now, actions=actions)
+    try:
+        assert engine.run_batch_cycle(pairs, monitor_settings({}))
+        assert actions.wait_clicked("p2", timeout=10.0) is False
+    finally:
+        actions.close()
+        engine.close()
+    assert clicks == [(72, 22)] and actions.missed == 1
+
+
+def test_chain_follows_after_queued_click():
+    t1, g1, t2, g2 = (_patch(seed) for seed in range(4))
+    first = _pair("p1", t1, g1, (10, 10), (60, 10))
+    first["successors"] = [{"id": "p2", "timeout": 3.0}]
+    pairs = [first, _pair("p2", t2, g2, (10, 100), (60, 100))]
+    before = np.zeros((200, 200, 3), dtype=np.uint8)
+    _paste(before, t1, (10, 10))
+    _paste(before, g1, (60, 10))
+    after = np.zeros((200, 200, 3), dtype=np.uint8)  # 첫 클릭 뒤에야 다음 단계가 나타남
+    _paste(after, t2, (10, 100))
+    _paste(after, g2, (60, 100))
+    screen = {"frame": before}
+    clicks = []
+
+    def click(pos):
+        clicks.append(pos)
+        screen["frame"] = after
+
+    clock = ReplayClock()
+    actions = _executor(clock)
+    engine = MonitorEngine(grab=lambda: screen["frame"], click=click, wait=clock.sleep, log=lambda message: None,
+                           clock=clock.now, actions=actions)
+    try:
+        assert engine.run_batch_cycle(pairs, monitor_settings({}))
+        actions.wait_clicked("p2", timeout=10.0)
+    finally:
+        actions.close()
+        engine.close()
+    assert clicks == [(72, 22), (72, 112)] and engine.chain_clicks == 1
+
+
+def test_scheduler_state_follows_pair_id_and_is_pruned():
+    """검사 상태는 쌍 id 로 보관 (편집으로 dict 가 바뀌어도 유지), 목록에서 빠진 쌍은 정리"""
+    clock = ReplayClock()
+    scheduler = PairScheduler(clock.now)
+    pairs = [{"id": "p1"}, {"id": "p2"}]
+    for pair in pairs:
+        scheduler.mark_checked(pair, 2.0)
+    edited = dict(pairs[0], priority=1)
+    assert scheduler.latency_report([(0, edited)], 2.0)[0]["checks"] == 1
+    scheduler.prune([edited])
+    assert sorted(scheduler.states) == ["p1"]
+
+
+def test_trigger_cache_keyed_by_pair_id_and_pruned():
+    t1, g1, t2, g2 = (_patch(seed) for seed in range(4))
+    pairs = [_pair("p1", t1, g1, (10, 10), (60, 10)), _pair("p2", t2, g2, (10, 100), (60, 100))]
+    clock = ReplayClock()
+    engine = MonitorEngine(grab=lambda: np.zeros((200, 200, 3), dtype=np.uint8), click=lambda pos: None,
+                           wait=clock.sleep, log=lambda message: None, clock=clock.now)
+    try:
+        assert engine.run_batch_cycle(pairs, monitor_settings({}))
+        assert sorted(engine._trigger_cache) == ["p1", "p2"]
+        engine.run_batch_cycle(pairs[1:], monitor_settings({}))
+        assert sorted(engine._trigger_cache) == ["p2"]
+    finally:
+        engine.close()
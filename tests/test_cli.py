@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from click_click_core import main
+
+
+def test_bench_capture(capsys):
+    assert main(["bench-capture", "--repeat", "2"]) == 0
+    assert "numpy(ms)" in capsys.readouterr().out
+
+
+def test_bench_match(config_file, capsys):
+    assert main(["bench-match", "--config", config_file]) == 0
+    assert capsys.readouterr().out
+
+
+def test_bench_workers(config_file, capsys):
+    assert main(["bench-workers", "--config", config_file, "--workers", "1,2"]) == 0
+    out = capsys.readouterr().out
+    assert "템플릿 4개" in out and "작업자 2" in out
+
+
+def test_bench_grab(capsys):
+    """화면이 없는 환경에서도 실제 캡처 방식은 '사용 불가' 로 표시하고 file 방식은 측정"""
+    assert main(["bench-grab", "--repeat", "2"]) == 0
+    assert "file" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("mode", ["scheduled", "sequential"])
+def test_replay(config_file, tmp_path, mode):
+    out = tmp_path / "report.json"
+    assert main(["replay", "--config", config_file, "--mode", mode, "--json", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["settings"]["scan_mode"] == mode
+    assert len(report["pairs"]) == 2 and any(pair["clicks"] for pair in report["pairs"])
+
+
+def test_calibrate(config_file, capsys):
+    assert main(["calibrate", "--config", config_file, "--apply"]) == 0
+    assert capsys.readouterr().out
+
+
+def test_compact(config_file, tmp_path):
+    out = tmp_path / "compact.json"
+    assert main(["compact", "--config", config_file, "--json", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["files_after"] == report["files_before"] == 4
+    assert report["trimmed"] == 0  # 배경색 가장자리가 없는 무늬
+
+
+def test_export_and_bench_legacy(config_file, tmp_path, capsys):
+    legacy = str(tmp_path / "legacy.json")
+    assert main(["export-legacy", "--config", config_file, "--out", legacy]) == 0
+    assert main(["bench-legacy", legacy]) == 0
+    out = capsys.readouterr().out
+    assert "프로필 1개" in out and "stream" in out
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from click_click_core import TemplateEntry, TemplateMatcher, cv2, run_search
+from conftest import make_pattern
+
+BACKENDS = ["numpy"] + (["opencv"] if cv2 is not None else [])
+
+
+def _screen(seed=0, size=(640, 360)):
+    """부드러운 무작위 배경 (실제 화면처럼 이웃 픽셀이 비슷)"""
+    base = np.random.default_rng(seed).integers(0, 256, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    return np.asarray(Image.fromarray(base).resize(size, Image.BILINEAR)).copy()
+
+
+def _paste(frame, patch, left, top):
+    frame[top:top + patch.shape[0], left:left + patch.shape[1]] = patch
+
+
+@pytest.fixture(params=BACKENDS)
+def matcher(request):
+    return TemplateMatcher(request.param)
+
+
+def test_roi_search_finds_template_near_anchor(matcher):
+    templ = make_pattern(1, 32, 48)
+    frame = _screen()
+    _paste(frame, templ, 300, 200)
+    prepared = matcher.prepare(frame)
+    result, kind = run_search(matcher, prepared, TemplateEntry(templ), 0.9, key=3,
+                              anchors=[{"left": 290, "top": 205}], margin=40)
+    assert kind == "roi" and result.found and result.key == 3
+    assert (result.left, result.top, result.scale) == (300, 200, 1.0)
+
+
+def test_full_search_when_anchor_misses(matcher):
+    templ = make_pattern(2, 32, 48)
+    frame = _screen(1)
+    _paste(frame, templ, 40, 300)
+    result, kind = run_search(matcher, matcher.prepare(frame), TemplateEntry(templ), 0.9, key=0,
+                              anchors=[{"left": 500, "top": 20}], margin=40)
+    assert kind == "full" and result.found
+    assert (result.left, result.top) == (40, 300)
+
+
+def test_scaled_template_found_at_its_scale(matcher):
+    templ = make_pattern(3, 32, 48).repeat(2, axis=0).repeat(2, axis=1)  # 배율 변화에도 무늬가 남도록 굵게
+    frame = _screen(2)
+    scaled = np.asarray(Image.fromarray(templ).resize((templ.shape[1] * 5 // 4, templ.shape[0] * 5 // 4),
+                                                      Image.BILINEAR))
+    _paste(frame, scaled, 200, 100)
+    result, _ = run_search(matcher, matcher.prepare(frame), TemplateEntry(templ), 0.8, key=0, scales=[1.0, 1.25])
+    assert result.found and result.scale == 1.25
+    assert abs(result.left - 200) <= 2 and abs(result.top - 100) <= 2
+
+
+def test_missing_template_reports_best_score(matcher):
+    result, kind = run_search(matcher, matcher.prepare(_screen(3)), TemplateEntry(make_pattern(4, 32, 48)), 0.9, key=0)
+    assert kind == "full" and not result.found and result.score < 0.9
+
+
+def test_process_pool_shares_templates_once():
+    """프로세스 작업자에게 템플릿은 공유 메모리로 한 번만 넘기고 결과는 단일 작업자와 같음"""
+    from click_click_core import MatchPool, SearchJob
+
+    templates = [TemplateEntry(make_pattern(seed, 32, 48)) for seed in range(3)]
+    frame = _screen(4)
+    _paste(frame, templates[1].pixels, 100, 48)
+    jobs = [SearchJob(i, t, 0.9, [], 0, [1.0], f"t{i}") for i, t in enumerate(templates)]
+    matcher = TemplateMatcher("numpy")
+    expected = [(r.found, r.left, r.top) for r, _ in MatchPool(1, "numpy").search_many(matcher, frame, jobs)]
+    pool = MatchPool(2, "numpy", "process")
+    try:
+        for _ in range(2):
+            results = pool.search_many(matcher, frame, jobs)
+            assert [(r.found, r.left, r.top) for r, _ in results] == expected
+            names = {key: shm.name for key, (_, shm) in pool._templates.items()}
+            assert sorted(names) == ["t0", "t1", "t2"]
+        # 같은 cache_key 에 다른 배열이 오면 새 블록으로 교체
+        jobs[0] = jobs[0]._replace(templ=TemplateEntry(templates[1].pixels.copy()))
+        results = pool.search_many(matcher, frame, jobs)
+        assert results[0][0].found and pool._templates["t0"][1].name != names["t0"]
+    finally:
+        pool.close()
+    assert not pool._templates
+    assert expected[1] == (True, 100, 48)
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from click_click_core import (ProfileRepository, TemplateStore, data_dir_for, ensure_pair_ids, export_legacy_config,
+                              load_profile_pairs, read_config_stream)
+from conftest import make_pattern
+
+
+def _open(path):
+    repo = ProfileRepository(path, TemplateStore(data_dir_for(path)))
+    repo.load()
+    return repo
+
+
+def _pair(store, seed):
+    return {"description": f"쌍 {seed}",
+            "trigger": {"region": {"left": 0, "top": 0, "width": 60, "height": 30},
+                        "image_id": store.put(make_pattern(seed))},
+            "target": {"region": {"left": 100, "top": 0, "width": 60, "height": 30},
+                       "image_id": store.put(make_pattern(seed + 100))}}
+
+
+def test_journal_replayed_after_crash(config_file):
+    """저장(정리) 전에 끊겨도 저널에 기록된 변경은 다시 열 때 복구"""
+    repo = _open(config_file)
+    repo.add_pair("default", _pair(repo.store, 10))
+    repo.update_settings("default", {"monitoring_interval": 1.5})
+    repo.swap_pairs("default", 0, 2)
+    repo["새 프로필"] = {"image_pairs": []}
+    # 여기서 프로그램이 죽었다고 가정 (save/compact 없음), 마지막 줄은 쓰다 만 상태
+    with open(repo.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "remove_pair", "name": "default", "ind')
+
+    reopened = _open(config_file)
+    profile = reopened["default"]
+    assert [p["description"] for p in profile["image_pairs"]] == ["쌍 10", "쌍 2", "쌍 1"]
+    assert profile["monitoring_interval"] == 1.5
+    assert "새 프로필" in reopened
+
+
+def test_learned_hits_survive_reopen(config_file):
+    """모니터링 중 갱신된 발견 위치/배율/기억 위치는 저장(정리) 전에 끊겨도 다시 열 때 복구"""
+    repo = _open(config_file)
+    pairs = repo["default"]["image_pairs"]
+    for idx in ensure_pair_ids(pairs):
+        repo.update_pair("default", idx)
+    repo.swap_pairs("default", 0, 1)  # 학습 값은 번호가 아닌 쌍 id 로 기록
+    trigger = pairs[0]["trigger"]
+    trigger.update(last_hit={"left": 5, "top": 6}, last_scale=1.25,
+                   hit_memo=[{"left": 5, "top": 6, "scale": 1.25, "hits": 3, "misses": 0}])
+    assert repo.record_learned("default") == 1
+    assert repo.record_learned("default") == 0  # 바뀐 것이 없으면 기록하지 않음
+
+    reopened = _open(config_file)["default"]["image_pairs"][0]["trigger"]
+    assert reopened["last_hit"] == {"left": 5, "top": 6} and reopened["last_scale"] == 1.25
+    assert reopened["hit_memo"][0]["hits"] == 3
+
+
+def test_mark_dirty_rewrites_unjournaled_change(config_file):
+    """저널 기록에 실패해 메모리에만 추가한 쌍도 다음 저장 때 프로필 파일에 기록"""
+    repo = _open(config_file)
+    repo["default"]["image_pairs"].append(_pair(repo.store, 30))
+    repo.mark_dirty("default")
+    repo.save()
+    assert [p["description"] for p in _open(config_file)["default"]["image_pairs"]] == ["쌍 1", "쌍 2", "쌍 30"]
+
+
+def test_journal_not_applied_twice_after_interrupted_compaction(config_file):
+    """프로필 파일은 다 썼지만 저널을 비우기 전에 끊긴 경우: 이미 반영된 항목은 건너뜀"""
+    repo = _open(config_file)
+    repo.add_pair("default", _pair(repo.store, 20))
+    saved_journal = repo.journal_path + ".bak"
+    shutil.copy(repo.journal_path, saved_journal)
+    repo.save()
+    os.replace(saved_journal, repo.journal_path)  # 저널 교체 직전에 끊긴 상태
+
+    profile = _open(config_file)["default"]
+    assert [p["description"] for p in profile["image_pairs"]] == ["쌍 1", "쌍 2", "쌍 20"]
+
+
+def test_export_legacy_round_trip(config_file, tmp_path):
+    """구버전 단일 파일(pixel_data)로 내보낸 뒤 다시 마이그레이션해도 픽셀이 그대로"""
+    legacy = str(tmp_path / "legacy" / "click_config.json")
+    os.makedirs(os.path.dirname(legacy))
+    assert export_legacy_config(config_file, legacy, log=lambda message: None) == 1
+    with open(legacy, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    exported = data["profiles"]["default"]["image_pairs"]
+    assert "image_id" not in exported[0]["trigger"]
+    _, original = load_profile_pairs(config_file)
+    streamed = read_config_stream(legacy)["profiles"]["default"]["image_pairs"]
+    for before, plain, fast in zip(original["image_pairs"], exported, streamed):
+        for key in ("trigger", "target"):
+            np.testing.assert_array_equal(np.array(plain[key]["pixel_data"], dtype=np.uint8), before[key]["_pixels"])
+            np.testing.assert_array_equal(fast[key]["_pixels"], before[key]["_pixels"])
+
+    _open(legacy)  # 구버전 형식 -> 현재 형식으로 마이그레이션
+    _, migrated = load_profile_pairs(legacy)
+    for before, after in zip(original["image_pairs"], migrated["image_pairs"]):
+        for key in ("trigger", "target"):
+            assert after[key]["image_id"] == before[key]["image_id"]  # 내용 기반 ID
+            np.testing.assert_array_equal(after[key]["_pixels"], before[key]["_pixels"])
@@ -0,0 +1,26 @@
+import pytest
+
+from click_click_core import MonitorSettings
+
+
+@pytest.mark.parametrize("key", ["interval", "post_click_settle", "click_cooldown"])
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", float("nan")])
+def test_non_finite_values_rejected(key, value):
+    settings = MonitorSettings()
+    before = settings.snapshot()
+    with pytest.raises(ValueError):
+        settings.update({key: value})
+    assert settings.snapshot() == before
+
+
+def test_non_finite_profile_value_falls_back_to_default():
+    messages = []
+    settings = MonitorSettings()
+    settings.load_profile({"monitoring_interval": "nan", "post_click_settle": "inf"}, log=messages.append)
+    assert settings["interval"] == 5.0 and settings["post_click_settle"] == 2.0
+    assert len(messages) == 2
+
+
+def test_interval_clamped_to_minimum():
+    assert MonitorSettings.validate("interval", "1") == 5.0
+    assert MonitorSettings.validate("interval", 7.5) == 7.5
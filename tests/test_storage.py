@@ -0,0 +1,81 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from click_click_core import atomic_write, atomic_write_json
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX 권한")
+def test_atomic_write_keeps_existing_mode(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o644)
+    atomic_write_json(str(path), {"a": 1})
+    assert _mode(path) == 0o644
+    assert path.read_text(encoding="utf-8").strip().startswith("{")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX 권한")
+def test_atomic_write_new_file_uses_umask(tmp_path):
+    """새 파일은 mkstemp 의 0600 이 아니라 일반 open 으로 만든 파일과 같은 권한"""
+    plain = tmp_path / "plain"
+    plain.write_bytes(b"x")
+    path = tmp_path / "new.bin"
+    atomic_write(str(path), lambda f: f.write(b"data"))
+    assert path.read_bytes() == b"data"
+    assert _mode(path) == _mode(plain)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp_")]
+
+
+def _repository(tmp_path, names=(), cache_size=1):
+    """names 프로필을 저장한 저장소 (names 가 없으면 기존 파일을 그대로 읽음)"""
+    from click_click_core import ProfileRepository, TemplateStore, data_dir_for
+    path = str(tmp_path / "click_config.json")
+    repo = ProfileRepository(path, TemplateStore(data_dir_for(path)), cache_size=cache_size)
+    if not names:
+        repo.load()
+        return repo
+    for name in names:
+        repo[name] = {"image_pairs": [], "monitoring_interval": 5.0}
+    repo.save()
+    return repo
+
+
+def test_profile_not_evicted_while_snapshot_is_written(tmp_path):
+    repo = _repository(tmp_path, ["a", "b", "c"])
+    repo["a"]  # 바로 쓸 수 있도록 메모리에 올림
+    repo.update_settings("a", {"monitoring_interval": 1.0})
+    with repo._lock:
+        snapshot = repo._snapshot()  # 백그라운드 정리가 막 스냅샷을 뜬 상태
+    repo["b"]
+    repo["c"]  # LRU 초과: 쓰는 중인 a 는 내보내지 않아야 함
+    assert "a" in repo.loaded_names()
+    assert repo["a"]["monitoring_interval"] == 1.0  # 아직 쓰지 않은 옛 파일을 다시 읽지 않음
+    repo._write_snapshot(*snapshot)
+    repo["b"]
+    repo["c"]
+    assert "a" not in repo.loaded_names()
+    assert repo["a"]["monitoring_interval"] == 1.0
+
+
+def test_failed_snapshot_write_stays_dirty(tmp_path, monkeypatch):
+    import click_click_core
+    repo = _repository(tmp_path, ["a"])
+    repo.update_settings("a", {"monitoring_interval": 2.0})
+
+    def fail(path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(click_click_core, "atomic_write_json", fail)
+    with pytest.raises(OSError):
+        repo.save()
+    monkeypatch.undo()
+    assert "a" in repo._dirty
+    repo.save()
+    assert _repository(tmp_path)["a"]["monitoring_interval"] == 2.0
@@ -0,0 +1,39 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from click_click_core import JsonStreamReader, read_config_stream
+
+
+SCALARS = {
+    "confidence": 0.85,
+    "values": [0, -0.0, 2.5, 2.5e10, 1e-3, -12, 123456789, True, False, None],
+    "text": "한글 \"따옴표\" \\ 역슬래시 é",
+    "nested": {"empty_list": [], "empty_dict": {}, "list": [{"x": 1}, {"y": [1.5, -2]}]},
+}
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 65))
+def test_stream_matches_json_loads(chunk_size):
+    """조각 경계가 숫자/문자열 중간에 걸려도 json.loads 와 같은 결과"""
+    text = json.dumps(SCALARS, ensure_ascii=False, indent=2)
+    assert JsonStreamReader(io.StringIO(text), chunk_size).value() == json.loads(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_pixel_data_becomes_array(chunk_size):
+    pixels = [[[r, g, (r + g) % 256] for g in range(0, 250, 50)] for r in range(3)]
+    text = json.dumps({"trigger": {"pixel_data": pixels, "region": {"left": 1, "top": 2}}})
+    data = JsonStreamReader(io.StringIO(text), chunk_size).value()
+    assert "pixel_data" not in data["trigger"]
+    assert data["trigger"]["region"] == {"left": 1, "top": 2}
+    np.testing.assert_array_equal(data["trigger"]["_pixels"], np.array(pixels, dtype=np.uint8))
+
+
+def test_read_config_stream_rejects_trailing_garbage(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text('{"a": 1} x', encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_config_stream(str(path))
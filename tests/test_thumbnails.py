@@ -0,0 +1,12 @@
+from click_click_core import ThumbnailCache
+
+
+def test_thumbnail_prefetch_errors_go_to_log():
+    class BrokenStore:
+        def get(self, image_id):
+            raise OSError(f"{image_id} 읽기 실패")
+
+    messages = []
+    cache = ThumbnailCache(BrokenStore(), log=messages.append)
+    cache.prefetch([{"image_id": "a" * 64}], (50, 50)).join(5)
+    assert len(messages) == 1 and "썸네일 생성 오류" in messages[0]
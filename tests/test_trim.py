@@ -0,0 +1,27 @@
+import numpy as np
+
+from click_click_core import uniform_border
+
+
+def test_solid_box_keeps_its_edge():
+    """검은 바탕의 단색 상자: 상자만 남기면 단색이 되므로 배경 1줄을 둘러 경계를 남김"""
+    a = np.zeros((25, 60, 3), dtype=np.uint8)
+    a[5:20, 20:40] = 255
+    assert uniform_border(a) == (19, 4, 41, 21)
+
+
+def test_only_background_colored_lines_are_peeled():
+    """흰 바탕 위 회색 버튼: 버튼 안쪽 회색 줄은 배경색이 아니므로 남김"""
+    a = np.full((25, 60, 3), 255, dtype=np.uint8)
+    a[4:21, 10:50] = 200
+    a[9:16, 18:42] = np.where(np.random.default_rng(1).random((7, 24, 1)) > 0.5, 0, 200)
+    assert uniform_border(a) == (9, 3, 51, 22)
+
+
+def test_no_trim_without_distinct_content():
+    rng = np.random.default_rng(0)
+    assert uniform_border(np.full((25, 60, 3), 7, dtype=np.uint8)) is None
+    assert uniform_border(rng.integers(0, 256, (25, 60, 3), dtype=np.uint8)) is None  # 배경색 없음
+    stripes = np.full((25, 60, 3), 255, dtype=np.uint8)
+    stripes[8:17, 4:56:4] = 0  # 잘라내면 원래 캡처의 다른 위치와도 똑같이 맞는 반복 무늬
+    assert uniform_border(stripes) is None
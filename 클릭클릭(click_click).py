@@ -10,12 +10,23 @@ import os
 import json
 import numpy as np
 from PIL import Image, ImageTk
-from tkinter import simpledialog, messagebox
+from tkinter import simpledialog, messagebox, filedialog
 from datetime import datetime
 import gc
 import ctypes
 from pynput import keyboard as pynput_keyboard
 import copy
+import multiprocessing
+from collections import OrderedDict
+from click_click_core import (
+    TemplateStore, TemplateCache, ThumbnailCache, THUMBNAIL_CACHE_SIZE, data_dir_for, image_to_array,
+    ProfileRepository, default_profile,
+    TemplateMatcher, MonitorEngine, MonitorMetrics, ActionExecutor, MonitorSettings, LogPipeline, MIN_POLL_PERIOD,
+    make_screen_source, parse_scales, load_frames, calibrate_pairs, apply_calibration, format_calibration,
+    compact_profiles, format_compaction,
+    CHAIN_TIMEOUT, new_pair_id, ensure_pair_ids, successor_links, chained_ids, creates_cycle,
+    remove_successor_refs
+)
 
 # 화면 보호기를 비활성화하는 상수
 ES_CONTINUOUS = 0x80000000
@@ -39,7 +50,7 @@ profile_switching = False  # 프로필 전환 중인지 여부 플래그 추가
 
 # ========== 프로필 관리 전역 변수 ==========
 current_profile_name = "default"  # 현재 활성 프로필명
-all_profiles = {}  # 모든 프로필 데이터
+all_profiles = None  # 모든 프로필 데이터 (ProfileRepository - 색인만 읽고 프로필은 필요할 때 로드)
 
 def prevent_screen_saver():
     """화면 보호기 실행을 방지하는 함수"""
@@ -92,6 +103,19 @@ def keep_screen_active():
 # 설정 파일 경로 
 #CONFIG_FILE = os.path.expanduser("~") + "\\click_config.json"
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), "click_config.json")
+# 트리거/타겟 이미지는 설정 파일 옆 폴더에 PNG로 저장 (JSON에는 메타데이터만)
+template_store = TemplateStore(data_dir_for(CONFIG_FILE))
+# 현재 프로필의 디코딩된 템플릿/그레이/축소본/썸네일 캐시 (쌍 추가/삭제 시에만 갱신)
+template_cache = TemplateCache(template_store)
+# 목록/캡처 미리보기용 썸네일 캐시 ((이미지 ID, 칸 크기) 별 LRU, 프로필 로드 후 백그라운드에서 채움)
+thumbnail_cache = ThumbnailCache(template_store)
+# 미리보기 칸 크기 (픽셀)
+PREVIEW_SIZE = (150, 150)
+# 프로필 저장소 (click_config.json 은 색인, 프로필별 메타데이터는 사이드카 폴더의 profiles/*.json)
+all_profiles = ProfileRepository(CONFIG_FILE, template_store)
+# 화면 캡처 방식 (프로필의 screen_source: auto/mss/pillow/pyautogui/file:<폴더>), 캡처와 모니터링이 함께 사용
+screen_source = None
+screen_source_spec = None
 # 임시 캡처 데이터
 temp_trigger_data = None
 temp_target_data = None
@@ -101,6 +125,11 @@ image_pairs = []
 
 # 로그 UI 변수
 log_text = None
+# 실행 로그 창에 남겨 둘 최대 줄 수 (넘치면 오래된 줄부터 지움, 전체 기록은 로그 파일에 남음)
+LOG_MAX_LINES = 1000
+# 쌓인 로그를 창에 옮기는 주기(ms)
+LOG_DRAIN_INTERVAL = 200
+LOG_FILE = os.path.join(data_dir_for(CONFIG_FILE), "click_click.log")
 
 # 마우스 위치 주변의 화면 영역 캡처 및 픽셀 데이터로 변환
 # 기존 capture_screen_region 함수 수정 배율적용..
@@ -114,30 +143,43 @@ def capture_screen_region(x, y, width=60, height=25, multiplier=1):
         left = max(0, x - adjusted_width // 2)
         top = max(0, y - adjusted_height // 2)
         
-        # 스크린샷 촬영
-        screenshot = pyautogui.screenshot(region=(left, top, adjusted_width, adjusted_height))
-        
-        # 픽셀 데이터 추출
-        pixel_data = []
-        for y_pos in range(screenshot.height):
-            row = []
-            for x_pos in range(screenshot.width):
-                r, g, b = screenshot.getpixel((x_pos, y_pos))
-                row.append([r, g, b])
-            pixel_data.append(row)
+        # 스크린샷 촬영 (캡처 영역만 가져와 (H, W, 3) 배열로 변환)
+        pixels = grab_screen(region=(left, top, adjusted_width, adjusted_height))
         
         capture_info = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "position": {"x": x, "y": y},
             "region": {"left": left, "top": top, "width": adjusted_width, "height": adjusted_height},
-            "pixel_data": pixel_data
+            "_pixels": pixels  # 런타임 전용 (저장 시 PNG 파일로 분리)
         }
         
-        return capture_info, screenshot
+        return capture_info, pixels
     except Exception as e:
         print(f"화면 캡처 오류: {e}")
         return None, None
 
+def set_screen_source(spec):
+    """프로필에 지정된 화면 캡처 방식으로 전환 (실패하면 자동 선택)"""
+    global screen_source, screen_source_spec
+    spec = spec or "auto"
+    if screen_source is not None and spec == screen_source_spec:
+        return
+    try:
+        source = make_screen_source(spec)
+    except Exception as e:
+        print(f"화면 캡처 방식 '{spec}' 사용 불가 ({e}) - 자동 선택으로 전환")
+        source = make_screen_source("auto")
+    if screen_source is not None:
+        screen_source.close()
+    screen_source, screen_source_spec = source, spec
+    print(f"화면 캡처 방식: {screen_source.name}")
+
+# 화면 전체(모니터링 사이클당 1회) 또는 지정 영역을 (H, W, 3) 배열로 캡처
+def grab_screen(region=None):
+    if screen_source is None:
+        set_screen_source("auto")
+    return screen_source.grab(region=region)
+
 # 픽셀 데이터에서 PIL 이미지로 변환
 def pixel_data_to_image(pixel_data):
     try:
@@ -179,53 +221,25 @@ def reset_capture_state(app=None):
 
 
 def load_all_profiles():
-    """모든 프로필을 파일에서 로드"""
+    """프로필 색인을 로드하고 현재 프로필만 읽어옴 (나머지 프로필은 전환 시 로드)"""
     global all_profiles, current_profile_name, image_pairs, trigger_capture_multiplier, target_capture_multiplier
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-                # ========== 이전 버전 호환성 체크 ==========
-                # 새 버전 형식인지 확인 (profiles 키가 있으면 새 버전)
-                if "profiles" in data:
-                    # 새 버전 형식
-                    all_profiles = data.get("profiles", {})
-                    current_profile_name = data.get("current_profile", "default")
-                else:
-                    # ========== 구버전 형식 감지 -> 자동 마이그레이션 ==========
-                    print("구버전 설정 파일 감지 - default 프로필로 마이그레이션 중...")
-                    old_multiplier = data.get("capture_size_multiplier", 1)
-                    all_profiles = {
-                        "default": {
-                            "image_pairs": data.get("image_pairs", []),
-                            "trigger_capture_multiplier": old_multiplier,
-                            "target_capture_multiplier": old_multiplier
-                        }
-                    }
-                    current_profile_name = "default"
-                    print("마이그레이션 완료 - 기존 데이터가 'default' 프로필로 저장되었습니다.")
-                
-                # 기본 프로필이 없으면 생성
-                if not all_profiles:
-                    all_profiles["default"] = {
-                        "image_pairs": [],
-                        "trigger_capture_multiplier": 1,
-                        "target_capture_multiplier": 1
-                    }
-                
-                # 현재 프로필 로드
-                load_profile(current_profile_name)
-                return True
+        # 구버전(단일 JSON/pixel_data) 형식이면 여기서 1회 변환
+        if all_profiles.load(log=print):
+            current_profile_name = all_profiles.current_profile
         else:
             # 파일이 없으면 기본 프로필 생성
-            all_profiles["default"] = {
-                "image_pairs": [],
-                "trigger_capture_multiplier": 1,
-                "target_capture_multiplier": 1
-            }
             current_profile_name = "default"
-            load_profile("default")
+        
+        # 기본 프로필이 없으면 생성
+        if not all_profiles:
+            all_profiles["default"] = default_profile()
+        if current_profile_name not in all_profiles:
+            current_profile_name = "default" if "default" in all_profiles else next(iter(all_profiles))
+        
+        # 현재 프로필 로드
+        load_profile(current_profile_name)
+        return True
     except Exception as e:
         print(f"프로필 로드 오류: {e}")
     return False
@@ -236,55 +250,64 @@ def save_all_profiles():
         # 현재 작업중인 데이터를 현재 프로필에 저장
         save_current_to_profile()
         
-        data = {
-            "current_profile": current_profile_name,
-            "profiles": all_profiles
-        }
-        
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # 이미지는 이미 파일로 저장되어 있으므로 변경된 프로필 메타데이터와 색인만 기록
+        all_profiles.save(current_profile_name)
         return True
     except Exception as e:
         print(f"프로필 저장 오류: {e}")
         return False
 
 def save_current_to_profile():
-    """현재 UI의 정밀도 및 간격 설정을 포함하여 프로필에 저장"""
+    """현재 UI의 정밀도 및 간격 설정을 프로필에 반영 (바뀐 설정값만 저널에 기록)"""
     global all_profiles, current_profile_name, image_pairs, trigger_capture_multiplier, target_capture_multiplier
     
-    # UI에서 현재 값 가져오기 (비어있거나 에러 시 기본값 사용)
-    try:
-        t_conf = float(app.trigger_conf_entry.get())
-    except: t_conf = 0.8
-    try:
-        tar_conf = float(app.target_conf_entry.get())
-    except: tar_conf = 0.9
-    try:
-        interval = float(app.interval_entry.get())
-    except: interval = 5.0
+    # 입력 칸에서 검증된 현재 값 (잘못 입력 중인 칸은 마지막으로 올바르던 값)
+    live = app.thread_safe_config.snapshot() if app else MonitorSettings().snapshot()
     
-    profile_data = {
+    # 이미지 쌍은 추가/수정/삭제 시점에 이미 개별 기록되므로 설정값만 반영
+    # (UI에 없는 프로필 설정값(검사 모드 등)은 그대로 유지)
+    settings = {
         "trigger_capture_multiplier": trigger_capture_multiplier,
         "target_capture_multiplier": target_capture_multiplier,
-        "trigger_confidence": t_conf,
-        "target_confidence": tar_conf,
-        "monitoring_interval": interval,
-        "image_pairs": []
+        "trigger_confidence": live["trigger_conf"],
+        "target_confidence": live["target_conf"],
+        "monitoring_interval": live["interval"],
+        "post_click_settle": live["post_click_settle"],
     }
-    
-    # 기존 image_pairs 저장 로직
-    for pair in image_pairs:
-        trigger = pair.get("trigger", {})
-        target = pair.get("target", {})
-        profile_data["image_pairs"].append({
-            "trigger": trigger,
-            "target": target,
-            "timestamp": pair.get("timestamp", ""),
-            "description": pair.get("description", "설명 없음"),
-            "action_delay": pair.get("action_delay", 0)
-        })
-    
-    all_profiles[current_profile_name] = profile_data
+    if app:
+        settings["scan_mode"] = live["scan_mode"]
+    all_profiles.update_settings(current_profile_name, settings)
+
+def save_pair_change(change, index=None, other=None, pair=None):
+    """이미지 쌍 하나의 추가/수정/삭제/순서 변경만 저널에 기록 (전체 설정 파일을 다시 쓰지 않음)"""
+    try:
+        if change == "add":
+            all_profiles.add_pair(current_profile_name, pair)
+        elif change == "update":
+            all_profiles.update_pair(current_profile_name, index)
+        elif change == "remove":
+            all_profiles.remove_pair(current_profile_name, index)
+        elif change == "swap":
+            all_profiles.swap_pairs(current_profile_name, index, other)
+        return True
+    except Exception as e:
+        print(f"프로필 저장 오류: {e}")
+        # 저널에 못 쓴 변경도 메모리에는 반영해 두고 다음 저장 때 프로필 파일을 통째로 다시 씀
+        if change == "add":
+            image_pairs.append(pair)
+        elif change == "remove":
+            del image_pairs[index]
+        elif change == "swap":
+            image_pairs[index], image_pairs[other] = image_pairs[other], image_pairs[index]
+        all_profiles.mark_dirty(current_profile_name)
+        return False
+
+def save_learned_hits():
+    """모니터링 중 갱신된 발견 위치/배율/기억 위치를 저널에 기록 (바뀐 쌍만)"""
+    try:
+        all_profiles.record_learned(current_profile_name)
+    except Exception as e:
+        print(f"프로필 저장 오류: {e}")
 
 def load_profile(profile_name):
     """특정 프로필을 로드하고 UI 항목들을 업데이트"""
@@ -297,10 +320,16 @@ def load_profile(profile_name):
     capturing_mode = False
     capture_step = 0
     
+    # 처음 여는 프로필이면 이때 파일에서 읽음 (최근 사용 프로필은 메모리에 유지)
     profile_data = all_profiles[profile_name]
     current_profile_name = profile_name
+    all_profiles.pin(profile_name)
     
-    image_pairs = profile_data.get("image_pairs", [])
+    # 프로필의 쌍 목록을 그대로 공유 (쌍 추가/삭제는 저장소를 통해 이 목록에 반영됨)
+    image_pairs = profile_data.setdefault("image_pairs", [])
+    # 후속 쌍 연결용 id 가 없는 (이전 버전) 쌍에 id 부여
+    for idx in ensure_pair_ids(image_pairs):
+        save_pair_change("update", idx)
     # 트리거/타겟 개별 배율 로드 (하위호환성: 기존 capture_size_multiplier 사용)
     trigger_capture_multiplier = profile_data.get("trigger_capture_multiplier", 
                                                     profile_data.get("capture_size_multiplier", 1))
@@ -309,6 +338,9 @@ def load_profile(profile_name):
     
     # UI 엔트리 값 업데이트
     if app:
+        # 모니터링 설정 전체 반영 (입력 칸은 아래에서 같은 값으로 채워짐)
+        app.thread_safe_config.load_profile(profile_data)
+
         app.trigger_conf_entry.delete(0, tk.END)
         app.trigger_conf_entry.insert(0, str(profile_data.get("trigger_confidence", 0.8)))
         
@@ -318,13 +350,28 @@ def load_profile(profile_name):
         app.interval_entry.delete(0, tk.END)
         app.interval_entry.insert(0, str(profile_data.get("monitoring_interval", 5.0)))
         
+        app.settle_entry.delete(0, tk.END)
+        app.settle_entry.insert(0, str(app.thread_safe_config["post_click_settle"]))
+        
+        app.scan_mode_var.set(app.thread_safe_config["scan_mode"])
+        
         # UI에 트리거/타겟 배율 업데이트
         app.update_capture_size_display()
     
-    # 이미지 데이터 복원
-    for pair in image_pairs:
-        pair["_trigger_img"] = pixel_data_to_image(pair["trigger"]["pixel_data"])
-        pair["_target_img"] = pixel_data_to_image(pair["target"]["pixel_data"])
+    # 프로필별 화면 캡처 방식
+    try:
+        set_screen_source(profile_data.get("screen_source", "auto"))
+    except Exception as e:
+        print(f"화면 캡처 방식 설정 오류: {e}")
+    
+    # 이미지 데이터 복원 (PNG 파일에서 한 번만 디코딩해 캐시)
+    try:
+        template_cache.build(image_pairs)
+    except Exception as e:
+        print(f"이미지 로드 오류: {e}")
+    # 목록을 넘길 때 바로 보이도록 미리보기 썸네일을 백그라운드에서 생성
+    thumbnail_cache.prefetch([pair.get(key) for pair in image_pairs for key in ("trigger", "target")],
+                             PREVIEW_SIZE)
     
     return True
 
@@ -335,11 +382,7 @@ def create_new_profile(profile_name):
     if profile_name in all_profiles:
         return False  # 이미 존재
     
-    all_profiles[profile_name] = {
-        "image_pairs": [],
-        "trigger_capture_multiplier": 1,
-        "target_capture_multiplier": 1
-    }
+    all_profiles[profile_name] = default_profile()
     return True
 
 def delete_profile(profile_name):
@@ -410,7 +453,13 @@ def save_captured_pair(app, description=None):
     global temp_trigger_data, temp_target_data, image_pairs
     
     if temp_trigger_data and temp_target_data:
+        # 픽셀 배열은 PNG 파일로 저장하고 설정에는 image_id 만 남김
+        for info in (temp_trigger_data, temp_target_data):
+            if "image_id" not in info:
+                info["image_id"] = template_store.put(info["_pixels"])
+        
         image_pair = {
+            "id": new_pair_id(),
             "trigger": temp_trigger_data,
             "target": temp_target_data,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -418,17 +467,14 @@ def save_captured_pair(app, description=None):
             "action_delay": 0  # 기본값: 0초 (즉시 동작)
         }
         
-        # 이미지 객체 생성 (메모리용)
-        image_pair["_trigger_img"] = pixel_data_to_image(temp_trigger_data["pixel_data"])
-        image_pair["_target_img"] = pixel_data_to_image(temp_target_data["pixel_data"])
+        # 템플릿 캐시에 새 쌍 추가 (매칭/미리보기용)
+        template_cache.add_pair(image_pair)
         
-        image_pairs.append(image_pair)
-        
-        # 캡처 직후 즉시 파일 저장!
-        if save_config():
+        # 캡처 직후 즉시 저널에 기록 (이 쌍만 추가로 기록)
+        if save_pair_change("add", pair=image_pair):
             app.status_callback(f"이미지 쌍 #{len(image_pairs)} 저장 및 파일 기록 완료!")
         else:
-            app.status_callback("이미지는 등록됐으나 파일 저장 실패 (구조 에러)")
+            app.status_callback(f"이미지 쌍 #{len(image_pairs)} 등록됨 (파일 기록 실패 - 다음 저장 때 다시 기록)")
 
         temp_trigger_data = None
         temp_target_data = None
@@ -459,9 +505,9 @@ def find_pattern_on_screen(pixel_data, confidence=0.8):
         if needle_img is None:
             return None
         
-        # 화면에서 이미지 찾기
-        location = pyautogui.locateCenterOnScreen(needle_img, confidence=confidence)
-        return location
+        # 화면에서 이미지 찾기 (현재 화면 캡처 방식 + 매칭 엔진 사용)
+        result = TemplateMatcher().locate(grab_screen(), image_to_array(needle_img), confidence)
+        return result.center if result.found else None
     except Exception as e:
         print(f"패턴 검색 오류: {e}")
         return None
@@ -474,13 +520,19 @@ def get_interval(entry, default=5, min_value=5):
         return default
 
 
-def safe_sleep(seconds, event_to_wait):
-    """event_to_wait가 set되어 있는 동안에만 sleep하며, 0.1초마다 중단 여부를 체크 (정밀도 향상)"""
+def safe_sleep(seconds, event_to_wait, wake=None):
+    """event_to_wait가 set되어 있는 동안에만 sleep하며, 0.1초마다 중단 여부를 체크 (정밀도 향상)
+    wake 이벤트가 켜지면 (설정 변경 등) 남은 시간을 기다리지 않고 True 반환"""
     start_time = time.time()
     while (time.time() - start_time) < seconds:
         # 모니터링이 꺼지면 즉시 대기 중단
         if not event_to_wait.is_set() or shutdown_event.is_set():
             return False
+        if wake is not None:
+            # 0.1초 단위로 대기하되 wake 가 켜지면 바로 깨어남
+            if wake.wait(min(0.1, seconds - (time.time() - start_time))):
+                return True
+            continue
         # 0.1초 단위로 대기하여 반응성 및 소수점 시간 정밀도 향상
         time.sleep(0.1)
     return True
@@ -580,11 +632,48 @@ class AutoClickerApp:
         3. 정밀도 및 간격 설정
         - 트리거/타겟: 0.0 ~ 1.0 사이 값 (높을수록 엄격하게 검사)
         - 간격(초): 이미지 검사 사이의 대기 시간입니다. 기본은 5초 입니다.
-        - 초기화: 설정을 기본값(0.8, 0.9, 5.0)으로 되돌립니다.
+        - 클릭 후 대기(초): 클릭한 뒤 화면이 바뀔 때까지 다음 클릭을 미루는 시간입니다.
+          (기본 2초) 클릭과 대기는 별도로 처리되어 그동안에도 다른 쌍은 계속 검사하며,
+          같은 쌍은 클릭 후 2초(프로필의 click_cooldown) 동안 다시 클릭하지 않습니다.
+        - 초기화: 설정을 기본값(0.8, 0.9, 5.0, 2.0)으로 되돌립니다.
+        - 입력한 값은 모니터링 중에도 다음 검사부터 바로 반영됩니다. 범위를 벗어난
+          값은 칸이 빨갛게 표시되고 반영되지 않습니다. (정밀도 0.1 ~ 1.0, 간격 5초 이상)
+        - 탐색 범위 전환: 선택한 쌍을 캡처했던 위치(또는 마지막 발견 위치) 주변부터
+          찾을지, 항상 전체 화면에서 찾을지 정합니다. 주변에서 못 찾으면 전체 화면을
+          검색합니다. (여백은 프로필의 roi_margin, 기본 200px)
+        - 쌍마다 최근에 찾은 위치 4곳을 기억해 두고, 검사할 때 그 위치들만 먼저 확인합니다.
+          거기서 찾으면 주변/전체 화면 검색을 하지 않습니다. 다른 위치에서만 5번 연속
+          발견되면 예전 위치는 기억에서 지웁니다.
+        - 검사 주기/우선순위: 선택한 쌍만 따로 검사 주기(초)와 우선순위를 정합니다.
+          검사 시각이 된 쌍들은 화면을 한 번만 캡처해 함께 검사합니다.
+          (주기를 0으로 두면 위의 검사 간격을 사용)
+        - 순차 검사(호환): 체크하면 이전 버전처럼 이미지 쌍마다 간격만큼 대기하며
+          검사합니다.
+        - 다음 단계 연결: 선택한 쌍을 클릭한 직후 곧바로 검사할 쌍을 정합니다.
+          (예: #3 클릭 후 #4를 최대 1초 동안 반복 검사) 다음 단계로 지정된 쌍은
+          앞 단계가 클릭했을 때만 검사하므로, 여러 단계 작업이 검사 간격을 기다리지
+          않고 이어서 진행됩니다.
+        - 배율 탐색: 캡처할 때와 화면 배율(125%, 150%)이나 모니터가 달라 이미지를
+          못 찾을 때, 시도할 배율을 정합니다. 찾은 배율은 기억해 다음에 먼저 시도합니다.
+        - 정밀도 보정: 실제 작업 화면을 저장해 둔 폴더를 고르면, 쌍마다 정답 위치와
+          헷갈리는 다른 위치의 일치도를 비교해 트리거/타겟 정밀도를 제안합니다.
+          적용하면 그 쌍에만 [정밀도 트리거/타겟]으로 저장되고 위의 기본값보다 우선합니다.
+        - 실행 로그 창에는 최근 1000줄만 남깁니다. 전체 기록은 설정 폴더의
+          click_config_data/click_click.log 에 저장됩니다. (1MB마다 교체, 3개 보관)
+        - 성능 통계: 실행 로그 아래에 쌍별 발견률, 일치도, 매칭 시간과 사이클 시간을
+          보여줍니다. '통계 내보내기'로 최근 기록을 CSV/JSON lines 파일로 저장해
+          정밀도나 검사 간격을 조정할 때 참고할 수 있습니다.
     
         4. 프로필 관리
         - 추가/삭제: 작업별 설정 리스트를 관리합니다.
         - 사용자 홈폴더에 설정파일이 있고, 저장됩니다. (click_config.json)
+        - 캡처한 이미지는 click_config_data/images 에 내용별로 한 번만 저장됩니다.
+          프로필을 복사하거나 같은 버튼을 다시 캡처해도 파일이 늘어나지 않습니다.
+        - 이미지 정리: 모든 프로필의 이미지에서 배경색뿐인 가장자리를 잘라내고(클릭 위치는
+          그대로), 중복되거나 삭제/재캡처로 쓰지 않게 된 이미지 파일을 지웁니다.
+          줄어든 용량과 쌍별 매칭 시간 변화를 실행 로그에 보여줍니다.
+        - 화면 캡처 방식은 프로필의 screen_source 로 정합니다. (auto: mss가 설치되어
+          있으면 mss, 아니면 PIL ImageGrab, pyautogui 순서로 사용)
     
         [ 사용 순서 ]
         1. '프로필 추가'로 새 작업을 만듭니다. 
@@ -617,7 +706,7 @@ class AutoClickerApp:
         
         idx = selected[0]
         # 리스트 내 위치 교환
-        image_pairs[idx], image_pairs[idx-1] = image_pairs[idx-1], image_pairs[idx]
+        save_pair_change("swap", idx, idx - 1)
         self.refresh_after_reorder(idx - 1)
 
     def move_down(self):
@@ -628,12 +717,11 @@ class AutoClickerApp:
         
         idx = selected[0]
         # 리스트 내 위치 교환
-        image_pairs[idx], image_pairs[idx+1] = image_pairs[idx+1], image_pairs[idx]
+        save_pair_change("swap", idx, idx + 1)
         self.refresh_after_reorder(idx + 1)
 
     def refresh_after_reorder(self, new_selection_idx):
-        """순서 변경 후 UI 및 설정 파일 동기화"""
-        save_config()
+        """순서 변경 후 UI 동기화"""
         self.update_image_list()
         self.image_listbox.selection_set(new_selection_idx)
         # 선택된 항목의 미리보기도 즉시 업데이트
@@ -678,12 +766,16 @@ class AutoClickerApp:
         global app
         app = self
         
-        # [추가] 스레드 안전성을 위한 설정값 저장소
-        self.thread_safe_config = {
-            "interval": 5.0,
-            "trigger_conf": 0.8,
-            "target_conf": 0.9
-        }
+        # [추가] 스레드 안전성을 위한 설정값 저장소 (입력 칸을 고칠 때마다 검증 후 반영, 모니터링 스레드를 깨움)
+        self.thread_safe_config = MonitorSettings()
+
+        # 실행 로그 통로 (작업 스레드는 큐에 넣기만 하고, 창에는 drain_log_loop 가 모아서 표시)
+        self.log_pipeline = LogPipeline(LOG_FILE)
+        thumbnail_cache.log = self.status_callback
+
+        # 모니터링 측정값 (쌍별 캡처/매칭 시간, 점수, 사이클 시간) - 통계 패널과 내보내기에서 사용
+        self.metrics = MonitorMetrics()
+        self._stats_version = -1
         
         # F8 키 핫키 설정 (함수명 수정 및 메서드 연결)
         try:
@@ -736,8 +828,8 @@ class AutoClickerApp:
         # 메모리 정리 스레드 시작
         start_memory_cleaner()
         
-        # [추가] GUI 설정값 동기화 루프 시작
-        self.sync_config_loop()
+        self.refresh_stats_loop()
+        self.drain_log_loop()
 
     # [이동 및 수정] F8 키 핸들러 (이름 변경: f9 -> f8)
     def handle_f8_key(self):
@@ -775,20 +867,20 @@ class AutoClickerApp:
             else:  # 타겟
                 multiplier = target_capture_multiplier
             
-            capture_info, screenshot = capture_screen_region(x, y, multiplier=multiplier)
+            capture_info, pixels = capture_screen_region(x, y, multiplier=multiplier)
             
-            if capture_info and screenshot:
+            if capture_info and pixels is not None:
                 if capture_type == "트리거":
                     temp_trigger_data = capture_info
                     
                     self.status_callback(f"트리거 이미지 캡처 완료: 위치 ({x}, {y}), 배율 {multiplier}배")
-                    self.update_capture_preview(screenshot, "트리거 이미지")
+                    self.update_capture_preview(pixels, "트리거 이미지")
                     capture_step = 2
                 elif capture_type == "타겟":
                     temp_target_data = capture_info
                     
                     self.status_callback(f"타겟 이미지 캡처 완료: 위치 ({x}, {y}), 배율 {multiplier}배")
-                    self.update_capture_preview(screenshot, "타겟 이미지")
+                    self.update_capture_preview(pixels, "타겟 이미지")
                     
                     # 메인 스레드에서 설명 대화 상자 표시
                     self.root.after(10, lambda: ask_description_in_main_thread(self))
@@ -806,59 +898,68 @@ class AutoClickerApp:
             self.status_callback("등록된 이미지 쌍이 없습니다.")
             return
 
-        self.status_callback("모니터링 스레드 시작 (순차 검사 모드)")
-
-        while monitoring_event.is_set() and not shutdown_event.is_set():
-            # (1) 인터벌 값 가져오기 (스레드 안전 변수 사용)
-            interval = self.thread_safe_config.get("interval", 5.0)
-
-            for idx, pair in enumerate(image_pairs):
-                if not monitoring_event.is_set(): break
+        # 동작 전 대기/타겟 재확인/클릭/안정화 대기는 별도 스레드에서 (그동안에도 다른 쌍 검사는 계속)
+        actions = ActionExecutor(log=self.status_callback)
+        engine = MonitorEngine(
+            grab=grab_screen,
+            click=self.click_target,
+            wait=lambda seconds: safe_sleep(seconds, monitoring_event),
+            log=self.status_callback,
+            metrics=self.metrics,
+            actions=actions
+        )
+        engine.apply_settings(self.thread_safe_config.snapshot())
+        self.status_callback(f"모니터링 스레드 시작 (매칭 엔진: {engine.matcher.backend}, "
+                             f"작업자 {engine.pool.workers}개/{engine.pool.mode})")
+        last_report = time.monotonic()
 
-                # 첫 번째 항목부터 대기 적용
-                self.status_callback(f"#{idx+1} 검사 전 {interval}초 대기...")
-                if not safe_sleep(interval, monitoring_event): break
+        try:
+            while monitoring_event.is_set() and not shutdown_event.is_set():
+                # 설정값 스냅샷 (바뀌었으면 새 간격으로 다음 검사 시각부터 다시 계산)
+                changed = self.thread_safe_config.consume_change()
+                settings = self.thread_safe_config.snapshot()
+                if changed:
+                    engine.settings_changed(image_pairs, settings)
 
                 try:
-                    # GUI 정밀도 설정 로드 (스레드 안전 변수 사용)
-                    t_conf = self.thread_safe_config.get("trigger_conf", 0.8)
-                    tar_conf = self.thread_safe_config.get("target_conf", 0.9)
-
-                    trigger_img = pair.get("_trigger_img")
-                    target_img = pair.get("_target_img")
-
-                    if not trigger_img or not target_img:
+                    if settings.get("scan_mode") == "sequential":
+                        # 호환 모드: 쌍마다 간격 대기 후 개별 캡처
+                        if not engine.run_sequential_cycle(image_pairs, settings):
+                            break
+                        self.status_callback(
+                            f"한 사이클 완료 (누적 화면 캡처 {engine.grab_count}회). 다음 사이클을 시작합니다.")
                         continue
 
-                    # 트리거 탐색
-                    trigger_pos = pyautogui.locateCenterOnScreen(trigger_img, confidence=t_conf)
-
-                    if trigger_pos:
-                        self.status_callback(f"#{idx+1} 트리거 발견!")
-                        
-                        # [추가] 트리거 발견 후 타겟 찾기 전 대기 (개별 설정)
-                        action_delay = pair.get("action_delay", 0)
-                        if action_delay > 0:
-                            self.status_callback(f"  -> {action_delay}초 대기 (설정값)...")
-                            if not safe_sleep(action_delay, monitoring_event): break
-                            
-                        target_pos = pyautogui.locateCenterOnScreen(target_img, confidence=tar_conf)
-
-                        if target_pos:
-                            pyautogui.click(target_pos)
-                            self.status_callback(f"#{idx+1} 타겟 클릭 완료!")
-                            pyautogui.moveRel(50, 50, duration=0.2)
-                            time.sleep(2) # 클릭 후 최소한의 동작 안정화 대기
-                        else:
-                            self.status_callback(f"#{idx+1} 트리거는 찾았으나 타겟 미발견")
-                    
+                    # 기본 모드: 검사 시각이 된 쌍들을 화면 1회 캡처로 묶어 검사
+                    next_in = engine.run_scheduled_step(image_pairs, settings)
+                    if next_in is None:
+                        break
+                    if time.monotonic() - last_report >= 60:
+                        last_report = time.monotonic()
+                        save_learned_hits()
+                        self.status_callback(
+                            f"[스케줄러] 누적 화면 캡처 {engine.grab_count}회, 기억 위치 확인 성공 {engine.memo_hits}회, "
+                            f"주변 탐색 성공 {engine.roi_hits}회, "
+                            f"전체 화면 탐색 {engine.full_searches}회, 변화 없어 건너뛴 화면 {engine.frames_skipped}회, "
+                            f"다시 검사한 타일 {engine.tiles_rescanned}개 / 최악 반응 지연: "
+                            f"{engine.latency_summary(image_pairs, settings)}")
+                    # 설정이 바뀌면 즉시 깨어나 반영, 쌍 추가/수정은 최대 1초 안에 반영
+                    if not safe_sleep(min(next_in, 1.0), monitoring_event, wake=self.thread_safe_config.changed):
+                        break
                 except Exception as e:
-                    self.status_callback(f"#{idx+1} 검사 중 오류: {e}")
-
-            if not monitoring_event.is_set():
-                break
+                    self.status_callback(f"검사 중 오류: {e}")
+                    if not safe_sleep(1, monitoring_event):
+                        break
+        finally:
+            # 남은 클릭 예약 취소, 프로세스 작업자/공유 메모리 정리 후 학습된 발견 위치 기록
+            actions.close()
+            engine.close()
+            save_learned_hits()
 
-            self.status_callback(f"한 사이클 완료. 다음 사이클을 시작합니다.")
+    def click_target(self, pos):
+        """타겟 위치 클릭 후 마우스를 비켜둠 (클릭 후 안정화 대기는 ActionExecutor 가 post_click_settle 만큼)"""
+        pyautogui.click(pos)
+        pyautogui.moveRel(50, 50, duration=0.2)
 
     # [이동] 모니터링 토글
     def toggle_monitoring(self):
@@ -873,7 +974,7 @@ class AutoClickerApp:
                 self.hide_capture_preview()
                 self.status_callback("캡처 모드가 자동으로 해제되었습니다.")
             
-            save_all_profiles()
+            save_current_to_profile()
             monitoring_event.set()
             self.status_callback("모니터링 시작 중...")
             self.start_button.config(text="모니터링 중지")
@@ -903,26 +1004,90 @@ class AutoClickerApp:
         self.interval_entry.delete(0, tk.END)
         self.interval_entry.insert(0, "5.0")
         
+        self.settle_entry.delete(0, tk.END)
+        self.settle_entry.insert(0, "2.0")
+        
         self.status_callback("정밀도 및 간격 설정이 기본값으로 초기화되었습니다.")
+        
+        calibrated = [idx for idx, pair in enumerate(image_pairs)
+                      if "trigger_confidence" in pair or "target_confidence" in pair]
+        if calibrated and messagebox.askyesno("초기화", f"이미지 쌍 {len(calibrated)}개에 보정된 정밀도가 있습니다.\n"
+                                                       "쌍별 정밀도도 지우고 기본값을 사용할까요?", parent=self.root):
+            for idx in calibrated:
+                image_pairs[idx].pop("trigger_confidence", None)
+                image_pairs[idx].pop("target_confidence", None)
+                save_pair_change("update", idx)
+            self.update_image_list()
+            self.status_callback(f"이미지 쌍 {len(calibrated)}개의 쌍별 정밀도를 지웠습니다.")
 
-    def sync_config_loop(self):
-        """GUI 입력값을 주기적으로 스레드 안전 변수에 동기화"""
+    def refresh_stats_loop(self):
+        """성능 통계 패널 갱신 (새 측정값이 있을 때만 다시 그림)"""
         try:
-            # 인터벌
-            try: self.thread_safe_config["interval"] = max(float(self.interval_entry.get()), 5.0)
-            except: pass
-            
-            # 정밀도
-            try: self.thread_safe_config["trigger_conf"] = float(self.trigger_conf_entry.get())
-            except: pass
-            try: self.thread_safe_config["target_conf"] = float(self.target_conf_entry.get())
-            except: pass
-            
-        except Exception:
-            pass
+            if self.metrics.version != self._stats_version:
+                self._stats_version = self.metrics.version
+                self.stats_label.config(text=self.format_stats())
+        except Exception as e:
+            print(f"통계 표시 오류: {e}")
         finally:
-            # 0.5초마다 반복
-            self.root.after(500, self.sync_config_loop)
+            self.root.after(1000, self.refresh_stats_loop)
+
+    def format_stats(self, max_rows=6):
+        """쌍별 발견률/점수/매칭 시간과 사이클 요약을 고정폭 문자열로"""
+        cycles = self.metrics.cycle_summary()
+        lines = [f"사이클 {cycles['cycles']}회  평균 {cycles['mean_cycle_ms']:.0f}ms (최대 {cycles['max_cycle_ms']:.0f})"
+                 f"  캡처 {cycles['mean_grab_ms']:.0f}ms"]
+        pairs = self.metrics.pair_summary()
+        for number, s in list(pairs.items())[:max_rows]:
+            lines.append(f"#{number:<2} 검사 {s['checks']:>4}  발견 {s['hit_rate']:>4.0%}  "
+                         f"점수 최고 {s['best_score']:.2f}/평균 {s['mean_score']:.2f}  매칭 {s['mean_match_ms']:.0f}ms")
+        if len(pairs) > max_rows:
+            lines.append(f"... 외 {len(pairs) - max_rows}개 쌍 (내보내기로 전체 확인)")
+        return "\n".join(lines)
+
+    def export_metrics(self):
+        """측정 기록을 CSV 또는 JSON lines 파일로 저장"""
+        path = filedialog.asksaveasfilename(
+            title="통계 내보내기", defaultextension=".csv",
+            initialfile=f"click_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl")])
+        if not path:
+            return
+        try:
+            count = self.metrics.export(path)
+            self.status_callback(f"측정 기록 {count}건을 저장했습니다: {path}")
+        except Exception as e:
+            messagebox.showerror("오류", f"통계 저장 오류: {e}")
+
+    def clear_metrics(self):
+        self.metrics.clear()
+        self.status_callback("성능 통계를 초기화했습니다.")
+
+    def bind_setting(self, entry, key):
+        """입력 칸을 고칠 때마다 검증해 설정값에 바로 반영 (잘못된 값은 빨간 배경, 칸을 떠나면 마지막 올바른 값으로 복원)"""
+        var = tk.StringVar(value=f"{self.thread_safe_config[key]}")
+        normal_bg = entry.cget("bg")
+        entry.config(textvariable=var)
+
+        def on_edit(*_):
+            try:
+                self.thread_safe_config.update({key: var.get()})
+                entry.config(bg=normal_bg)
+            except ValueError:
+                entry.config(bg="#ffd6d6")
+
+        def on_focus_out(_event):
+            try:
+                valid = MonitorSettings.validate(key, var.get()) == self.thread_safe_config[key]
+            except ValueError:
+                valid = False
+            if not valid:
+                # 최솟값으로 보정된 값(예: 간격 3 -> 5.0)이나 마지막 올바른 값을 다시 표시
+                var.set(f"{self.thread_safe_config[key]}")
+            entry.config(bg=normal_bg)
+
+        var.trace_add("write", on_edit)
+        entry.bind("<FocusOut>", on_focus_out)
+        return var
 
     def setup_ui(self):
         # ========== 프로필 관리 UI 추가 ==========
@@ -938,10 +1103,17 @@ class AutoClickerApp:
         profile_btn_frame = tk.Frame(profile_frame)
         profile_btn_frame.pack(side=tk.TOP, fill=tk.X)
         
-        tk.Button(profile_btn_frame, text="새 프로필", command=self.new_profile, width=12).pack(side=tk.LEFT, padx=2)
-        tk.Button(profile_btn_frame, text="프로필 불러오기", command=self.load_profile_dialog, width=15).pack(side=tk.LEFT, padx=2)
-        tk.Button(profile_btn_frame, text="다른 이름으로 저장", command=self.save_as_profile, width=15).pack(side=tk.LEFT, padx=2)
-        tk.Button(profile_btn_frame, text="프로필 삭제", command=self.delete_profile_dialog, width=12).pack(side=tk.LEFT, padx=2)
+        self.new_profile_button = tk.Button(profile_btn_frame, text="새 프로필", command=self.new_profile, width=12)
+        self.new_profile_button.pack(side=tk.LEFT, padx=2)
+        self.load_profile_button = tk.Button(profile_btn_frame, text="프로필 불러오기", command=self.load_profile_dialog, width=15)
+        self.load_profile_button.pack(side=tk.LEFT, padx=2)
+        self.save_as_button = tk.Button(profile_btn_frame, text="다른 이름으로 저장", command=self.save_as_profile, width=15)
+        self.save_as_button.pack(side=tk.LEFT, padx=2)
+        self.delete_profile_button = tk.Button(profile_btn_frame, text="프로필 삭제", command=self.delete_profile_dialog, width=12)
+        self.delete_profile_button.pack(side=tk.LEFT, padx=2)
+        # 이미지 정리 버튼 (배경 가장자리 잘라내기, 중복/안 쓰는 이미지 삭제)
+        self.compact_button = tk.Button(profile_btn_frame, text="이미지 정리", command=self.compact_profiles_dialog, width=12)
+        self.compact_button.pack(side=tk.LEFT, padx=2)
         # [추가] HELP 버튼 - 깔끔한 하늘색 톤
         tk.Button(profile_btn_frame, text="HELP", command=self.show_help, 
                   bg="#e3f2fd", fg="#1976d2", font=("돋움", 9, "bold"), width=8).pack(side=tk.LEFT, padx=10)        
@@ -982,9 +1154,11 @@ class AutoClickerApp:
         arrow_frame = tk.Frame(list_inner)
         arrow_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=5)
 
-        tk.Button(arrow_frame, text="▲", width=3, command=self.move_up).pack(expand=True)
+        self.move_up_button = tk.Button(arrow_frame, text="▲", width=3, command=self.move_up)
+        self.move_up_button.pack(expand=True)
         tk.Label(arrow_frame, text="순서", font=("돋움", 8)).pack()
-        tk.Button(arrow_frame, text="▼", width=3, command=self.move_down).pack(expand=True)
+        self.move_down_button = tk.Button(arrow_frame, text="▼", width=3, command=self.move_down)
+        self.move_down_button.pack(expand=True)
 
       
         
@@ -1002,6 +1176,19 @@ class AutoClickerApp:
         log_text.config(yscrollcommand=log_scrollbar.set)
         log_scrollbar.config(command=log_text.yview)
 
+        # 성능 통계 패널 (최근 측정값 기준, 1초마다 갱신)
+        stats_frame = tk.LabelFrame(self.log_frame, text="성능 통계")
+        stats_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 5))
+        self.stats_label = tk.Label(stats_frame, text="모니터링을 시작하면 표시됩니다.", font=("Consolas", 9),
+                                    justify=tk.LEFT, anchor="w")
+        self.stats_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        stats_btn_frame = tk.Frame(stats_frame)
+        stats_btn_frame.pack(side=tk.RIGHT, padx=5)
+        tk.Button(stats_btn_frame, text="통계 내보내기", command=self.export_metrics,
+                  font=("돋움", 8)).pack(fill=tk.X, pady=1)
+        tk.Button(stats_btn_frame, text="통계 지우기", command=self.clear_metrics,
+                  font=("돋움", 8)).pack(fill=tk.X, pady=1)
+
         # 버튼 프레임
         self.button_frame = tk.Frame(self.bottom_frame)
         self.button_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1023,11 +1210,13 @@ class AutoClickerApp:
         tk.Label(self.conf_frame, text="트리거:").pack(side=tk.LEFT, padx=5)
         self.trigger_conf_entry = tk.Entry(self.conf_frame, width=5)
         self.trigger_conf_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_setting(self.trigger_conf_entry, "trigger_conf")
 
         # 타겟 정밀도
         tk.Label(self.conf_frame, text="타겟:").pack(side=tk.LEFT, padx=5)
         self.target_conf_entry = tk.Entry(self.conf_frame, width=5)
         self.target_conf_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_setting(self.target_conf_entry, "target_conf")
         
         tk.Label(self.conf_frame, text="(높을수록 정확, 낮을수록 유연, 기본 : 0.8 - 0.9)", font=("돋움", 8), fg="gray").pack(side=tk.LEFT, padx=10)
 
@@ -1035,6 +1224,20 @@ class AutoClickerApp:
         tk.Label(self.conf_frame, text="검사 간격(초):").pack(side=tk.LEFT, padx=5)
         self.interval_entry = tk.Entry(self.conf_frame, width=5)
         self.interval_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_setting(self.interval_entry, "interval")
+
+        # --- 클릭 후 안정화 대기 ---
+        tk.Label(self.conf_frame, text="클릭 후 대기(초):").pack(side=tk.LEFT, padx=5)
+        self.settle_entry = tk.Entry(self.conf_frame, width=5)
+        self.settle_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_setting(self.settle_entry, "post_click_settle")
+
+        # 검사 모드 (기본: 쌍별 주기 스케줄러, 체크 시: 쌍마다 대기하는 기존 방식)
+        self.scan_mode_var = tk.StringVar(value="scheduled")
+        self.scan_mode_var.trace_add("write", lambda *_: self.thread_safe_config.update(
+            {"scan_mode": self.scan_mode_var.get()}))
+        tk.Checkbutton(self.conf_frame, text="순차 검사(호환)", variable=self.scan_mode_var,
+                       onvalue="sequential", offvalue="scheduled", font=("돋움", 8)).pack(side=tk.LEFT, padx=5)
 
         # 초기화 버튼 추가
         self.reset_btn = tk.Button(self.conf_frame, text="정밀도 및 간격 초기화", 
@@ -1095,6 +1298,26 @@ class AutoClickerApp:
         self.edit_description_button = tk.Button(self.button_frame, text="설명 편집", command=self.edit_description)
         self.edit_description_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
         
+        # 검사 주기/우선순위 설정 버튼
+        self.schedule_button = tk.Button(self.button_frame, text="검사 주기/우선순위", command=self.edit_schedule)
+        self.schedule_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        # 탐색 범위 전환 버튼 (캡처 위치 주변 우선 <-> 항상 전체 화면)
+        self.search_mode_button = tk.Button(self.button_frame, text="탐색 범위 전환", command=self.toggle_search_mode)
+        self.search_mode_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        # 다음 단계 연결 버튼 (이 쌍을 클릭한 직후 곧바로 검사할 쌍 지정)
+        self.successor_button = tk.Button(self.button_frame, text="다음 단계 연결", command=self.edit_successors)
+        self.successor_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        # 배율 탐색 설정 버튼 (125%/150% 화면 배율, 보조 모니터 대응)
+        self.scales_button = tk.Button(self.button_frame, text="배율 탐색", command=self.edit_match_scales)
+        self.scales_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        # 정밀도 보정 버튼 (저장해 둔 작업 화면으로 쌍별 정밀도 제안)
+        self.calibrate_button = tk.Button(self.button_frame, text="정밀도 보정", command=self.calibrate_confidence)
+        self.calibrate_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
         # 모니터링 시작 버튼
         self.start_button = tk.Button(self.button_frame, text="모니터링 시작", 
                                       command=self.toggle_monitoring)
@@ -1104,6 +1327,15 @@ class AutoClickerApp:
         self.exit_button = tk.Button(self.button_frame, text="종료", command=self.on_exit)
         self.exit_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
 
+        # 이미지 정리(백그라운드) 중에 막을, 프로필이나 쌍을 바꾸는 위젯 (목록 더블 클릭 편집 포함)
+        self.profile_widgets = [
+            self.new_profile_button, self.load_profile_button, self.save_as_button, self.delete_profile_button,
+            self.compact_button, self.image_listbox, self.move_up_button, self.move_down_button,
+            self.capture_button, self.delete_button, self.edit_description_button, self.schedule_button,
+            self.search_mode_button, self.successor_button, self.scales_button, self.calibrate_button,
+            self.start_button
+        ]
+
     def update_trigger_capture_size(self):
         """트리거 이미지 캡처 배율 업데이트"""
         global trigger_capture_multiplier
@@ -1136,8 +1368,7 @@ class AutoClickerApp:
         self.preview_inner_frame.pack(fill=tk.X, padx=5, pady=5)
         
         # 고정된 크기 설정 (픽셀 단위)
-        preview_width = 150
-        preview_height = 150
+        preview_width, preview_height = PREVIEW_SIZE
         
         # 트리거 이미지 프레임 - 고정 크기
         self.trigger_frame = tk.LabelFrame(self.preview_inner_frame, text="트리거 이미지")
@@ -1177,18 +1408,51 @@ class AutoClickerApp:
         self.description_label.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # 미리보기 크기 정보 저장
-        self.preview_size = (preview_width, preview_height)
+        self.preview_size = PREVIEW_SIZE
+        # 썸네일의 PhotoImage (Tk 객체라 메인 스레드에서만 생성, 최근 것만 보관)
+        self._preview_photos = OrderedDict()
+
+    def preview_photo(self, info):
+        """trigger/target 정보의 미리보기 PhotoImage (썸네일 캐시 사용, 이미지가 없으면 None)"""
+        key = (TemplateCache.key_for(info), self.preview_size)
+        photo = self._preview_photos.get(key)
+        if photo is not None:
+            self._preview_photos.move_to_end(key)
+            return photo
+        thumb = thumbnail_cache.get(info, self.preview_size)
+        if thumb is None:
+            return None
+        photo = ImageTk.PhotoImage(thumb)
+        self._preview_photos[key] = photo
+        while len(self._preview_photos) > THUMBNAIL_CACHE_SIZE:
+            self._preview_photos.popitem(last=False)
+        return photo
 
 
     def update_image_list(self):
         self.image_listbox.delete(0, tk.END)
+        numbers = {pair.get("id"): idx + 1 for idx, pair in enumerate(image_pairs)}
+        waiting = chained_ids(image_pairs)
         for idx, pair in enumerate(image_pairs):
             timestamp = pair.get("timestamp", "시간 정보 없음")
             description = pair.get("description", "설명 없음")
             action_delay = pair.get("action_delay", 0)
             delay_str = f" [대기: {action_delay}s]" if action_delay > 0 else ""
+            mode_str = " [전체화면]" if pair.get("search_mode", "roi") == "full" else ""
+            if pair.get("poll_period"):
+                mode_str += f" [주기: {pair['poll_period']}s]"
+            if pair.get("priority", 0):
+                mode_str += f" [우선: {pair['priority']}]"
+            links = [f"#{numbers[link['id']]}" for link in successor_links(pair) if link["id"] in numbers]
+            if links:
+                mode_str += f" [다음: {','.join(links)}]"
+            if pair.get("id") in waiting:
+                mode_str += " [선행 대기]"
+            if "trigger_confidence" in pair or "target_confidence" in pair:
+                confs = [f"{pair[key]:g}" if key in pair else "-" for key in ("trigger_confidence", "target_confidence")]
+                mode_str += f" [정밀도 {'/'.join(confs)}]"
             description_preview = description[:20] + "..." if len(description) > 20 else description
-            self.image_listbox.insert(tk.END, f"#{idx+1}: {timestamp} - {description_preview}{delay_str}")
+            self.image_listbox.insert(tk.END, f"#{idx+1}: {timestamp} - {description_preview}{delay_str}{mode_str}")
 
     def delete_image_pair(self):
         global image_pairs, capturing_mode, capture_step
@@ -1199,9 +1463,13 @@ class AutoClickerApp:
             
         idx = selected[0]
         if 0 <= idx < len(image_pairs):
-            # 목록에서 제거
-            del image_pairs[idx]
-            save_config()
+            # 목록 및 템플릿 캐시에서 제거
+            removed_id = image_pairs[idx].get("id")
+            template_cache.invalidate_pair(image_pairs[idx], image_pairs)
+            save_pair_change("remove", idx)
+            # 이 쌍을 다음 단계로 가리키던 연결도 제거
+            for changed in remove_successor_refs(image_pairs, removed_id):
+                save_pair_change("update", changed)
             self.status_callback(f"이미지 쌍 #{idx+1}이(가) 삭제되었습니다.")
             self.update_image_list()
             
@@ -1212,6 +1480,170 @@ class AutoClickerApp:
             if capturing_mode or capture_step > 0:
                 reset_capture_state(self)
 
+    def edit_schedule(self):
+        """선택한 쌍의 검사 주기(초)와 우선순위 설정"""
+        selected = self.image_listbox.curselection()
+        if not selected:
+            self.status_callback("검사 주기를 설정할 이미지 쌍을 선택하세요.")
+            return
+        
+        idx = selected[0]
+        if 0 <= idx < len(image_pairs):
+            pair = image_pairs[idx]
+            current_period = pair.get("poll_period") or 0
+            new_period = simpledialog.askfloat("검사 주기 설정",
+                                               f"이 쌍의 검사 주기(초)를 입력하세요. 0이면 프로필 검사 간격을 사용합니다.\n(현재: {current_period or '기본'})",
+                                               parent=self.root, minvalue=0.0, maxvalue=3600.0,
+                                               initialvalue=current_period)
+            if new_period is None:
+                return
+            new_priority = simpledialog.askinteger("우선순위 설정",
+                                                   "같은 시각에 검사할 때의 우선순위 (높을수록 먼저, 기본 0):",
+                                                   parent=self.root, minvalue=-10, maxvalue=10,
+                                                   initialvalue=pair.get("priority", 0))
+            if new_priority is None:
+                return
+            
+            if new_period > 0:
+                pair["poll_period"] = max(new_period, MIN_POLL_PERIOD)
+            else:
+                pair.pop("poll_period", None)
+            pair["priority"] = new_priority
+            save_pair_change("update", idx)
+            self.status_callback(f"이미지 쌍 #{idx+1} 검사 주기: {pair.get('poll_period', '기본')}, 우선순위: {new_priority}")
+            self.update_image_list()
+            self.image_listbox.selection_set(idx)
+
+    def toggle_search_mode(self):
+        """선택한 쌍의 탐색 범위를 '캡처 위치 주변 우선'과 '전체 화면' 사이에서 전환"""
+        selected = self.image_listbox.curselection()
+        if not selected:
+            self.status_callback("탐색 범위를 바꿀 이미지 쌍을 선택하세요.")
+            return
+        
+        idx = selected[0]
+        if 0 <= idx < len(image_pairs):
+            pair = image_pairs[idx]
+            pair["search_mode"] = "full" if pair.get("search_mode", "roi") == "roi" else "roi"
+            save_pair_change("update", idx)
+            mode_text = "전체 화면" if pair["search_mode"] == "full" else "캡처 위치 주변 우선"
+            self.status_callback(f"이미지 쌍 #{idx+1} 탐색 범위: {mode_text}")
+            self.update_image_list()
+            self.image_listbox.selection_set(idx)
+
+    def edit_successors(self):
+        """선택한 쌍을 클릭한 뒤 곧바로 검사할 다음 단계 쌍과 제한 시간 설정"""
+        selected = self.image_listbox.curselection()
+        if not selected:
+            self.status_callback("다음 단계를 연결할 이미지 쌍을 선택하세요.")
+            return
+        
+        idx = selected[0]
+        if not 0 <= idx < len(image_pairs):
+            return
+        pair = image_pairs[idx]
+        numbers = {p.get("id"): i + 1 for i, p in enumerate(image_pairs)}
+        links = successor_links(pair)
+        current = ", ".join(str(numbers[link["id"]]) for link in links if link["id"] in numbers)
+        value = simpledialog.askstring("다음 단계 연결",
+                                       f"#{idx+1} 을(를) 클릭한 직후 곧바로 검사할 쌍 번호를 쉼표로 입력하세요.\n"
+                                       "지정된 쌍은 앞 단계가 클릭했을 때만 검사합니다. (비우면 연결 해제)",
+                                       parent=self.root, initialvalue=current)
+        if value is None:
+            return
+        try:
+            targets = [int(v) for v in value.replace(" ", "").split(",") if v]
+        except ValueError:
+            messagebox.showerror("오류", "쌍 번호는 숫자로 입력하세요.", parent=self.root)
+            return
+        if any(not 1 <= n <= len(image_pairs) or n == idx + 1 for n in targets):
+            messagebox.showerror("오류", f"1 ~ {len(image_pairs)} 사이의 다른 쌍 번호를 입력하세요.", parent=self.root)
+            return
+        successor_ids = [image_pairs[n - 1]["id"] for n in dict.fromkeys(targets)]
+        if creates_cycle(image_pairs, pair["id"], successor_ids):
+            messagebox.showerror("오류", "서로가 서로의 다음 단계가 되도록 연결할 수 없습니다.", parent=self.root)
+            return
+        
+        if successor_ids:
+            timeout = simpledialog.askfloat("제한 시간",
+                                            "다음 단계를 찾을 때까지 반복 검사할 최대 시간(초):",
+                                            parent=self.root, minvalue=0.2, maxvalue=60.0,
+                                            initialvalue=links[0]["timeout"] if links else CHAIN_TIMEOUT)
+            if timeout is None:
+                return
+            pair["successors"] = [{"id": sid, "timeout": timeout} for sid in successor_ids]
+        else:
+            pair.pop("successors", None)
+        save_pair_change("update", idx)
+        self.status_callback(f"이미지 쌍 #{idx+1} 다음 단계: "
+                             f"{', '.join('#' + str(n) for n in dict.fromkeys(targets)) or '없음'}")
+        self.update_image_list()
+        self.image_listbox.selection_set(idx)
+
+    def edit_match_scales(self):
+        """현재 프로필에서 시도할 템플릿 배율 목록 설정 (예: 1, 1.25, 1.5)"""
+        current = ", ".join(f"{s:g}" for s in self.thread_safe_config.get("match_scales", [1.0]))
+        value = simpledialog.askstring("배율 탐색",
+                                       "캡처할 때와 화면 배율(DPI)이 다를 때 시도할 배율을 쉼표로 입력하세요.\n"
+                                       "예: 1, 1.25, 1.5 (1은 항상 포함, 마지막으로 찾은 배율부터 시도)",
+                                       parent=self.root, initialvalue=current)
+        if value is None:
+            return
+        try:
+            scales = parse_scales(value)
+        except ValueError as e:
+            messagebox.showerror("오류", str(e), parent=self.root)
+            return
+        self.thread_safe_config.update({"match_scales": scales})
+        all_profiles.update_settings(current_profile_name, {"match_scales": scales})
+        self.status_callback(f"배율 탐색: {', '.join(f'{s:g}' for s in scales)}")
+
+    def calibrate_confidence(self):
+        """저장해 둔 작업 화면 폴더로 쌍별 트리거/타겟 정밀도를 제안받아 적용"""
+        if not image_pairs:
+            self.status_callback("보정할 이미지 쌍이 없습니다.")
+            return
+        frame_dir = filedialog.askdirectory(title="작업 화면(스크린샷) 폴더 선택", parent=self.root)
+        if not frame_dir:
+            return
+        pairs = image_pairs
+        margin = self.thread_safe_config["roi_margin"]
+        self.calibrate_button.config(state=tk.DISABLED)
+        self.status_callback(f"정밀도 보정 시작: {frame_dir}")
+
+        def worker():
+            try:
+                frames = load_frames(frame_dir)
+                if not frames:
+                    raise ValueError("폴더에 이미지 파일(png/jpg/bmp)이 없습니다.")
+                rows = calibrate_pairs(pairs, frames, margin=margin, log=self.status_callback)
+                self.root.after(0, lambda: self.finish_calibration(pairs, rows))
+            except Exception as e:
+                self.status_callback(f"정밀도 보정 오류: {e}")
+                self.root.after(0, lambda: self.calibrate_button.config(state=tk.NORMAL))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_calibration(self, pairs, rows):
+        """보정 결과를 로그에 표시하고, 확인을 받으면 쌍별 정밀도로 저장"""
+        self.calibrate_button.config(state=tk.NORMAL)
+        for line in format_calibration(rows):
+            self.status_callback(line)
+        if pairs is not image_pairs:
+            self.status_callback("보정 중 프로필이 바뀌어 결과를 적용하지 않았습니다.")
+            return
+        if not any(row["suggested"] is not None for row in rows):
+            self.status_callback("정답 위치를 찾은 쌍이 없어 제안할 정밀도가 없습니다.")
+            return
+        if not messagebox.askyesno("정밀도 보정", "제안된 정밀도를 각 이미지 쌍에 적용할까요?\n"
+                                                 "(화면에서 찾지 못한 쌍은 그대로 둡니다)", parent=self.root):
+            return
+        changed = apply_calibration(image_pairs, rows)
+        for idx in changed:
+            save_pair_change("update", idx)
+        self.update_image_list()
+        self.status_callback(f"이미지 쌍 {len(changed)}개에 보정된 정밀도를 적용했습니다.")
+
     def edit_description(self):
         selected = self.image_listbox.curselection()
         if not selected:
@@ -1229,7 +1661,7 @@ class AutoClickerApp:
                 
                 if new_desc is not None:  # 취소되지 않음
                     image_pairs[idx]["description"] = new_desc
-                    save_config()
+                    save_pair_change("update", idx)
                     self.status_callback(f"이미지 쌍 #{idx+1}의 설명이 업데이트되었습니다.")
                     self.update_image_list()
                     
@@ -1243,17 +1675,26 @@ class AutoClickerApp:
             self.root.after(10, show_edit_dialog)
 
     def status_callback(self, message):
-        # [수정] 스레드 안전성 확보: 메인 스레드에서 GUI 업데이트 실행
-        self.root.after(0, self._thread_safe_log, message)
+        # [수정] 스레드 안전성 확보: 큐에만 넣고 GUI 반영은 메인 스레드의 drain_log_loop 가 담당
+        self.log_pipeline.put(message)
 
-    def _thread_safe_log(self, message):
-        """실제 로그를 GUI에 출력하는 내부 함수 (메인 스레드 전용)"""
-        global log_text
-        if log_text:
-            current_time = time.strftime("%H:%M:%S", time.localtime())
-            log_text.insert(tk.END, f"[{current_time}] {message}\n")
-            log_text.see(tk.END)  # 최신 로그를 표시하기 위해 스크롤
-            print(message)  # 콘솔에도 출력
+    def drain_log_loop(self):
+        """쌓인 로그를 한 번에 창에 추가하고 최대 줄 수를 넘는 오래된 줄 삭제 (메인 스레드 전용)"""
+        try:
+            lines, dropped = self.log_pipeline.drain()
+            if log_text and (lines or dropped):
+                if dropped:
+                    lines.insert(0, f"... 로그가 너무 많아 {dropped}줄 생략 (전체 기록: {LOG_FILE})")
+                log_text.insert(tk.END, "\n".join(lines) + "\n")
+                line_count = int(log_text.index("end-1c").split(".")[0]) - 1
+                if line_count > LOG_MAX_LINES:
+                    log_text.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
+                log_text.see(tk.END)  # 최신 로그를 표시하기 위해 스크롤
+        except Exception as e:
+            print(f"로그 표시 오류: {e}")
+        finally:
+            if not shutdown_event.is_set():
+                self.root.after(LOG_DRAIN_INTERVAL, self.drain_log_loop)
 
     def show_capture_preview(self):
         # 메인 GUI의 미리보기 영역 사용
@@ -1273,28 +1714,9 @@ class AutoClickerApp:
         if hasattr(self, 'description_label'):
             self.description_label.config(text="선택된 이미지 쌍 없음")
 
-    def update_capture_preview(self, pil_image, label_text):
-        # 이미지를 고정된 크기에 맞게 조정
-        preview_width, preview_height = self.preview_size
-        
-        # 이미지 비율 유지하면서 프레임에 맞추기
-        img_width, img_height = pil_image.size
-        
-        # 가로세로 비율 계산
-        aspect_ratio = img_width / img_height
-        
-        if aspect_ratio > 1:  # 가로가 더 긴 경우
-            new_width = preview_width
-            new_height = int(preview_width / aspect_ratio)
-        else:  # 세로가 더 긴 경우 또는 정사각형
-            new_height = preview_height
-            new_width = int(preview_height * aspect_ratio)
-        
-        # 이미지 크기 조정 (비율 유지)
-        pil_image_resized = pil_image.resize((new_width, new_height), Image.LANCZOS)
-        
-        # Tkinter 호환 형식으로 변환
-        tk_image = ImageTk.PhotoImage(pil_image_resized)
+    def update_capture_preview(self, pixels, label_text):
+        # 캡처 배열의 썸네일 (저장될 이미지 ID 와 같은 키로 캐시되므로 저장 후 목록에서 다시 만들지 않음)
+        tk_image = self.preview_photo({"image_id": TemplateStore.content_id(pixels), "_pixels": pixels})
         
         if label_text == "트리거 이미지":
             self.trigger_preview.config(image=tk_image, text="")
@@ -1322,7 +1744,7 @@ class AutoClickerApp:
             
             if new_delay is not None:
                 image_pairs[idx]["action_delay"] = new_delay
-                save_config()
+                save_pair_change("update", idx)
                 self.status_callback(f"이미지 쌍 #{idx+1} 대기 시간 설정: {new_delay}초")
                 self.update_image_list()
                 self.image_listbox.selection_set(idx)
@@ -1336,66 +1758,20 @@ class AutoClickerApp:
         if 0 <= idx < len(image_pairs):
             pair = image_pairs[idx]
             
-            # 트리거 이미지 데이터와 타겟 이미지 데이터 가져오기
-            trigger_data = pair.get("trigger", {}).get("pixel_data")
-            target_data = pair.get("target", {}).get("pixel_data")
-            
-            # 미리보기 크기 가져오기
-            preview_width, preview_height = self.preview_size
-            
-            # 트리거 이미지 표시
-            if trigger_data:
-                try:
-                    trigger_img = pixel_data_to_image(trigger_data)
-                    if trigger_img:
-                        # 이미지 비율 유지하면서 프레임에 맞추기
-                        img_width, img_height = trigger_img.size
-                        aspect_ratio = img_width / img_height
-                        
-                        if aspect_ratio > 1:  # 가로가 더 긴 경우
-                            new_width = preview_width
-                            new_height = int(preview_width / aspect_ratio)
-                        else:  # 세로가 더 긴 경우 또는 정사각형
-                            new_height = preview_height
-                            new_width = int(preview_height * aspect_ratio)
-                        
-                        # 이미지 크기 조정 (비율 유지)
-                        trigger_img_resized = trigger_img.resize((new_width, new_height), Image.LANCZOS)
-                        
-                        tk_trigger = ImageTk.PhotoImage(trigger_img_resized)
-                        
-                        self.trigger_preview.config(image=tk_trigger, text="")
-                        self.trigger_preview.image = tk_trigger  # 참조 유지
-                except Exception as e:
-                    self.status_callback(f"트리거 이미지 변환 오류: {e}")
-                    self.trigger_preview.config(image='', text="이미지 변환 오류")
-            
-            # 타겟 이미지 표시
-            if target_data:
+            # 썸네일 캐시 사용 (디코딩/리사이즈/PhotoImage 생성은 이미지별로 한 번만)
+            previews = (
+                ("trigger", self.trigger_preview, "트리거"),
+                ("target", self.target_preview, "타겟"),
+            )
+            for key, preview_label, label_text in previews:
                 try:
-                    target_img = pixel_data_to_image(target_data)
-                    if target_img:
-                        # 이미지 비율 유지하면서 프레임에 맞추기
-                        img_width, img_height = target_img.size
-                        aspect_ratio = img_width / img_height
-                        
-                        if aspect_ratio > 1:  # 가로가 더 긴 경우
-                            new_width = preview_width
-                            new_height = int(preview_width / aspect_ratio)
-                        else:  # 세로가 더 긴 경우 또는 정사각형
-                            new_height = preview_height
-                            new_width = int(preview_height * aspect_ratio)
-                        
-                        # 이미지 크기 조정 (비율 유지)
-                        target_img_resized = target_img.resize((new_width, new_height), Image.LANCZOS)
-                        
-                        tk_target = ImageTk.PhotoImage(target_img_resized)
-                        
-                        self.target_preview.config(image=tk_target, text="")
-                        self.target_preview.image = tk_target  # 참조 유지
+                    tk_image = self.preview_photo(pair.get(key))
+                    if tk_image:
+                        preview_label.config(image=tk_image, text="")
+                        preview_label.image = tk_image  # 참조 유지
                 except Exception as e:
-                    self.status_callback(f"타겟 이미지 변환 오류: {e}")
-                    self.target_preview.config(image='', text="이미지 변환 오류")
+                    self.status_callback(f"{label_text} 이미지 변환 오류: {e}")
+                    preview_label.config(image='', text="이미지 변환 오류")
             
             # 설명 업데이트
             description = pair.get("description", "설명 없음")
@@ -1443,6 +1819,43 @@ class AutoClickerApp:
             # 프로필 전환 완료
             profile_switching = False
     
+    def compact_profiles_dialog(self):
+        """모든 프로필의 템플릿 정리 (배경 가장자리 잘라내기, 중복/안 쓰는 이미지 파일 삭제)"""
+        if monitoring_event.is_set() or capturing_mode:
+            messagebox.showinfo("이미지 정리", "모니터링이나 캡처를 멈춘 뒤 정리하세요.", parent=self.root)
+            return
+        if not messagebox.askyesno("이미지 정리",
+                                   "모든 프로필의 이미지에서 배경색으로만 된 가장자리를 잘라내고,\n"
+                                   "중복되거나 더 이상 쓰지 않는 이미지 파일을 삭제합니다.\n"
+                                   "(클릭 위치는 그대로 유지됩니다) 계속할까요?", parent=self.root):
+            return
+        save_current_to_profile()
+        # 정리하는 동안에는 모니터링 시작, 캡처, 쌍 편집/삭제/순서 변경, 프로필 전환을 막음
+        for widget in self.profile_widgets:
+            widget.config(state=tk.DISABLED)
+
+        def worker():
+            report = None
+            try:
+                report = compact_profiles(all_profiles, log=self.status_callback)
+            except Exception as e:
+                self.status_callback(f"이미지 정리 오류: {e}")
+            self.root.after(0, lambda: self.finish_compaction(report))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_compaction(self, report):
+        """정리 결과를 로그에 표시하고, 바뀐 이미지로 현재 프로필 캐시/목록을 다시 만듦"""
+        for widget in self.profile_widgets:
+            widget.config(state=tk.NORMAL)
+        if report is None:
+            return
+        for line in format_compaction(report):
+            self.status_callback(line)
+        load_profile(current_profile_name)
+        self.update_image_list()
+        self.clear_preview()
+
     def load_profile_dialog(self):
         """프로필 선택 대화상자"""
         global profile_switching
@@ -1543,12 +1956,13 @@ class AutoClickerApp:
         # 현재 데이터 저장
         save_current_to_profile()
         
-        # 새 이름으로 복사
-        global current_profile_name
+        # 새 이름으로 복사한 뒤 그 프로필을 불러와 이후 편집이 새 프로필에 반영되도록
+        # (image_pairs, 현재 프로필 고정, 템플릿 캐시 모두 새 프로필 기준)
         all_profiles[profile_name] = copy.deepcopy(all_profiles[current_profile_name])
-        current_profile_name = profile_name
+        load_profile(profile_name)
         reset_capture_state(self)
         save_all_profiles()
+        self.update_image_list()
         self.status_callback(f"프로필 '{profile_name}'(으)로 저장됨")
         self.current_profile_label.config(text=f"현재 프로필: {profile_name}")
     
@@ -1617,6 +2031,7 @@ class AutoClickerApp:
         restore_screen_saver() 
         # 종료 전 설정 저장
         save_config()
+        self.log_pipeline.close()
         
         # 키보드 리스너 정리
         keyboard.unhook_all()
@@ -1634,4 +2049,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # 매칭 프로세스 작업자(spawn)가 실행 파일로 빌드된 앱 전체를 다시 띄우지 않도록 가장 먼저 호출
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file